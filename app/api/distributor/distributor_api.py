@@ -1,4 +1,3 @@
-import os
 from fastapi import APIRouter, HTTPException, Form, File, UploadFile
 from ...config import settings
 from ...schemas.distributor.distributor_schema import (
@@ -159,17 +158,9 @@ class DistributorAPI:
 
             # Handle company picture
             if CompanyPicture:
+                # The old file is left in place: identical uploads share one content-hashed
+                # file, so it may still be referenced by another record
                 new_path = await save_picture(CompanyPicture, "CompanyPic")
-
-                old_path = old_distributor["data"]["CompanyPicture"]
-                if old_path:
-                    abs_old_path = os.path.normpath(os.path.join(os.getcwd(), old_path))
-                    if os.path.exists(abs_old_path):
-                        os.remove(abs_old_path)
-                        print(f"Deleted old company image: {abs_old_path}")
-                    else:
-                        print(f"Old company image does not exist: {abs_old_path}")
-
                 update_data["CompanyPicture"] = new_path
 
             return await self.crud.update_distributor(distributor_id, DistributorUpdate(**update_data))
@@ -184,19 +175,8 @@ class DistributorAPI:
             if not distributor["success"]:
                 raise HTTPException(status_code=404, detail="Distributor not found")
 
-            image_path = distributor["data"]["CompanyPicture"]
-
-            result = await self.crud.delete_distributor(distributor_id)
-
-            if image_path:
-                abs_path = os.path.normpath(os.path.join(os.getcwd(), image_path))
-                if os.path.exists(abs_path):
-                    os.remove(abs_path)
-                    print(f"Deleted company image: {abs_path}")
-                else:
-                    print(f"Company image does not exist: {abs_path}")
-
-            return result
+            # The picture file is kept: it may be shared with another record (content-hashed)
+            return await self.crud.delete_distributor(distributor_id)
 
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
@@ -1,7 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, File, UploadFile
+from typing import Optional
+from datetime import date
 from ...config import settings
-from ...schemas.distributor.distributor_inventory_schema import DistributorInventoryCreate, DistributorInventoryUpdate
+from ...schemas.distributor.distributor_inventory_schema import DistributorInventoryCreate, DistributorInventoryUpdate, StockAllocationRequest
 from ...crud.distributor.distributor_inventory_manager import DistributorInventoryManager
+from ...utils.inventory_query import STOCK_STATUSES
+from ...utils.inventory_import import IMPORT_FORMATS, detect_format
+from ...utils.data_export import ExportFormat, export_response
 
 class DistributorInventoryAPI:
     def __init__(self):
@@ -12,6 +17,9 @@ class DistributorInventoryAPI:
     def register_routes(self):
         self.router.post("/distributor/{distributor_id}/inventory")(self.create_inventory)
         self.router.get("/distributor/{distributor_id}/inventory")(self.get_all_inventory)
+        # registered before /inventory/{inventory_id} so "query" is not parsed as an id
+        self.router.get("/distributor/{distributor_id}/inventory/query")(self.query_inventory)
+        self.router.get("/distributor/{distributor_id}/inventory/export")(self.export_inventory)
         self.router.get("/distributor/{distributor_id}/inventory/{inventory_id}")(self.get_inventory)
         self.router.put("/distributor/{distributor_id}/inventory/{inventory_id}")(self.update_inventory)
         self.router.delete("/distributor/{distributor_id}/inventory/{inventory_id}")(self.delete_inventory)
@@ -19,6 +27,9 @@ class DistributorInventoryAPI:
         # business
         self.router.post("/distributor/{distributor_id}/inventory/{inventory_id}/reduce")(self.reduce_stock)
         self.router.post("/distributor/{distributor_id}/inventory/{inventory_id}/increase")(self.add_stock)
+        self.router.post("/distributor/{distributor_id}/inventory/mark_expired")(self.mark_expired_stock)
+        self.router.post("/distributor/{distributor_id}/inventory/allocate")(self.allocate_stock)
+        self.router.post("/distributor/{distributor_id}/inventory/import")(self.import_inventory)
 
     async def create_inventory(self, distributor_id: int, inventory: DistributorInventoryCreate):
         try:
@@ -36,6 +47,24 @@ class DistributorInventoryAPI:
     async def get_all_inventory(self, distributor_id: int):
         return await self.crud.get_inventory_with_summary(distributor_id)
 
+    async def query_inventory(
+        self,
+        distributor_id: int,
+        status: Optional[str] = Query(None, description="in / low / no"),
+        expiry_before: Optional[date] = Query(None),
+        brand: Optional[str] = Query(None),
+        batch: Optional[str] = Query(None),
+        name_prefix: Optional[str] = Query(None, max_length=100),
+        limit: int = Query(50, ge=1, le=500),
+        offset: int = Query(0, ge=0)
+    ):
+        if status and status not in STOCK_STATUSES:
+            raise HTTPException(400, f"status must be one of: {', '.join(STOCK_STATUSES)}")
+        result = await self.crud.query_inventory(distributor_id, status, expiry_before, brand, batch, name_prefix, limit, offset)
+        if result.get("success") is False:
+            raise HTTPException(500, result["message"])
+        return result
+
     async def update_inventory(self, distributor_id: int, inventory_id: int, data: DistributorInventoryUpdate):
         return await self.crud.update_inventory(distributor_id, inventory_id, data.dict(exclude_unset=True))
 
@@ -47,3 +76,21 @@ class DistributorInventoryAPI:
 
     async def add_stock(self, distributor_id: int, inventory_id: int, qty: int):
         return await self.crud.add_stock(distributor_id, inventory_id, qty)
+
+    async def mark_expired_stock(self, distributor_id: int):
+        return await self.crud.mark_expired_stock(distributor_id)
+
+    async def allocate_stock(self, distributor_id: int, request: StockAllocationRequest):
+        return await self.crud.allocate_stock(distributor_id, [(i.MedicineName, i.Quantity) for i in request.Items])
+
+    async def import_inventory(self, distributor_id: int, file: UploadFile = File(...), format: Optional[str] = Query(None)):
+        fmt = detect_format(file.filename, format)
+        if fmt is None:
+            raise HTTPException(400, f"Unsupported file format, expected one of: {', '.join(IMPORT_FORMATS)}")
+        result = await self.crud.import_inventory(distributor_id, file, fmt)
+        if not result["success"]:
+            raise HTTPException(500, result["message"])
+        return result
+
+    async def export_inventory(self, distributor_id: int, format: ExportFormat = Query(ExportFormat.csv)):
+        return export_response(self.crud.export_inventory(distributor_id, format.value), format.value, f"distributor_{distributor_id}_inventory")
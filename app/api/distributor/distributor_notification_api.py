@@ -1,8 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
 from ...config import settings
 from ...crud.distributor.distributor_notification_manager import DistributorNotificationManager
-from ...schemas.distributor.distributor_notification_schema import DistributorNotificationCreate
+from ...schemas.distributor.distributor_notification_schema import DistributorNotificationCreate, DistributorNotificationMarkRead
 
 
 class DistributorNotificationAPI:
@@ -14,6 +14,8 @@ class DistributorNotificationAPI:
     def register_routes(self):
         self.router.post("/distributors/notifications")(self.create_notification)
         self.router.get("/distributors/{distributor_id}/notifications")(self.get_notifications)
+        self.router.get("/distributors/{distributor_id}/notifications/counts")(self.get_counts)
+        self.router.put("/distributors/{distributor_id}/notifications/read")(self.mark_many_as_read)
         self.router.put("/distributors/notifications/{notification_id}/read")(self.mark_as_read)
         self.router.delete("/distributors/notifications/{notification_id}")(self.delete_notification)
         self.router.delete("/distributors/{distributor_id}/notifications")(self.delete_all_notifications)
@@ -26,9 +28,22 @@ class DistributorNotificationAPI:
             raise HTTPException(status_code=500, detail=str(e))
 
     # ------------------------------------------------------------
-    async def get_notifications(self, distributor_id: int):
+    async def get_notifications(
+        self,
+        distributor_id: int,
+        limit: int = Query(50, ge=1, le=200),
+        before_id: Optional[int] = Query(None, description="NextBeforeId of the previous page"),
+        unread_only: bool = Query(False),
+    ):
         try:
-            return await self.crud.get_notifications(distributor_id)
+            return await self.crud.get_notifications(distributor_id, limit, before_id, unread_only)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    # ------------------------------------------------------------
+    async def get_counts(self, distributor_id: int):
+        try:
+            return await self.crud.get_counts(distributor_id)
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
@@ -39,6 +54,15 @@ class DistributorNotificationAPI:
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    # ------------------------------------------------------------
+    async def mark_many_as_read(self, distributor_id: int, data: DistributorNotificationMarkRead):
+        if not data.NotificationIds and data.Before is None:
+            raise HTTPException(status_code=400, detail="Provide NotificationIds or Before")
+        try:
+            return await self.crud.mark_many_as_read(distributor_id, data.NotificationIds, data.Before)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
     # ------------------------------------------------------------
     async def delete_notification(self, notification_id: int):
         try:
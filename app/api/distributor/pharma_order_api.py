@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
 from ...config import settings
+from ...utils.data_export import ExportFormat, export_response
 from ...schemas.distributor.pharma_order_schema import PharmaOrderCreate, PharmaOrderUpdate
 from ...crud.distributor.pharma_order_manager import PharmaOrderManager
 
@@ -15,6 +16,7 @@ class PharmaOrderAPI:
         self.router.post("/pharma-orders")(self.create_order)
         self.router.get("/pharma-orders/{po_number}")(self.get_order)
         self.router.get("/pharma-orders/{distributor_id}/distributor-orders")(self.get_all_distributor_orders)
+        self.router.get("/pharma-orders/{distributor_id}/distributor-orders/export")(self.export_distributor_orders)
         self.router.get("/pharma-orders/{pharma_id}/pharma-orders")(self.get_all_pharma_orders)
         self.router.put("/pharma-orders/{po_number}")(self.update_order)
         self.router.delete("/pharma-orders/{po_number}")(self.delete_order)
@@ -45,6 +47,12 @@ class PharmaOrderAPI:
             return await self.crud.get_all_orders_by_distributor(distributor_id)
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
+
+    # -----------------------------
+    # Export All Orders ( by distributor)
+    # -----------------------------
+    async def export_distributor_orders(self, distributor_id: int, format: ExportFormat = Query(ExportFormat.csv)):
+        return export_response(self.crud.export_orders_by_distributor(distributor_id, format.value), format.value, f"distributor_{distributor_id}_pharma_orders")
         
     # -----------------------------
     # Get All Orders ( by pharma)
@@ -1,12 +1,13 @@
-from fastapi import APIRouter, HTTPException
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from datetime import date
+from typing import List, Optional
 from ...schemas.distributor.retailer_invoice_schema import RetailerInvoiceCreate, RetailerInvoiceUpdate
 from ...crud.distributor.retailer_invoice_manager import RetailerInvoiceManager
 from ...config import settings
-from xhtml2pdf import pisa
-import io
-from fastapi.responses import StreamingResponse
-from jinja2 import Environment, FileSystemLoader
+from ...utils.data_export import ExportFormat, export_response, zip_stream
+from ...utils.pdf_renderer import invoice_pdf, PdfRendererBusy
+from ...utils.pdf_cache import invoice_pdf_cache, content_hash
+from fastapi.responses import Response, StreamingResponse
 
 
 class RetailerInvoiceAPI:
@@ -19,10 +20,12 @@ class RetailerInvoiceAPI:
         self.router.post("/distributor/invoices")(self.create_invoice)
         self.router.get("/distributor/invoices/{invoice_id}")(self.get_invoice)
         self.router.get("/distributor/{distributor_id}/invoices")(self.get_all_invoices)                # Filter by distributor
+        self.router.get("/distributor/{distributor_id}/invoices/export")(self.export_invoices)
         self.router.put("/distributor/invoices/{invoice_id}")(self.update_invoice)
         self.router.delete("/distributor/invoices/{invoice_id}")(self.delete_invoice)
         self.router.delete("/distributor/{distributor_id}/invoices")(self.delete_all_invoices)
         self.router.get("/distributor/invoices/{invoice_id}/pdf")(self.generate_invoice_pdf)
+        self.router.get("/distributor/{distributor_id}/invoices/pdf-zip")(self.export_invoice_pdfs)
 
 
     # -----------------------------
@@ -52,6 +55,12 @@ class RetailerInvoiceAPI:
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    # -----------------------------
+    # Export All Invoices
+    # -----------------------------
+    async def export_invoices(self, distributor_id: int, format: ExportFormat = Query(ExportFormat.csv)):
+        return export_response(self.crud.export_invoices(distributor_id, format.value), format.value, f"distributor_{distributor_id}_invoices")
+
     # -----------------------------
     # Update Invoice
     # -----------------------------
@@ -81,31 +90,65 @@ class RetailerInvoiceAPI:
             raise HTTPException(status_code=500, detail=str(e))
         
 
-    async def generate_invoice_pdf(self, invoice_id: int):
+    async def generate_invoice_pdf(self, invoice_id: int, request: Request):
 
         try:
             invoice = await self.crud.get_invoice(invoice_id)
 
-            if not invoice:
+            if not invoice or invoice.get("success") is False:
                 raise HTTPException(status_code=404, detail="Invoice not found")
 
-            env = Environment(loader=FileSystemLoader("templates"))
-            template = env.get_template("invoice_template.html")
-
-            html = template.render(invoice=invoice)
-
-            pdf_buffer = io.BytesIO()
-            pisa.CreatePDF(io.StringIO(html), dest=pdf_buffer)
+            # Same invoice data + same template = same file; rendered (off the event loop) only on a miss
+            cached = await invoice_pdf_cache.get_or_create(
+                f"invoice_{invoice_id}",
+                content_hash(invoice, invoice_pdf.template_version),
+                lambda: invoice_pdf.render({"invoice": invoice}),
+            )
 
-            pdf_buffer.seek(0)
+            if request.headers.get("if-none-match") == cached.etag:
+                return Response(status_code=304, headers={"ETag": cached.etag})
 
-            return StreamingResponse(
-                pdf_buffer,
+            return Response(
+                cached.content,
                 media_type="application/pdf",
                 headers={
-                    "Content-Disposition": f"attachment; filename=invoice_{invoice_id}.pdf"
-                }
+                    "ETag": cached.etag,
+                    "Cache-Control": "private, no-cache",
+                    "Content-Disposition": f'attachment; filename="invoice_{invoice_id}.pdf"',
+                },
             )
 
+        except PdfRendererBusy as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "2"})
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
+
+    # -----------------------------
+    # Bulk PDFs (ZIP, streamed as each invoice is rendered)
+    # -----------------------------
+    async def export_invoice_pdfs(
+        self,
+        distributor_id: int,
+        from_date: Optional[date] = Query(None, description="Invoice date from (inclusive)"),
+        to_date: Optional[date] = Query(None, description="Invoice date to (inclusive)"),
+        ids: Optional[List[int]] = Query(None, description="Invoice ids, repeat the parameter"),
+    ):
+        if not (from_date or to_date or ids):
+            raise HTTPException(status_code=400, detail="Give a date range (from_date / to_date) or invoice ids")
+        if from_date and to_date and from_date > to_date:
+            raise HTTPException(status_code=400, detail="from_date must not be after to_date")
+
+        limit = settings.pdf_bulk_max_invoices
+        invoice_ids = await self.crud.invoice_ids(distributor_id, from_date, to_date, ids, limit + 1)
+        if not invoice_ids:
+            raise HTTPException(status_code=404, detail="No invoices found")
+        if len(invoice_ids) > limit:
+            raise HTTPException(status_code=400, detail=f"More than {limit} invoices match, narrow the date range")
+
+        return StreamingResponse(
+            zip_stream(self.crud.export_invoice_pdfs(invoice_ids, settings.pdf_bulk_concurrency)),
+            media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="distributor_{distributor_id}_invoices.zip"'},
+        )
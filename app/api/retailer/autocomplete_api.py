@@ -0,0 +1,34 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from ...config import settings
+from ...crud.retailer.autocomplete_manager import AutocompleteManager, SCOPES
+from ...utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class AutocompleteAPI:
+    def __init__(self):
+        self.router = APIRouter()
+        self.crud = AutocompleteManager(settings.db_type)
+        self.register_routes()
+
+    def register_routes(self):
+        self.router.get("/autocomplete", response_model=dict)(self.autocomplete)
+
+    # ---------------- AUTOCOMPLETE ----------------
+    async def autocomplete(
+        self,
+        prefix: str = Query(..., min_length=1, max_length=100),
+        scope: str = Query("all"),
+        retailer_id: Optional[int] = Query(None),
+        limit: int = Query(10, ge=1, le=50)
+    ):
+        if scope not in SCOPES:
+            raise HTTPException(status_code=400, detail=f"scope must be one of: {', '.join(SCOPES)}")
+        if scope == "inventory" and retailer_id is None:
+            raise HTTPException(status_code=400, detail="retailer_id is required for scope=inventory")
+
+        result = await self.crud.suggest(prefix, scope, retailer_id, limit)
+        if not result["success"]:
+            raise HTTPException(status_code=500, detail=result["message"])
+        return result
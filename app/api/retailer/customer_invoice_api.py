@@ -1,8 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
 from ...schemas.retailer.customer_invoice_schema import CustomerInvoiceCreate, CustomerInvoiceUpdate
 from ...crud.retailer.customer_invoice_manager import CustomerInvoiceManager
 from ...config import settings
+from ...utils.data_export import ExportFormat, export_response
 
 
 class CustomerInvoiceAPI:
@@ -15,6 +16,7 @@ class CustomerInvoiceAPI:
         self.router.post("/retailer/invoices")(self.create_invoice)
         self.router.get("/retailer/invoices/{invoice_id}")(self.get_invoice)
         self.router.get("/retailer/{retailer_id}/invoices")(self.get_all_invoices)                # Filter by retailer
+        self.router.get("/retailer/{retailer_id}/invoices/export")(self.export_invoices)
         self.router.put("/retailer/invoices/{invoice_id}")(self.update_invoice)
         self.router.delete("/retailer/invoices/{invoice_id}")(self.delete_invoice)
         self.router.delete("/retailer/{retailer_id}/invoices")(self.delete_all_invoices)
@@ -47,6 +49,12 @@ class CustomerInvoiceAPI:
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    # -----------------------------
+    # Export All Invoices
+    # -----------------------------
+    async def export_invoices(self, retailer_id: int, format: ExportFormat = Query(ExportFormat.csv)):
+        return export_response(self.crud.export_invoices(retailer_id, format.value), format.value, f"retailer_{retailer_id}_invoices")
+
     # -----------------------------
     # Update Invoice
     # -----------------------------
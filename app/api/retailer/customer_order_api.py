@@ -1,5 +1,10 @@
-from fastapi import APIRouter, HTTPException
+import hmac
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Header
+from ...config import settings
+from ...schemas.retailer.customer_order_schema import CustomerOrderChanges
 from ...crud.retailer.customer_order_manager import CustomerOrderManager
+from ...utils.http_client import upstream
 
 router = APIRouter()
 
@@ -11,6 +16,10 @@ class CustomerOrderAPI:
         self.register_routes()
 
     def register_routes(self):
+        self.router.get("/retailer/orders-cache/stats")(self.cache_stats)
+        self.router.get("/retailer/upstream/metrics")(self.upstream_metrics)
+        self.router.get("/retailer/orders-sync/status")(self.sync_status)
+        self.router.post("/retailer/orders-sync/changes")(self.ingest_changes)
         self.router.get("/retailer/dashboard/{retailer_id}")(self.get_dashboard)
         self.router.get("/retailer/sales-dashboard/{retailer_id}")(self.sales_dashboard)
         self.router.get("/retailer/get_all_orders/{retailer_id}")(self.get_all_orders)
@@ -47,3 +56,21 @@ class CustomerOrderAPI:
             return await self.manager.get_dashboard(retailer_id)
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
+
+    async def cache_stats(self):
+        return self.manager.cache_stats()
+
+    async def upstream_metrics(self):
+        return upstream.metrics()
+
+    async def sync_status(self):
+        return self.manager.sync_status()
+
+    async def ingest_changes(self, changes: CustomerOrderChanges, x_sync_token: Optional[str] = Header(None)):
+        token = settings.customer_order_ingest_token
+        if token and not hmac.compare_digest(x_sync_token or "", token):
+            raise HTTPException(status_code=401, detail="Invalid sync token")
+        try:
+            return await self.manager.ingest_changes(changes)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
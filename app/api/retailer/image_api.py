@@ -0,0 +1,33 @@
+import hmac
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Header, Query
+from ...config import settings
+from ...utils.image_gc import image_gc
+
+
+class ImageAPI:
+    def __init__(self):
+        self.router = APIRouter()
+        self.gc = image_gc
+        self.register_routes()
+
+    def register_routes(self):
+        self.router.get("/images/cleanup/status")(self.cleanup_status)
+        self.router.post("/images/cleanup")(self.cleanup)
+
+    # ---------------- UNREFERENCED PICTURES ----------------
+    async def cleanup_status(self):
+        return self.gc.status()
+
+    async def cleanup(
+        self,
+        dry_run: bool = Query(True, description="Only report what would be deleted"),
+        x_admin_token: Optional[str] = Header(None),
+    ):
+        token = settings.image_gc_token
+        if token and not hmac.compare_digest(x_admin_token or "", token):
+            raise HTTPException(status_code=401, detail="Invalid admin token")
+        result = await self.gc.run(dry_run=dry_run)
+        if result.get("success") is False:
+            raise HTTPException(status_code=409, detail=result["message"])
+        return result
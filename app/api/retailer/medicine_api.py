@@ -1,9 +1,9 @@
-import os
-from fastapi import APIRouter, HTTPException, Form, File, UploadFile
+from fastapi import APIRouter, HTTPException, Form, File, UploadFile, Request, Response, Query
 from ...config import settings
 from ...schemas.retailer.medicine_schema import MedicineCreate, MedicineUpdate
 from ...crud.retailer.medicine_manager import MedicineManager
 from ...utils.image_uploader import save_picture
+from ...utils.catalog_cache import etag_matches
 
 class MedicineAPI:
     def __init__(self):
@@ -13,6 +13,8 @@ class MedicineAPI:
 
     def register_routes(self):
         self.router.post("/medicines", response_model=dict)(self.create_medicine)
+        # registered before /medicines/{medicine_id} so "search" is not parsed as an id
+        self.router.get("/medicines/search", response_model=dict)(self.search_medicines)
         self.router.get("/medicines/{medicine_id}", response_model=dict)(self.get_medicine)
         self.router.get("/medicines", response_model=dict)(self.get_all_medicines)
         self.router.put("/medicines/{medicine_id}", response_model=dict)(self.update_medicine)
@@ -63,8 +65,28 @@ class MedicineAPI:
             raise HTTPException(status_code=404, detail=result.get("message", "Medicine not found"))
         return result
 
-    async def get_all_medicines(self):
-        return await self.crud.get_all_medicines()
+    async def get_all_medicines(self, request: Request):
+        try:
+            catalog = await self.crud.get_medicine_catalog()
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+        headers = {"ETag": catalog.etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), catalog.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=catalog.body, media_type="application/json", headers=headers)
+
+    # ---------------- SEARCH ----------------
+    async def search_medicines(
+        self,
+        q: str = Query(..., min_length=1, max_length=100),
+        limit: int = Query(20, ge=1, le=100),
+        offset: int = Query(0, ge=0, le=1000),
+    ):
+        result = await self.crud.search_medicines(q, limit, offset)
+        if not result["success"]:
+            raise HTTPException(status_code=500, detail=result["message"])
+        return result
 
     # ---------------- UPDATE ----------------
     async def update_medicine(
@@ -105,10 +127,9 @@ class MedicineAPI:
 
             # Handle image replacement
             if ImgUrl:
+                # The old file is left in place: identical uploads share one content-hashed
+                # file, so it may still be referenced by another record
                 new_path = await save_picture(ImgUrl, "Medicine")
-                old_path = old_medicine["data"]["ImgUrl"]
-                if old_path and os.path.exists(old_path):
-                    os.remove(old_path)
                 update_data["ImgUrl"] = new_path
 
             return await self.crud.update_medicine(medicine_id, MedicineUpdate(**update_data))
@@ -123,14 +144,8 @@ class MedicineAPI:
             if not medicine["success"]:
                 raise HTTPException(status_code=404, detail="Medicine not found")
 
-            image_path = medicine["data"]["ImgUrl"]
-            result = await self.crud.delete_medicine(medicine_id)
-
-            # Delete image file
-            if image_path and os.path.exists(image_path):
-                os.remove(image_path)
-
-            return result
+            # The image file is kept: it may be shared with another record (content-hashed)
+            return await self.crud.delete_medicine(medicine_id)
 
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
@@ -1,6 +1,5 @@
-import os
-from fastapi import APIRouter, HTTPException, Form, File, UploadFile
-from typing import List
+from fastapi import APIRouter, HTTPException, Form, File, UploadFile, Query
+from typing import List, Optional
 from ...config import settings
 from ...schemas.retailer.retailer_schema import (
     RetailerCreate, 
@@ -11,6 +10,7 @@ from ...schemas.retailer.retailer_schema import (
 )
 from ...crud.retailer.retailer_manager import RetailerManager
 from ...utils.image_uploader import save_picture
+from ...utils.retailer_sync import retailer_sync_dispatcher
 
 
 class RetailerAPI:
@@ -27,6 +27,9 @@ class RetailerAPI:
         self.router.delete("/retailers/{retailer_id}", response_model=dict)(self.delete_retailer)
         self.router.post("/retailers/register", response_model=dict)(self.register)
         self.router.post("/retailers/login", response_model=dict)(self.login)
+        self.router.get("/retailers/sync/status")(self.sync_status)
+        self.router.get("/retailers/sync/dead-letters")(self.sync_dead_letters)
+        self.router.post("/retailers/sync/dead-letters/{event_id}/replay")(self.replay_sync_event)
         
 
 
@@ -168,17 +171,9 @@ class RetailerAPI:
 
             # Handle shop picture replacement
             if ShopPic:
+                # The old file is left in place: identical uploads share one content-hashed
+                # file, so it may still be referenced by another record
                 new_path = await save_picture(ShopPic, "Shop")
-
-                old_path = old_retailer["data"]["ShopPic"]
-                if old_path:
-                    abs_old_path = os.path.normpath(os.path.join(os.getcwd(), old_path))
-                    if os.path.exists(abs_old_path):
-                        os.remove(abs_old_path)
-                        print(f"Deleted old shop image: {abs_old_path}")
-                    else:
-                        print(f"Old shop image does not exist: {abs_old_path}")
-
                 update_data["ShopPic"] = new_path
 
             return await self.crud.update_retailer(retailer_id, RetailerUpdate(**update_data))
@@ -193,21 +188,8 @@ class RetailerAPI:
             if not retailer["success"]:
                 raise HTTPException(status_code=404, detail="Retailer not found")
 
-            image_path = retailer["data"]["ShopPic"]
-
-            # Delete from DB
-            result = await self.crud.delete_retailer(retailer_id)
-
-            # Delete physical file
-            if image_path:
-                abs_path = os.path.normpath(os.path.join(os.getcwd(), image_path))
-                if os.path.exists(abs_path):
-                    os.remove(abs_path)
-                    print(f"Deleted shop image: {abs_path}")
-                else:
-                    print(f"Shop image does not exist: {abs_path}")
-
-            return result
+            # Delete from DB; the picture file is kept as it may be shared with another record (content-hashed)
+            return await self.crud.delete_retailer(retailer_id)
 
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
@@ -226,3 +208,14 @@ class RetailerAPI:
             raise HTTPException(status_code=401, detail=result["message"])
         return result
 
+    # ---------------- PARTNER SYNC (outbox) ----------------
+    async def sync_status(self):
+        return await retailer_sync_dispatcher.status()
+
+    async def sync_dead_letters(self, limit: int = Query(100, ge=1, le=1000), retailer_id: Optional[int] = None):
+        return await retailer_sync_dispatcher.dead_letters(limit, retailer_id)
+
+    async def replay_sync_event(self, event_id: int):
+        if not await retailer_sync_dispatcher.replay(event_id):
+            raise HTTPException(status_code=404, detail="Dead-lettered event not found")
+        return {"success": True, "message": "Event queued again"}
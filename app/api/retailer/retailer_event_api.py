@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Header, Query, Request, WebSocket
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from ...config import settings
+from ...utils.event_hub import event_hub, sse_stream, websocket_stream
+
+
+class RetailerEventAPI:
+    """Pushes notifications and order changes to a retailer app (replaces polling)."""
+
+    def __init__(self):
+        self.router = APIRouter()
+        self.register_routes()
+
+    def register_routes(self):
+        self.router.get("/retailers/{retailer_id}/events")(self.stream_events)
+        self.router.websocket("/retailers/{retailer_id}/events/ws")(self.websocket_events)
+
+    # ------------------------------------------------------------
+    # 📡 Server-Sent Events (resumes from Last-Event-ID)
+    # ------------------------------------------------------------
+    async def stream_events(
+        self,
+        request: Request,
+        retailer_id: int,
+        last_event_id: Optional[int] = Query(None),
+        last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID"),
+    ):
+        body = sse_stream(
+            event_hub,
+            request,
+            "retailer",
+            retailer_id,
+            last_event_id_header if last_event_id_header is not None else last_event_id,
+            settings.event_heartbeat_seconds,
+        )
+        return StreamingResponse(
+            body,
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    # ------------------------------------------------------------
+    # 🔌 WebSocket (same events as JSON frames)
+    # ------------------------------------------------------------
+    async def websocket_events(self, websocket: WebSocket, retailer_id: int, last_event_id: Optional[int] = None):
+        await websocket_stream(event_hub, websocket, "retailer", retailer_id, last_event_id, settings.event_heartbeat_seconds)
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, File, UploadFile
+from typing import List, Optional
+from datetime import date
 from ...config import settings
-from ...schemas.retailer.retailer_inventory_schema import RetailerInventoryCreate, RetailerInventoryUpdate
+from ...schemas.retailer.retailer_inventory_schema import RetailerInventoryCreate, RetailerInventoryUpdate, StockAllocationRequest
 from ...crud.retailer.retailer_inventory_manager import RetailerInventoryManager
 from ...utils.logger import get_logger
+from ...utils.inventory_query import STOCK_STATUSES
+from ...utils.inventory_import import IMPORT_FORMATS, detect_format
+from ...utils.data_export import ExportFormat, export_response
 
 logger = get_logger(__name__)
 
@@ -17,6 +21,9 @@ class RetailerInventoryAPI:
         # CRUD routes
         self.router.post("/retailer/{retailer_id}/inventory")(self.create_inventory)
         self.router.get("/retailer/{retailer_id}/inventory")(self.get_all_inventory)
+        # registered before /inventory/{inventory_id} so "query" is not parsed as an id
+        self.router.get("/retailer/{retailer_id}/inventory/query")(self.query_inventory)
+        self.router.get("/retailer/{retailer_id}/inventory/export")(self.export_inventory)
         self.router.get("/retailer/{retailer_id}/inventory/{inventory_id}")(self.get_inventory)
         self.router.put("/retailer/{retailer_id}/inventory/{inventory_id}")(self.update_inventory)
         self.router.delete("/retailer/{retailer_id}/inventory/{inventory_id}")(self.delete_inventory)
@@ -26,6 +33,8 @@ class RetailerInventoryAPI:
         self.router.post("/retailer/{retailer_id}/inventory/{inventory_id}/increase")(self.increase_stock_after_return)
         self.router.post("/retailer/{retailer_id}/inventory/{inventory_id}/add_from_distributor")(self.add_stock_from_distributor)
         self.router.post("/retailer/{retailer_id}/inventory/mark_expired")(self.mark_expired_stock)
+        self.router.post("/retailer/{retailer_id}/inventory/allocate")(self.allocate_stock)
+        self.router.post("/retailer/{retailer_id}/inventory/import")(self.import_inventory)
 
     # ------------------------------------------------------------------
     # CRUD Operations
@@ -55,6 +64,25 @@ class RetailerInventoryAPI:
             logger.error(f"❌ Error fetching inventory for retailer {retailer_id}: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    async def query_inventory(
+        self,
+        retailer_id: int,
+        status: Optional[str] = Query(None, description="in / low / no"),
+        expiry_before: Optional[date] = Query(None),
+        brand: Optional[str] = Query(None),
+        batch: Optional[str] = Query(None),
+        name_prefix: Optional[str] = Query(None, max_length=100),
+        limit: int = Query(50, ge=1, le=500),
+        offset: int = Query(0, ge=0)
+    ):
+        if status and status not in STOCK_STATUSES:
+            raise HTTPException(status_code=400, detail=f"status must be one of: {', '.join(STOCK_STATUSES)}")
+        result = await self.crud.query_inventory(retailer_id, status, expiry_before, brand, batch, name_prefix, limit, offset)
+        if result.get("success") is False:
+            logger.error(f"❌ Error querying inventory for retailer {retailer_id}: {result['message']}")
+            raise HTTPException(status_code=500, detail=result["message"])
+        return result
+
     async def update_inventory(self, retailer_id: int, inventory_id: int, inventory: RetailerInventoryUpdate):
         try:
             return await self.crud.update_inventory(retailer_id, inventory_id, inventory.dict(exclude_unset=True))
@@ -99,3 +127,23 @@ class RetailerInventoryAPI:
         except Exception as e:
             logger.error(f"❌ Error marking expired stock for retailer {retailer_id}: {e}")
             raise HTTPException(status_code=500, detail=str(e))
+
+    async def allocate_stock(self, retailer_id: int, request: StockAllocationRequest):
+        try:
+            return await self.crud.allocate_stock(retailer_id, [(i.MedicineName, i.Quantity) for i in request.Items])
+        except Exception as e:
+            logger.error(f"❌ Error allocating stock for retailer {retailer_id}: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def import_inventory(self, retailer_id: int, file: UploadFile = File(...), format: Optional[str] = Query(None)):
+        fmt = detect_format(file.filename, format)
+        if fmt is None:
+            raise HTTPException(status_code=400, detail=f"Unsupported file format, expected one of: {', '.join(IMPORT_FORMATS)}")
+        result = await self.crud.import_inventory(retailer_id, file, fmt)
+        if not result["success"]:
+            logger.error(f"❌ Error importing inventory for retailer {retailer_id}: {result['message']}")
+            raise HTTPException(status_code=500, detail=result["message"])
+        return result
+
+    async def export_inventory(self, retailer_id: int, format: ExportFormat = Query(ExportFormat.csv)):
+        return export_response(self.crud.export_inventory(retailer_id, format.value), format.value, f"retailer_{retailer_id}_inventory")
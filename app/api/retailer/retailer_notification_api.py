@@ -1,8 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
 from ...config import settings
 from ...crud.retailer.retailer_notification_manager import RetailerNotificationManager
-from ...schemas.retailer.retailer_notification_schema import RetailerNotificationCreate
+from ...schemas.retailer.retailer_notification_schema import RetailerNotificationCreate, RetailerNotificationMarkRead
 
 
 class RetailerNotificationAPI:
@@ -14,6 +14,8 @@ class RetailerNotificationAPI:
     def register_routes(self):
         self.router.post("/retailers/notifications")(self.create_notification)
         self.router.get("/retailers/{retailer_id}/notifications")(self.get_notifications)
+        self.router.get("/retailers/{retailer_id}/notifications/counts")(self.get_counts)
+        self.router.put("/retailers/{retailer_id}/notifications/read")(self.mark_many_as_read)
         self.router.put("/retailers/notifications/{notification_id}/read")(self.mark_as_read)
         self.router.delete("/retailers/notifications/{notification_id}")(self.delete_notification)
         self.router.delete("/retailers/{retailer_id}/notifications")(self.delete_all_notifications)
@@ -30,9 +32,24 @@ class RetailerNotificationAPI:
     # ------------------------------------------------------------
     # 🟡 Get Notifications by Retailer
     # ------------------------------------------------------------
-    async def get_notifications(self, retailer_id: int):
+    async def get_notifications(
+        self,
+        retailer_id: int,
+        limit: int = Query(50, ge=1, le=200),
+        before_id: Optional[int] = Query(None, description="NextBeforeId of the previous page"),
+        unread_only: bool = Query(False),
+    ):
         try:
-            return await self.crud.get_notifications(retailer_id)
+            return await self.crud.get_notifications(retailer_id, limit, before_id, unread_only)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    # ------------------------------------------------------------
+    # 🔢 Unread / Total Counters (for polling)
+    # ------------------------------------------------------------
+    async def get_counts(self, retailer_id: int):
+        try:
+            return await self.crud.get_counts(retailer_id)
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
@@ -45,6 +62,17 @@ class RetailerNotificationAPI:
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    # ------------------------------------------------------------
+    # 🟠 Mark Many as Read (ids or everything before a timestamp)
+    # ------------------------------------------------------------
+    async def mark_many_as_read(self, retailer_id: int, data: RetailerNotificationMarkRead):
+        if not data.NotificationIds and data.Before is None:
+            raise HTTPException(status_code=400, detail="Provide NotificationIds or Before")
+        try:
+            return await self.crud.mark_many_as_read(retailer_id, data.NotificationIds, data.Before)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
     # ------------------------------------------------------------
     # 🔴 Delete Single Notification
     # ------------------------------------------------------------
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
 from ...config import settings
+from ...utils.data_export import ExportFormat, export_response
 from ...schemas.retailer.retailer_order_schema import (
     RetailerOrderCreate,
     RetailerOrderUpdate,
@@ -25,6 +26,8 @@ class RetailerOrderAPI:
         self.router.get("/retailer-orders/{order_id}")(self.get)
         self.router.get("/retailer-orders/retailer/{retailer_id}")(self.get_by_retailer)
         self.router.get("/retailer-orders/distributor/{distributor_id}")(self.get_by_distributor)
+        self.router.get("/retailer-orders/retailer/{retailer_id}/export")(self.export_by_retailer)
+        self.router.get("/retailer-orders/distributor/{distributor_id}/export")(self.export_by_distributor)
         self.router.put("/retailer-orders/{order_id}")(self.update)
         self.router.patch("/retailer-orders/{order_id}/status")(self.update_status)
         self.router.delete("/retailer-orders/{order_id}")(self.delete)
@@ -41,6 +44,12 @@ class RetailerOrderAPI:
     async def get_by_distributor(self, distributor_id: Optional[int] = None):
         return await self.manager.get_orders_by_distributor(distributor_id)
 
+    async def export_by_retailer(self, retailer_id: int, format: ExportFormat = Query(ExportFormat.csv)):
+        return export_response(self.manager.export_orders_by_retailer(retailer_id, format.value), format.value, f"retailer_{retailer_id}_orders")
+
+    async def export_by_distributor(self, distributor_id: int, format: ExportFormat = Query(ExportFormat.csv)):
+        return export_response(self.manager.export_orders_by_distributor(distributor_id, format.value), format.value, f"distributor_{distributor_id}_retailer_orders")
+
     async def update(self, order_id: int, data: RetailerOrderUpdate):
         return await self.manager.update_order(order_id, data)
     
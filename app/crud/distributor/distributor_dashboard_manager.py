@@ -3,6 +3,7 @@ from datetime import datetime
 from ...db.base.database_manager import DatabaseManager
 from ...models.retailer.retailer_order_model import RetailerOrder
 from ...models.retailer.retailer_model import Retailer
+from .distributor_inventory_manager import distributor_stock_alerts
 
 
 class DistributorDashboardManager:
@@ -32,9 +33,13 @@ class DistributorDashboardManager:
             # Map RetailerId -> RetailerName
             retailer_map = {r.RetailerId: r.OwnerName for r in retailers}
 
+            # Low / out-of-stock items, kept current by inventory writes
+            low_stock_list = await distributor_stock_alerts.low_stock(self.db_manager, distributor_id)
+
             return {
                 "TodaySales": sum(o.TotalAmount for o in orders_today),
                 "NewOrders": len(new_orders),
+                "LowStockCount": len(low_stock_list),
                 "NewOrdersList": [
                     {
                         "OrderID": o.OrderId,
@@ -51,7 +56,8 @@ class DistributorDashboardManager:
                         "Status": o.Status
                     }
                     for o in orders
-                ]
+                ],
+                "LowStock": low_stock_list
             }
 
         finally:
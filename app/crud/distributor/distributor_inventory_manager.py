@@ -1,13 +1,51 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple, AsyncIterator
+from fastapi import UploadFile
+from datetime import date
+from sqlalchemy import select, func, update, or_
+from ...config import settings
 from ...utils.logger import get_logger
+from ...utils.timezone import ist_now
+from ...utils.inventory_query import inventory_filters, stock_status_expression
+from ...utils.stock_alerts import StockAlerts
+from ...utils.fefo_allocator import FefoAllocator
+from ...utils.inventory_import import InventoryImporter
+from ...exceptions.custom_exceptions import InsufficientStockException, StockConflictException
+from ...utils.data_export import stream_rows
 from ...db.base.database_manager import DatabaseManager
 from ...models.distributor.distributor_inventory_model import DistributorInventory
+from ...models.distributor.distributor_notification_model import DistributorNotification
+from .distributor_notification_manager import distributor_notifications_inserted
+from ...schemas.distributor.distributor_inventory_schema import DistributorInventoryRead
 
 logger = get_logger(__name__)
 
+# Per-distributor low-stock sets + stock notifications, shared by every manager instance
+distributor_stock_alerts = StockAlerts(
+    DistributorInventory,
+    DistributorNotification,
+    owner_field="DistributorId",
+    id_field="DistributorInventoryId",
+    max_accounts=settings.low_stock_max_accounts,
+    ttl_seconds=settings.low_stock_ttl_seconds,
+    on_insert=distributor_notifications_inserted,
+)
+
+_COLUMNS = DistributorInventory.__table__.c
+
+distributor_allocator = FefoAllocator(DistributorInventory, owner_field="DistributorId", id_field="DistributorInventoryId")
+
 class DistributorInventoryManager:
     def __init__(self, db_type: str):
+        self.db_type = db_type
         self.db_manager = DatabaseManager(db_type)
+        self.importer = InventoryImporter(
+            DistributorInventory,
+            owner_field="DistributorId",
+            id_field="DistributorInventoryId",
+            calculate_status=self._calculate_status,
+            chunk_size=settings.inventory_import_chunk_size,
+            max_errors=settings.inventory_import_max_errors,
+        )
 
     # -------------------------------------------------------------
     # Utility: Calculate stock status
@@ -20,6 +58,43 @@ class DistributorInventoryManager:
             return "low"
         return "in"
 
+    @staticmethod
+    def _as_row(obj: DistributorInventory) -> dict:
+        return {c.name: getattr(obj, c.name) for c in _COLUMNS}
+
+    async def _change_stock(self, distributor_id: int, inventory_id: int, delta: int):
+        """
+        Apply a quantity delta with one conditional UPDATE ... RETURNING. Returns the
+        updated row, or None when the item is missing or the stock would go negative.
+        """
+        new_quantity = DistributorInventory.Quantity + delta
+        stmt = (
+            update(DistributorInventory)
+            .where(
+                DistributorInventory.DistributorInventoryId == inventory_id,
+                DistributorInventory.DistributorId == distributor_id,
+                new_quantity >= 0,
+            )
+            .values(Quantity=new_quantity, Status=stock_status_expression(DistributorInventory, new_quantity))
+            .returning(*_COLUMNS)
+        )
+        row = (await self.db_manager.execute(stmt)).mappings().first()
+        if row is not None:
+            old_status = self._calculate_status(row["Quantity"] - delta, row["MinStock"])
+            await distributor_stock_alerts.record(self.db_manager, [(row, old_status)])
+        return row
+
+    async def get_low_stock(self, distributor_id: int) -> List[dict]:
+        """Low / out-of-stock items for dashboards, served from the in-memory low-stock set."""
+        try:
+            await self.db_manager.connect()
+            return await distributor_stock_alerts.low_stock(self.db_manager, distributor_id)
+        except Exception as e:
+            logger.error(f"❌ Error fetching low stock for distributor {distributor_id}: {e}")
+            return []
+        finally:
+            await self.db_manager.disconnect()
+
     # -------------------------------------------------------------
     # Combined summary + list
     # -------------------------------------------------------------
@@ -48,6 +123,48 @@ class DistributorInventoryManager:
         finally:
             await self.db_manager.disconnect()
 
+    # -------------------------------------------------------------
+    # Filtered, paginated query
+    # -------------------------------------------------------------
+    async def query_inventory(
+        self,
+        distributor_id: int,
+        status: Optional[str] = None,
+        expiry_before: Optional[date] = None,
+        brand: Optional[str] = None,
+        batch: Optional[str] = None,
+        name_prefix: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> dict:
+        try:
+            await self.db_manager.connect()
+            filters = inventory_filters(
+                DistributorInventory, DistributorInventory.DistributorId, distributor_id,
+                status=status, expiry_before=expiry_before, brand=brand, batch=batch, name_prefix=name_prefix,
+            )
+            order = (DistributorInventory.ExpiryDate, DistributorInventory.DistributorInventoryId) if expiry_before else (DistributorInventory.DistributorInventoryId,)
+
+            total = (await self.db_manager.execute(
+                select(func.count()).select_from(DistributorInventory).where(*filters)
+            )).scalar_one()
+            result = await self.db_manager.execute(
+                select(DistributorInventory).where(*filters).order_by(*order).limit(limit).offset(offset)
+            )
+            items = [DistributorInventoryRead.from_orm(i).dict() for i in result.scalars().all()]
+
+            return {
+                "Total": total,
+                "Limit": limit,
+                "Offset": offset,
+                "Items": items
+            }
+        except Exception as e:
+            logger.error(f"❌ Error querying inventory for distributor {distributor_id}: {e}")
+            return {"success": False, "message": str(e)}
+        finally:
+            await self.db_manager.disconnect()
+
     # -------------------------------------------------------------
     # CRUD Operations
     # -------------------------------------------------------------
@@ -56,6 +173,7 @@ class DistributorInventoryManager:
             await self.db_manager.connect()
             data["Status"] = self._calculate_status(data["Quantity"], data.get("MinStock"))
             obj = await self.db_manager.create(DistributorInventory, data)
+            await distributor_stock_alerts.record(self.db_manager, [(self._as_row(obj), None)])
 
             logger.info(f"✅ Created DistributorInventory {obj.DistributorInventoryId}")
             return {"success": True, "DistributorInventoryId": obj.DistributorInventoryId}
@@ -99,10 +217,19 @@ class DistributorInventoryManager:
 
             data["Status"] = self._calculate_status(q, m)
 
-            rows = await self.db_manager.update(
-                DistributorInventory,
-                {"DistributorInventoryId": inventory_id, "DistributorId": distributor_id},
-                data,
+            result = await self.db_manager.execute(
+                update(DistributorInventory)
+                .where(
+                    DistributorInventory.DistributorInventoryId == inventory_id,
+                    DistributorInventory.DistributorId == distributor_id,
+                )
+                .values(**data)
+                .returning(*_COLUMNS)
+            )
+            updated = result.mappings().all()
+            rows = len(updated)
+            await distributor_stock_alerts.record(
+                self.db_manager, [(row, self._calculate_status(inv.Quantity, inv.MinStock)) for row in updated]
             )
 
             return {"success": True, "rows_affected": rows}
@@ -122,6 +249,7 @@ class DistributorInventoryManager:
             )
 
             if rows:
+                distributor_stock_alerts.forget(distributor_id, inventory_id)
                 return {"success": True, "rows_affected": rows}
             return {"success": False, "message": "Inventory not found"}
 
@@ -137,28 +265,15 @@ class DistributorInventoryManager:
     async def reduce_stock(self, distributor_id: int, inventory_id: int, qty: int):
         try:
             await self.db_manager.connect()
-            items = await self.db_manager.read(
-                DistributorInventory,
-                {"DistributorInventoryId": inventory_id, "DistributorId": distributor_id},
-            )
+            row = await self._change_stock(distributor_id, inventory_id, -qty)
+            if row is None:
+                items = await self.db_manager.read(
+                    DistributorInventory,
+                    {"DistributorInventoryId": inventory_id, "DistributorId": distributor_id},
+                )
+                return {"success": False, "message": "Not enough stock" if items else "Item not found"}
 
-            if not items:
-                return {"success": False, "message": "Item not found"}
-
-            item = items[0]
-            if item.Quantity < qty:
-                return {"success": False, "message": "Not enough stock"}
-
-            new_qty = item.Quantity - qty
-            new_status = self._calculate_status(new_qty, item.MinStock)
-
-            await self.db_manager.update(
-                DistributorInventory,
-                {"DistributorInventoryId": inventory_id},
-                {"Quantity": new_qty, "Status": new_status},
-            )
-
-            return {"success": True, "NewQuantity": new_qty}
+            return {"success": True, "NewQuantity": row["Quantity"]}
 
         except Exception as e:
             logger.error(f"❌ Error reducing distributor stock: {e}")
@@ -169,28 +284,100 @@ class DistributorInventoryManager:
     async def add_stock(self, distributor_id: int, inventory_id: int, qty: int):
         try:
             await self.db_manager.connect()
-            items = await self.db_manager.read(
-                DistributorInventory,
-                {"DistributorInventoryId": inventory_id, "DistributorId": distributor_id},
-            )
-
-            if not items:
+            row = await self._change_stock(distributor_id, inventory_id, qty)
+            if row is None:
                 return {"success": False, "message": "Item not found"}
 
-            item = items[0]
-            new_qty = item.Quantity + qty
-            new_status = self._calculate_status(new_qty, item.MinStock)
+            return {"success": True, "NewQuantity": row["Quantity"]}
 
-            await self.db_manager.update(
-                DistributorInventory,
-                {"DistributorInventoryId": inventory_id},
-                {"Quantity": new_qty, "Status": new_status},
+        except Exception as e:
+            logger.error(f"❌ Error increasing distributor stock: {e}")
+            return {"success": False, "message": str(e)}
+        finally:
+            await self.db_manager.disconnect()
+
+    # -------------------------------------------------------------
+    # Bulk import (CSV / JSON lines)
+    # -------------------------------------------------------------
+    async def import_inventory(self, distributor_id: int, upload: UploadFile, fmt: str) -> dict:
+        """Upsert every row of the file on (DistributorId, MedicineName, Batch); see utils/inventory_import.py."""
+        try:
+            await self.db_manager.connect()
+            report = await self.importer.run(self.db_manager, distributor_id, upload, fmt)
+            distributor_stock_alerts.invalidate(distributor_id)
+            logger.info(
+                f"📥 Imported inventory for distributor {distributor_id}: "
+                f"{report['Inserted']} inserted, {report['Updated']} updated, {report['Failed']} failed"
             )
+            return {"success": True, "message": "Inventory imported", **report}
+        except Exception as e:
+            logger.error(f"❌ Error importing inventory for distributor {distributor_id}: {e}")
+            return {"success": False, "message": str(e)}
+        finally:
+            await self.db_manager.disconnect()
 
-            return {"success": True, "NewQuantity": new_qty}
+    # -------------------------------------------------------------
+    # FEFO allocation across batches
+    # -------------------------------------------------------------
+    async def allocate_stock(self, distributor_id: int, lines: List[Tuple[str, int]]) -> dict:
+        """
+        Take each (MedicineName, Quantity) line from the batches that expire first,
+        in one transaction. Nothing is written when any line is short.
+        """
+        try:
+            await self.db_manager.connect()
+            async with self.db_manager.transaction() as session:
+                allocations, changes = await distributor_allocator.allocate(session, distributor_id, lines, ist_now().date())
+
+            await distributor_stock_alerts.record(self.db_manager, [
+                (
+                    {**row, "Status": self._calculate_status(row["Quantity"], row["MinStock"])},
+                    self._calculate_status(row["Quantity"] + take, row["MinStock"]),
+                )
+                for row, take in changes
+            ])
+            logger.info(f"📦 Allocated {len(allocations)} line(s) across {len(changes)} batch(es) for distributor {distributor_id}")
+            return {"success": True, "message": "Stock allocated", "Allocations": allocations}
+        except InsufficientStockException as e:
+            return {"success": False, "message": "Insufficient stock", "Shortages": e.shortages}
+        except StockConflictException as e:
+            logger.warning(f"⚠️ Allocation conflict for distributor {distributor_id}: {e}")
+            return {"success": False, "message": str(e)}
+        except Exception as e:
+            logger.error(f"❌ Error allocating stock for distributor {distributor_id}: {e}")
+            return {"success": False, "message": str(e)}
+        finally:
+            await self.db_manager.disconnect()
 
+    async def mark_expired_stock(self, distributor_id: Optional[int] = None) -> dict:
+        """Mark expired items as out of stock with one set-based UPDATE."""
+        try:
+            await self.db_manager.connect()
+            stmt = (
+                update(DistributorInventory)
+                .where(
+                    DistributorInventory.ExpiryDate < ist_now().date(),
+                    or_(DistributorInventory.Quantity != 0, DistributorInventory.Status != "no"),
+                )
+                .values(Quantity=0, Status="no")
+                .returning(*_COLUMNS)
+            )
+            if distributor_id:
+                stmt = stmt.where(DistributorInventory.DistributorId == distributor_id)
+            expired = (await self.db_manager.execute(stmt)).mappings().all()
+            count = len(expired)
+            await distributor_stock_alerts.record(self.db_manager, [(row, None) for row in expired], reason="Batch expired.")
+
+            logger.info(f"⚠️ Marked {count} items expired for distributor {distributor_id or 'ALL'}.")
+            return {"success": True, "message": f"Marked {count} expired items"}
         except Exception as e:
-            logger.error(f"❌ Error increasing distributor stock: {e}")
+            logger.error(f"❌ Error marking expired distributor stock: {e}")
             return {"success": False, "message": str(e)}
         finally:
             await self.db_manager.disconnect()
+
+    # ------------------------------------------------------------
+    # 📤 Export
+    # ------------------------------------------------------------
+    def export_inventory(self, distributor_id: int, fmt: str) -> AsyncIterator[bytes]:
+        return stream_rows(self.db_type, DistributorInventory, [DistributorInventory.DistributorId == distributor_id], fmt, settings.export_chunk_size)
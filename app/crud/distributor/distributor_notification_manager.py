@@ -1,5 +1,8 @@
-from ...utils.timezone import ist_now
+from ...utils.timezone import ist_now, to_ist
 from typing import Optional, List
+from datetime import datetime
+from sqlalchemy import delete, select, update
+from ...config import settings
 from ...db.base.database_manager import DatabaseManager
 from ...models.distributor.distributor_notification_model import DistributorNotification
 from ...schemas.distributor.distributor_notification_schema import (
@@ -7,9 +10,26 @@ from ...schemas.distributor.distributor_notification_schema import (
     DistributorNotificationUpdate
 )
 from ...utils.logger import get_logger
+from ...utils.notification_counters import NotificationCounters
+from ...utils.event_hub import event_hub
 
 logger = get_logger(__name__)
 
+# Per-distributor inbox counters, shared by every manager instance
+distributor_notification_counters = NotificationCounters(
+    DistributorNotification,
+    owner_field="DistributorId",
+    max_accounts=settings.notification_counter_max_accounts,
+    ttl_seconds=settings.notification_counter_ttl_seconds,
+)
+
+
+def distributor_notifications_inserted(rows: List[dict]) -> None:
+    """Every DistributorNotification insert reports here: counters first, then the push to connected apps."""
+    distributor_notification_counters.added(rows)
+    for row in rows:
+        event_hub.publish("distributor", row["DistributorId"], "notification", row)
+
 
 class DistributorNotificationManager:
     def __init__(self, db_type: str):
@@ -23,7 +43,9 @@ class DistributorNotificationManager:
             await self.db_manager.connect()
             data = notification.dict()
             data["Date"] = ist_now()
-            await self.db_manager.create(DistributorNotification, data)
+            created = await self.db_manager.create(DistributorNotification, data)
+            data["NotificationId"] = created.NotificationId
+            distributor_notifications_inserted([data])
 
             logger.info(f"✅ Distributor Notification created: {data['Title']}")
             return {"success": True, "message": "Notification created successfully"}
@@ -36,22 +58,37 @@ class DistributorNotificationManager:
     # ------------------------------------------------------------
     # 🟡 Get All Notifications (by distributor)
     # ------------------------------------------------------------
-    async def get_notifications(self, distributor_id: int) -> dict:
+    async def get_notifications(
+        self,
+        distributor_id: int,
+        limit: int = 50,
+        before_id: Optional[int] = None,
+        unread_only: bool = False,
+    ) -> dict:
+        """
+        Newest-first page of the inbox plus the cached counters. Pages are keyset
+        based: pass the returned NextBeforeId to get the next (older) page.
+        """
         try:
             await self.db_manager.connect()
-            notifications = await self.db_manager.read(
-                DistributorNotification, {"DistributorId": distributor_id}
+            filters = [DistributorNotification.DistributorId == distributor_id]
+            if unread_only:
+                filters.append(DistributorNotification.IsRead.is_not(True))
+            if before_id is not None:
+                filters.append(DistributorNotification.NotificationId < before_id)
+            result = await self.db_manager.execute(
+                select(*DistributorNotification.__table__.c)
+                .where(*filters)
+                .order_by(DistributorNotification.NotificationId.desc())
+                .limit(limit)
             )
-            total = len(notifications)
-            unread = len([n for n in notifications if not n.IsRead])
-            order_related = len([n for n in notifications if "order" in n.Type.lower()])
-            stock_related = len([n for n in notifications if "stock" in n.Type.lower()])
+            notifications = [dict(row) for row in result.mappings().all()]
+            counts = await distributor_notification_counters.counts(self.db_manager, distributor_id)
 
             return {
-                "Total": total,
-                "Unread": unread,
-                "Orders": order_related,
-                "StockAlerts": stock_related,
+                **counts,
+                "Limit": limit,
+                "NextBeforeId": notifications[-1]["NotificationId"] if len(notifications) == limit else None,
                 "Notifications": notifications,
             }
         except Exception as e:
@@ -60,16 +97,41 @@ class DistributorNotificationManager:
         finally:
             await self.db_manager.disconnect()
 
+    # ------------------------------------------------------------
+    # 🔢 Inbox Counters (cheap enough to poll)
+    # ------------------------------------------------------------
+    async def get_counts(self, distributor_id: int) -> dict:
+        try:
+            await self.db_manager.connect()
+            return await distributor_notification_counters.counts(self.db_manager, distributor_id)
+        except Exception as e:
+            logger.error(f"❌ Error fetching notification counts for distributor {distributor_id}: {e}")
+            return {"success": False, "message": f"Error fetching notification counts: {e}"}
+        finally:
+            await self.db_manager.disconnect()
+
     # ------------------------------------------------------------
     # 🟠 Mark Notification as Read
     # ------------------------------------------------------------
     async def mark_as_read(self, notification_id: int) -> dict:
         try:
             await self.db_manager.connect()
-            rowcount = await self.db_manager.update(
-                DistributorNotification, {"NotificationId": notification_id}, {"IsRead": True}
+            result = await self.db_manager.execute(
+                update(DistributorNotification)
+                .where(DistributorNotification.NotificationId == notification_id, DistributorNotification.IsRead.is_not(True))
+                .values(IsRead=True)
+                .returning(DistributorNotification.DistributorId)
             )
-            if rowcount:
+            row = result.first()
+            if row:
+                distributor_notification_counters.read(row[0], 1)
+            else:
+                # Already read is still a success, only a missing id is not
+                result = await self.db_manager.execute(
+                    select(DistributorNotification.NotificationId).where(DistributorNotification.NotificationId == notification_id)
+                )
+                row = result.first()
+            if row:
                 logger.info(f"✅ Distributor Notification {notification_id} marked as read")
                 return {"success": True, "message": "Notification marked as read"}
             return {"success": False, "message": "Notification not found"}
@@ -79,16 +141,48 @@ class DistributorNotificationManager:
         finally:
             await self.db_manager.disconnect()
 
+    # ------------------------------------------------------------
+    # 🟠 Mark Many Notifications as Read
+    # ------------------------------------------------------------
+    async def mark_many_as_read(
+        self,
+        distributor_id: int,
+        notification_ids: Optional[List[int]] = None,
+        before: Optional[datetime] = None,
+    ) -> dict:
+        """One UPDATE for an id list or for everything dated at or before `before`."""
+        try:
+            await self.db_manager.connect()
+            filters = [DistributorNotification.DistributorId == distributor_id, DistributorNotification.IsRead.is_not(True)]
+            if notification_ids:
+                filters.append(DistributorNotification.NotificationId.in_(notification_ids))
+            if before is not None:
+                filters.append(DistributorNotification.Date <= to_ist(before))
+            result = await self.db_manager.execute(update(DistributorNotification).where(*filters).values(IsRead=True))
+            distributor_notification_counters.read(distributor_id, result.rowcount)
+
+            logger.info(f"✅ Marked {result.rowcount} notification(s) as read for distributor {distributor_id}")
+            return {"success": True, "message": f"Marked {result.rowcount} notifications as read", "Updated": result.rowcount}
+        except Exception as e:
+            logger.error(f"❌ Error marking notifications as read for distributor {distributor_id}: {e}")
+            return {"success": False, "message": f"Error marking notifications as read: {e}"}
+        finally:
+            await self.db_manager.disconnect()
+
     # ------------------------------------------------------------
     # 🔴 Delete Notification
     # ------------------------------------------------------------
     async def delete_notification(self, notification_id: int) -> dict:
         try:
             await self.db_manager.connect()
-            rowcount = await self.db_manager.delete(
-                DistributorNotification, {"NotificationId": notification_id}
+            result = await self.db_manager.execute(
+                delete(DistributorNotification)
+                .where(DistributorNotification.NotificationId == notification_id)
+                .returning(DistributorNotification.DistributorId)
             )
-            if rowcount:
+            row = result.first()
+            if row:
+                distributor_notification_counters.invalidate(row[0])
                 logger.info(f"🗑️ Distributor Notification {notification_id} deleted")
                 return {"success": True, "message": "Notification deleted successfully"}
             return {"success": False, "message": "Notification not found"}
@@ -107,6 +201,7 @@ class DistributorNotificationManager:
             rowcount = await self.db_manager.delete(
                 DistributorNotification, {"DistributorId": distributor_id}
             )
+            distributor_notification_counters.invalidate(distributor_id)
             if rowcount:
                 logger.info(f"🧹 Deleted all notifications for Distributor {distributor_id}")
                 return {"success": True, "message": f"Deleted {rowcount} notifications"}
@@ -1,6 +1,8 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator
 from ...utils.timezone import ist_now
 from ...utils.logger import get_logger
+from ...config import settings
+from ...utils.data_export import stream_rows
 from ...db.base.database_manager import DatabaseManager
 from ...models.distributor.pharma_order_model import PharmaOrder, PharmaOrderItem
 from ...models.distributor.distributor_model import Distributor
@@ -15,6 +17,7 @@ logger = get_logger(__name__)
 
 class PharmaOrderManager:
     def __init__(self, db_type: str):
+        self.db_type = db_type
         self.db_manager = DatabaseManager(db_type)
 
     # ------------------------------------------------------------
@@ -237,3 +240,9 @@ class PharmaOrderManager:
             return {"success": False, "message": f"Error deleting order: {e}"}
         finally:
             await self.db_manager.disconnect()
+
+    # ------------------------------------------------------------
+    # 📤 Export (by distributor)
+    # ------------------------------------------------------------
+    def export_orders_by_distributor(self, distributor_id: int, fmt: str) -> AsyncIterator[bytes]:
+        return stream_rows(self.db_type, PharmaOrder, [PharmaOrder.DistributorId == distributor_id], fmt, settings.export_chunk_size)
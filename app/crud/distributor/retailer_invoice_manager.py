@@ -1,5 +1,13 @@
-from typing import List, Optional
+import asyncio
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, AsyncIterator, Tuple
+from sqlalchemy import select
 from ...utils.timezone import ist_now
+from ...config import settings
+from ...utils.logger import get_logger
+from ...utils.data_export import stream_rows
+from ...utils.pdf_cache import invoice_pdf_cache, content_hash
+from ...utils.pdf_renderer import invoice_pdf, PdfRendererBusy
 from ...db.base.database_manager import DatabaseManager
 from ...models.retailer.retailer_model import Retailer
 from ...models.distributor.distributor_model import Distributor
@@ -11,9 +19,12 @@ from ...schemas.distributor.retailer_invoice_schema import (
     RetailerInvoiceRead,
 )   
 
+logger = get_logger(__name__)
+
 
 class RetailerInvoiceManager:
     def __init__(self, db_type: str):
+        self.db_type = db_type
         self.db_manager = DatabaseManager(db_type)
 
     async def create_invoice(self, invoice: RetailerInvoiceCreate) -> dict:
@@ -37,12 +48,17 @@ class RetailerInvoiceManager:
                 item_data["TotalAmount"] = (item.Price or 0) * (item.Quantity or 0)
                 await self.db_manager.create(RetailerInvoiceItem, item_data)
 
+            # Freeze the document as issued (see get_invoice)
+            snapshot = await self._build_document(new_invoice)
+            await self.db_manager.update(RetailerInvoice, {"InvoiceId": invoice_id}, {"Snapshot": snapshot})
+
             return {"success": True, "message": "Invoice created successfully", "InvoiceId": invoice_id}
 
         finally:
             await self.db_manager.disconnect()
 
     async def get_invoice(self, invoice_id: int) -> dict:
+        """The invoice document as issued: one primary-key read of its snapshot."""
         await self.db_manager.connect()
         try:
             invoices = await self.db_manager.read(RetailerInvoice, {"InvoiceId": invoice_id})
@@ -50,95 +66,121 @@ class RetailerInvoiceManager:
                 return {"success": False, "message": "Invoice not found"}
 
             invoice = invoices[0]
+            if invoice.Snapshot:
+                return invoice.Snapshot
 
-            # Fetch order
-            orders = await self.db_manager.read(RetailerOrder, {"OrderId": invoice.OrderId})
-            order = orders[0] if orders else None
-
-            # Fetch retailer
-            retailers = await self.db_manager.read(Retailer, {"RetailerId": order.RetailerId}) if order else []
-            retailer = retailers[0] if retailers else None
-
-            # Fetch distributor
-            distributors = await self.db_manager.read(Distributor, {"DistributorId": invoice.DistributorId})
-            distributor = distributors[0] if distributors else None
-
-            # Fetch invoice items
-            items = await self.db_manager.read(RetailerInvoiceItem, {"InvoiceId": invoice_id})
-
-            item_list = []
-            total_amount = 0
-
-            for item in items:
-                gst_rate = 5
-                gst_amount = ((item.Price or 0) * gst_rate) / 100
-                total = (item.Price or 0) * (item.Quantity or 0) + gst_amount
-
-                total_amount += total
-
-                item_list.append({
-                    "ItemId": item.ItemId,
-                    "Medicine": item.MedicineName,
-                    "Quantity": item.Quantity,
-                    "UnitPrice": item.Price,
-                    "GST": "5%",
-                    "GSTAmount": round(gst_amount, 2),
-                    "Total": round(total, 2)
-                })
-
-            response = {
-                "InvoiceNo": f"INV-{invoice.InvoiceDate.year}-{invoice.InvoiceId}",
-
-                "RetailerDetails": {
-                    "Name": retailer.OwnerName if retailer else None,
-                    "Address": f"{retailer.AddressLine1}, {retailer.City}, {retailer.State} - {retailer.PostalCode}" if retailer else None,
-                    "Contact": retailer.PhoneNumber if retailer else None,
-                    "Email": retailer.Email if retailer else None,
-                    "OrderID": f"ORD-{invoice.OrderId}",
-                    "OrderDate": order.OrderDateTime.strftime("%d/%m/%Y") if order else None,
-                    "ExpectedDelivery": order.ExpectedDelivery.strftime("%d/%m/%Y") if order and order.ExpectedDelivery else None
-                },
-
-                "OrderSummary": {
-                    "Items": item_list,
-                    "TotalAmount": round(total_amount, 2)
-                },
-
-                "PaymentAndDelivery": {
-                    "PaymentMode": invoice.PaymentMode,
-                    "PaymentStatus": invoice.PaymentStatus,
-                    "DeliveryMethod": order.DeliveryMode if order else None,
-                    "DeliveryPartner": order.DeliveryService if order else None
-                },
-
-                "DistributorDetails": {
-                    "DistributorName": distributor.CompanyName if distributor else None,
-                    "Address": f"{distributor.AddressLine1}, {distributor.City}, {distributor.State}" if distributor else None,
-                    "LicenseNo": distributor.LicenseNumber if distributor else None,
-                    "GSTIN": distributor.GSTNumber if distributor else None,
-                    "Support": {
-                        "Phone": distributor.PhoneNumber if distributor else None,
-                        "Email": distributor.Email if distributor else None
-                    }
-                },
-
-                "FooterNotes": [
-                    "All medicines are sold under valid license and verified prescriptions.",
-                    "Prices include applicable taxes (GST @5%).",
-                    "For replacement or issues, contact support within 24 hours of delivery."
-                ]
-            }
-
-            return response
+            # Invoices from before snapshots: build once, then keep it
+            document = await self._build_document(invoice)
+            await self.db_manager.update(RetailerInvoice, {"InvoiceId": invoice_id}, {"Snapshot": document})
+            return document
 
         finally:
             await self.db_manager.disconnect()
 
+    async def _build_document(self, invoice: RetailerInvoice) -> dict:
+        """
+        Full invoice document (parties, lines with GST, totals) from the
+        current order / retailer / distributor / item rows. Stored as the
+        invoice's Snapshot when it is created, so later edits to those rows
+        do not change an issued invoice. Needs a connected db_manager.
+        """
+        invoice_id = invoice.InvoiceId
+
+        # Fetch order
+        orders = await self.db_manager.read(RetailerOrder, {"OrderId": invoice.OrderId})
+        order = orders[0] if orders else None
+
+        # Fetch retailer
+        retailers = await self.db_manager.read(Retailer, {"RetailerId": order.RetailerId}) if order else []
+        retailer = retailers[0] if retailers else None
+
+        # Fetch distributor
+        distributors = await self.db_manager.read(Distributor, {"DistributorId": invoice.DistributorId})
+        distributor = distributors[0] if distributors else None
+
+        # Fetch invoice items
+        items = await self.db_manager.read(RetailerInvoiceItem, {"InvoiceId": invoice_id})
+
+        item_list = []
+        total_amount = 0
+
+        for item in items:
+            gst_rate = 5
+            gst_amount = ((item.Price or 0) * gst_rate) / 100
+            total = (item.Price or 0) * (item.Quantity or 0) + gst_amount
+
+            total_amount += total
+
+            item_list.append({
+                "ItemId": item.ItemId,
+                "Medicine": item.MedicineName,
+                "Quantity": item.Quantity,
+                "UnitPrice": item.Price,
+                "GST": "5%",
+                "GSTAmount": round(gst_amount, 2),
+                "Total": round(total, 2)
+            })
+
+        response = {
+            "InvoiceNo": f"INV-{invoice.InvoiceDate.year}-{invoice.InvoiceId}",
+
+            "RetailerDetails": {
+                "Name": retailer.OwnerName if retailer else None,
+                "Address": f"{retailer.AddressLine1}, {retailer.City}, {retailer.State} - {retailer.PostalCode}" if retailer else None,
+                "Contact": retailer.PhoneNumber if retailer else None,
+                "Email": retailer.Email if retailer else None,
+                "OrderID": f"ORD-{invoice.OrderId}",
+                "OrderDate": order.OrderDateTime.strftime("%d/%m/%Y") if order else None,
+                "ExpectedDelivery": order.ExpectedDelivery.strftime("%d/%m/%Y") if order and order.ExpectedDelivery else None
+            },
+
+            "OrderSummary": {
+                "Items": item_list,
+                "TotalAmount": round(total_amount, 2)
+            },
+
+            "PaymentAndDelivery": {
+                "PaymentMode": invoice.PaymentMode,
+                "PaymentStatus": invoice.PaymentStatus,
+                "DeliveryMethod": order.DeliveryMode if order else None,
+                "DeliveryPartner": order.DeliveryService if order else None
+            },
+
+            "DistributorDetails": {
+                "DistributorName": distributor.CompanyName if distributor else None,
+                "Address": f"{distributor.AddressLine1}, {distributor.City}, {distributor.State}" if distributor else None,
+                "LicenseNo": distributor.LicenseNumber if distributor else None,
+                "GSTIN": distributor.GSTNumber if distributor else None,
+                "Support": {
+                    "Phone": distributor.PhoneNumber if distributor else None,
+                    "Email": distributor.Email if distributor else None
+                }
+            },
+
+            "FooterNotes": [
+                "All medicines are sold under valid license and verified prescriptions.",
+                "Prices include applicable taxes (GST @5%).",
+                "For replacement or issues, contact support within 24 hours of delivery."
+            ]
+        }
+
+        return response
+
     async def update_invoice(self, invoice_id: int, data: RetailerInvoiceUpdate) -> dict:
         await self.db_manager.connect()
         try:
-            rowcount = await self.db_manager.update(RetailerInvoice, {"InvoiceId": invoice_id}, data.dict(exclude_unset=True))
+            update_data = data.dict(exclude_unset=True)
+            # Payment details are the only part of an issued invoice document that may change
+            payment = {k: update_data[k] for k in ("PaymentMode", "PaymentStatus") if k in update_data}
+            if payment:
+                invoices = await self.db_manager.read(RetailerInvoice, {"InvoiceId": invoice_id})
+                if invoices and invoices[0].Snapshot:
+                    snapshot = dict(invoices[0].Snapshot)
+                    snapshot["PaymentAndDelivery"] = {**(snapshot.get("PaymentAndDelivery") or {}), **payment}
+                    update_data["Snapshot"] = snapshot
+            rowcount = await self.db_manager.update(RetailerInvoice, {"InvoiceId": invoice_id}, update_data)
             if rowcount:
+                await invoice_pdf_cache.invalidate(f"invoice_{invoice_id}")
                 return {"success": True, "message": "Invoice updated successfully"}
             return {"success": False, "message": "Invoice not found or no changes made"}
         finally:
@@ -155,7 +197,11 @@ class RetailerInvoiceManager:
             pending = len([i for i in invoices if i.PaymentStatus == "Pending"])
             cancelled = len([i for i in invoices if i.PaymentStatus == "Cancelled"])
             overdue = len([i for i in invoices if i.PaymentStatus == "Overdue"])
-            invoice_data = [i.__dict__ for i in invoices]
+            # The frozen document (Snapshot) is only served by get_invoice / the PDF
+            invoice_data = [
+                {k: v for k, v in i.__dict__.items() if k != "Snapshot"}
+                for i in invoices
+            ]
 
             return {
                 "TotalInvoices": total_invoices,
@@ -181,6 +227,7 @@ class RetailerInvoiceManager:
             rowcount = await self.db_manager.delete(RetailerInvoice, {"InvoiceId": invoice_id})
 
             if rowcount:
+                await invoice_pdf_cache.invalidate(f"invoice_{invoice_id}")
                 return {"success": True, "message": "Invoice deleted successfully"}
             return {"success": False, "message": "Invoice not found"}
 
@@ -204,6 +251,9 @@ class RetailerInvoiceManager:
             # Delete invoices
             rowcount = await self.db_manager.delete(RetailerInvoice, {"DistributorId": distributor_id})
 
+            for inv_id in invoice_ids:
+                await invoice_pdf_cache.invalidate(f"invoice_{inv_id}")
+
             return {
                 "success": True,
                 "message": f"Deleted {rowcount} invoices for distributor {distributor_id}",
@@ -212,5 +262,95 @@ class RetailerInvoiceManager:
         finally:
             await self.db_manager.disconnect()
 
+    # ------------------------------------------------------------
+    # 📤 Export
+    # ------------------------------------------------------------
+    def export_invoices(self, distributor_id: int, fmt: str) -> AsyncIterator[bytes]:
+        columns = [c for c in RetailerInvoice.__table__.c if c.key != "Snapshot"]
+        return stream_rows(
+            self.db_type, RetailerInvoice, [RetailerInvoice.DistributorId == distributor_id], fmt, settings.export_chunk_size, columns
+        )
+
+    # ------------------------------------------------------------
+    # 🗜️ Bulk PDFs
+    # ------------------------------------------------------------
+    async def invoice_ids(
+        self,
+        distributor_id: int,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        ids: Optional[List[int]] = None,
+        limit: int = 1000,
+    ) -> List[int]:
+        """Ids of the distributor's invoices dated within [from_date, to_date] and/or in ids."""
+        filters = [RetailerInvoice.DistributorId == distributor_id]
+        if from_date:
+            filters.append(RetailerInvoice.InvoiceDate >= datetime.combine(from_date, time.min))
+        if to_date:
+            filters.append(RetailerInvoice.InvoiceDate < datetime.combine(to_date + timedelta(days=1), time.min))
+        if ids:
+            filters.append(RetailerInvoice.InvoiceId.in_(ids))
+        await self.db_manager.connect()
+        try:
+            result = await self.db_manager.execute(
+                select(RetailerInvoice.InvoiceId).where(*filters).order_by(RetailerInvoice.InvoiceId).limit(limit)
+            )
+            return list(result.scalars().all())
+        finally:
+            await self.db_manager.disconnect()
 
+    async def _invoice_pdf(self, invoice_id: int, invoice: dict) -> bytes:
+        # Same cache entry as GET /distributor/invoices/{id}/pdf, so re-downloads are cheap.
+        # wait=True: bulk renders queue for their own slots instead of failing when busy
+        key = (f"invoice_{invoice_id}", content_hash(invoice, invoice_pdf.template_version))
+        try:
+            cached = await invoice_pdf_cache.get_or_create(*key, lambda: invoice_pdf.render({"invoice": invoice}, wait=True))
+        except PdfRendererBusy:
+            # Joined an interactive render of the same invoice that was turned away; render it ourselves
+            cached = await invoice_pdf_cache.get_or_create(*key, lambda: invoice_pdf.render({"invoice": invoice}, wait=True))
+        return cached.content
+
+    async def export_invoice_pdfs(self, invoice_ids: List[int], concurrency: int = 2) -> AsyncIterator[Tuple[str, bytes]]:
+        """
+        Yield (filename, PDF bytes) per invoice in the order renders finish,
+        with at most `concurrency` renders in flight, so memory stays bounded
+        however many invoices are requested. Invoice data is loaded one at a
+        time while earlier ones render. Invoices that fail are skipped and
+        listed in a final errors.txt instead of breaking the download.
+        Uses its own connection because the stream outlives the request handler.
+        """
+        loader = RetailerInvoiceManager(self.db_type)
+        pending = {}
+        failed = []
+
+        async def finished(wait_for_all: bool):
+            done, _ = await asyncio.wait(
+                pending, return_when=asyncio.ALL_COMPLETED if wait_for_all else asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                invoice_id = pending.pop(task)
+                try:
+                    yield f"invoice_{invoice_id}.pdf", task.result()
+                except Exception as e:
+                    logger.error(f"❌ Bulk PDF for invoice {invoice_id} failed: {e}")
+                    failed.append(f"invoice {invoice_id}: {e}")
 
+        try:
+            for invoice_id in invoice_ids:
+                while len(pending) >= concurrency:
+                    async for entry in finished(False):
+                        yield entry
+                invoice = await loader.get_invoice(invoice_id)
+                if invoice.get("success") is False:
+                    failed.append(f"invoice {invoice_id}: {invoice.get('message')}")
+                    continue
+                pending[asyncio.create_task(self._invoice_pdf(invoice_id, invoice))] = invoice_id
+            if pending:
+                async for entry in finished(True):
+                    yield entry
+            if failed:
+                yield "errors.txt", ("\n".join(failed) + "\n").encode("utf-8")
+            logger.info(f"🗜️ Bulk invoice PDFs: {len(invoice_ids) - len(failed)} sent, {len(failed)} failed")
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,69 @@
+from typing import List, Optional
+from sqlalchemy import select
+from ...config import settings
+from ...utils.logger import get_logger
+from ...utils.prefix_index import AutocompleteIndex, PrefixIndex
+from ...db.base.database_manager import DatabaseManager
+from ...models.retailer.medicine_model import Medicine
+from ...models.retailer.retailer_inventory_model import RetailerInventory
+
+logger = get_logger(__name__)
+
+# Shared by every manager instance; MedicineManager and RetailerInventoryManager
+# push their writes into it so suggestions never need a reload.
+autocomplete_index = AutocompleteIndex(max_retailers=settings.autocomplete_max_retailers)
+
+SCOPES = ("medicine", "inventory", "all")
+
+
+class AutocompleteManager:
+    def __init__(self, db_type: str):
+        self.db_manager = DatabaseManager(db_type)
+
+    async def _load(self, statement) -> List[tuple]:
+        try:
+            await self.db_manager.connect()
+            result = await self.db_manager.execute(statement)
+            return [tuple(row) for row in result.all()]
+        finally:
+            await self.db_manager.disconnect()
+
+    async def _load_medicines(self) -> List[tuple]:
+        rows = await self._load(select(Medicine.MedicineId, Medicine.MedicineName))
+        logger.info(f"🔤 Loaded medicine autocomplete index ({len(rows)} names)")
+        return rows
+
+    async def _load_inventory(self, retailer_id: int) -> List[tuple]:
+        rows = await self._load(
+            select(RetailerInventory.RetailerInventoryId, RetailerInventory.MedicineName)
+            .where(RetailerInventory.RetailerId == retailer_id)
+        )
+        logger.info(f"🔤 Loaded inventory autocomplete index for retailer {retailer_id} ({len(rows)} names)")
+        return rows
+
+    async def suggest(self, prefix: str, scope: str = "all", retailer_id: Optional[int] = None, limit: int = 10) -> dict:
+        """
+        Names starting with prefix. scope="inventory" needs retailer_id; with
+        scope="all" the retailer's own stock is listed ahead of the catalog.
+        """
+        try:
+            suggestions: List[str] = []
+            if scope in ("inventory", "all") and retailer_id is not None:
+                index = await autocomplete_index.retailer(retailer_id, lambda: self._load_inventory(retailer_id))
+                suggestions.extend(index.suggest(prefix, limit))
+
+            if scope in ("medicine", "all") and len(suggestions) < limit:
+                index = await autocomplete_index.medicine(self._load_medicines)
+                seen = {PrefixIndex.normalize(s) for s in suggestions}
+                for name in index.suggest(prefix, limit):
+                    if len(suggestions) >= limit:
+                        break
+                    key = PrefixIndex.normalize(name)
+                    if key not in seen:
+                        seen.add(key)
+                        suggestions.append(name)
+
+            return {"success": True, "message": "Suggestions fetched successfully", "data": suggestions}
+        except Exception as e:
+            logger.error(f"❌ Error fetching autocomplete suggestions for {prefix!r}: {e}")
+            return {"success": False, "message": str(e)}
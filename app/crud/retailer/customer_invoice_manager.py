@@ -1,6 +1,9 @@
-from typing import List, Optional
-import httpx
+from typing import List, Optional, AsyncIterator
 from ...utils.timezone import ist_now
+from ...config import settings
+from ...utils.data_export import stream_rows
+from ...utils.http_client import upstream
+from ...utils.concurrency import gather_or_cancel
 from ...db.base.database_manager import DatabaseManager
 from ...models.retailer.retailer_model import Retailer
 from ...models.retailer.customer_invoice_model import CustomerInvoice, CustomerInvoiceItem
@@ -11,16 +14,13 @@ from ...schemas.retailer.customer_invoice_schema import (
 )
 
 
-# Local
-# GET_ORDER_BASE_URL = "http://127.0.0.1:8000/orders/"
-# GET_CUSTOMER_BASE_URL = "http://127.0.0.1:8000/customers/"
-
-# Prod
-GET_ORDER_BASE_URL = "http://151.185.41.194:8000/orders/"
-GET_CUSTOMER_BASE_URL = "http://151.185.41.194:8000/customers/"
+# Paths on settings.upstream_base_url (UPSTREAM_BASE_URL=http://127.0.0.1:8000 for local)
+GET_ORDER_PATH = "/orders/"
+GET_CUSTOMER_PATH = "/customers/"
 
 class CustomerInvoiceManager:
     def __init__(self, db_type: str):
+        self.db_type = db_type
         self.db_manager = DatabaseManager(db_type)
 
     async def create_invoice(self, invoice: CustomerInvoiceCreate) -> dict:
@@ -50,6 +50,11 @@ class CustomerInvoiceManager:
             await self.db_manager.disconnect()
 
 
+    async def _fetch_order(self, order_id: int) -> Optional[dict]:
+        async with upstream.session() as client:
+            order_resp = await client.get(f"{GET_ORDER_PATH}{order_id}", timeout=upstream.timeout("invoice_order"))
+            return order_resp.json() if order_resp.status_code == 200 else None
+
     async def get_invoice(self, invoice_id: int) -> dict:
         await self.db_manager.connect()
         try:
@@ -62,25 +67,14 @@ class CustomerInvoiceManager:
 
             invoice = invoices[0]
 
-            order = None
-            customer = None
-
-            async with httpx.AsyncClient() as client:
-
-                # -----------------------------
-                # Fetch Order from API
-                # -----------------------------
-                order_url = f"{GET_ORDER_BASE_URL}{invoice.OrderId}"
-                order_resp = await client.get(order_url)
-
-                if order_resp.status_code == 200:
-                    order = order_resp.json()
-                    customer = order.get("Customer")
-
             # -----------------------------
-            # Fetch Retailer from DB
+            # Fetch Order from API and Retailer from DB (independent, run together)
             # -----------------------------
-            retailers = await self.db_manager.read(Retailer, {"RetailerId": invoice.RetailerId})
+            order, retailers = await gather_or_cancel(
+                self._fetch_order(invoice.OrderId),
+                self.db_manager.read(Retailer, {"RetailerId": invoice.RetailerId}),
+            )
+            customer = order.get("Customer") if order else None
             retailer = retailers[0] if retailers else None
 
             # -----------------------------
@@ -239,5 +233,8 @@ class CustomerInvoiceManager:
         finally:
             await self.db_manager.disconnect()
 
-
-
+    # ------------------------------------------------------------
+    # 📤 Export
+    # ------------------------------------------------------------
+    def export_invoices(self, retailer_id: int, fmt: str) -> AsyncIterator[bytes]:
+        return stream_rows(self.db_type, CustomerInvoice, [CustomerInvoice.RetailerId == retailer_id], fmt, settings.export_chunk_size)
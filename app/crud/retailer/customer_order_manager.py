@@ -3,17 +3,71 @@ import httpx
 from datetime import datetime
 from collections import defaultdict
 import calendar
+from ...config import settings
+from ...utils.http_client import upstream
+from ...utils.response_cache import ResponseCache
+from ...utils.concurrency import gather_or_cancel
+from ...schemas.retailer.customer_order_schema import CustomerOrderChanges
+from .customer_order_mirror import order_mirror
+from .retailer_inventory_manager import RetailerInventoryManager
 
 
-GET_ALL_ORDER_BASE_URL = "http://151.185.41.194:8000/orders/retailer/"
-GET_ORDER_BASE_URL = "http://151.185.41.194:8000/orders/retailer/"
-GET_ORDER_ITEM_BASE_URL = "http://151.185.41.194:8000/orders/items/retailer/"
-UPDATE_STATUS_BASE_URL = "http://151.185.41.194:8000/orders"
+# Paths on settings.upstream_base_url
+GET_ALL_ORDER_PATH = "/orders/retailer/"
+GET_ORDER_PATH = "/orders/retailer/"
+GET_ORDER_ITEM_PATH = "/orders/items/retailer/"
+UPDATE_STATUS_PATH = "/orders"
+
+# Upstream order lists per retailer (stale-while-revalidate), shared by every manager instance
+order_cache = ResponseCache(
+    ttl_seconds=settings.upstream_cache_ttl_seconds,
+    stale_seconds=settings.upstream_cache_stale_seconds,
+    max_entries=settings.upstream_cache_max_entries,
+)
+
+
+async def _get_json(path: str, route: str):
+    async with upstream.session() as client:
+        response = await client.get(path, timeout=upstream.timeout(route))
+        response.raise_for_status()
+        return response.json()
 
 
 
 class CustomerOrderManager:
-    
+
+    # -----------------------------
+    # Order reads: local mirror once the retailer is seeded, cached upstream until then
+    # -----------------------------
+    async def _orders_json(self, retailer_id: int):
+        if await order_mirror.is_seeded(retailer_id):
+            return await order_mirror.orders(retailer_id)
+        return await order_cache.get(
+            ("orders", retailer_id),
+            lambda: _get_json(f"{GET_ALL_ORDER_PATH}{retailer_id}", "orders"),
+        )
+
+    async def _order_items_json(self, retailer_id: int):
+        if await order_mirror.is_seeded(retailer_id):
+            return await order_mirror.order_items(retailer_id)
+        return await order_cache.get(
+            ("order_items", retailer_id),
+            lambda: _get_json(f"{GET_ORDER_ITEM_PATH}{retailer_id}", "order_items"),
+        )
+
+    def cache_stats(self) -> dict:
+        return order_cache.stats()
+
+    # -----------------------------
+    # Mirror sync (pushed batches / status)
+    # -----------------------------
+    async def ingest_changes(self, changes: CustomerOrderChanges) -> dict:
+        result = await order_mirror.apply(changes.Orders, changes.Items, changes.DeletedOrderIds)
+        return {"success": True, **result}
+
+    def sync_status(self) -> dict:
+        return order_mirror.status()
+
     # -----------------------------
     # Update Order Status
     # -----------------------------
@@ -21,14 +75,24 @@ class CustomerOrderManager:
         """
         Update order status by order_id
         """
-        url = f"{UPDATE_STATUS_BASE_URL}/{order_id}/status"
+        url = f"{UPDATE_STATUS_PATH}/{order_id}/status"
         params = {"status": status}
 
-        async with httpx.AsyncClient() as client:
+        async with upstream.session() as client:
             try:
-                response = await client.patch(url, params=params, timeout=10.0)
+                response = await client.patch(url, params=params, timeout=upstream.timeout("order_status"))
                 response.raise_for_status()
-                return response.json()
+                result = response.json()
+
+                # The upstream echoes the order when it can; otherwise we cannot tell whose lists changed
+                retailer_id = result.get("RetailerId") if isinstance(result, dict) else None
+                # The echo may be partial; the next sync brings the full order
+                await order_mirror.set_status(order_id, status)
+                if retailer_id is not None:
+                    order_cache.invalidate_where(lambda key: key[1] == retailer_id)
+                else:
+                    order_cache.invalidate_where(lambda key: True)
+                return result
 
             except httpx.HTTPStatusError as exc:
                 raise HTTPException(
@@ -49,11 +113,15 @@ class CustomerOrderManager:
         Fetch orders from external API by retailer_id
         and return aggregated order statistics
         """
-        url = f"{GET_ORDER_BASE_URL}{order_id}"
+        url = f"{GET_ORDER_PATH}{order_id}"
+
+        order = await order_mirror.order(order_id)
+        if order is not None:
+            return order
 
-        async with httpx.AsyncClient() as client:
+        async with upstream.session() as client:
             try:
-                response = await client.get(url, timeout=10.0)
+                response = await client.get(url, timeout=upstream.timeout("order"))
                 # response.raise_for_status()
                 return response.json()
 
@@ -76,24 +144,19 @@ class CustomerOrderManager:
         Fetch orders from external API by retailer_id
         and return aggregated order statistics
         """
-        url = f"{GET_ALL_ORDER_BASE_URL}{retailer_id}"
-
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, timeout=10.0)
-                response.raise_for_status()
-                orders = response.json()
+        try:
+            orders = await self._orders_json(retailer_id)
 
-            except httpx.HTTPStatusError as exc:
-                raise HTTPException(
-                    status_code=exc.response.status_code,
-                    detail=f"Error fetching orders: {exc.response.text}"
-                )
-            except httpx.RequestError as exc:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Request failed: {exc}"
-                )
+        except httpx.HTTPStatusError as exc:
+            raise HTTPException(
+                status_code=exc.response.status_code,
+                detail=f"Error fetching orders: {exc.response.text}"
+            )
+        except httpx.RequestError as exc:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Request failed: {exc}"
+            )
 
         # -----------------------------
         # Order Calculations
@@ -134,38 +197,27 @@ class CustomerOrderManager:
     # -----------------------------
     async def sales_dashboard(self, retailer_id: int):
         try:
-            async with httpx.AsyncClient() as client:
-                # ---- fetch orders ----
-                orders_resp = await client.get(
-                    f"{GET_ORDER_BASE_URL}{retailer_id}",
-                    timeout=10.0
-                )
-                orders_resp.raise_for_status()
-                orders_json = orders_resp.json()
-
-                # Ensure orders is a list
-                if isinstance(orders_json, list):
-                    orders = orders_json
-                elif isinstance(orders_json, dict):
-                    orders = orders_json.get("data", [])
-                else:
-                    orders = []
+            # ---- fetch orders and order items together ----
+            orders_json, items_json = await gather_or_cancel(
+                self._orders_json(retailer_id),
+                self._order_items_json(retailer_id),
+            )
 
-                # ---- fetch order items ----
-                items_resp = await client.get(
-                    f"{GET_ORDER_ITEM_BASE_URL}{retailer_id}",
-                    timeout=10.0
-                )
-                items_resp.raise_for_status()
-                items_json = items_resp.json()
-
-                # Ensure order_items is a list
-                if isinstance(items_json, list):
-                    order_items = items_json
-                elif isinstance(items_json, dict):
-                    order_items = items_json.get("data", [])
-                else:
-                    order_items = []
+            # Ensure orders is a list
+            if isinstance(orders_json, list):
+                orders = orders_json
+            elif isinstance(orders_json, dict):
+                orders = orders_json.get("data", [])
+            else:
+                orders = []
+
+            # Ensure order_items is a list
+            if isinstance(items_json, list):
+                order_items = items_json
+            elif isinstance(items_json, dict):
+                order_items = items_json.get("data", [])
+            else:
+                order_items = []
 
             # ---------------------------
             # Revenue & Orders
@@ -265,13 +317,7 @@ class CustomerOrderManager:
     # -----------------------------
     async def get_dashboard(self, retailer_id: int):
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{GET_ORDER_BASE_URL}{retailer_id}",
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                orders_json = response.json()
+            orders_json = await self._orders_json(retailer_id)
 
             # ----------------------
             # Ensure orders is a list
@@ -341,9 +387,9 @@ class CustomerOrderManager:
             ]
 
             # ----------------------
-            # Low Stock (future API)
+            # Low Stock (kept current by inventory writes)
             # ----------------------
-            low_stock_list = []
+            low_stock_list = await RetailerInventoryManager(settings.db_type).get_low_stock(retailer_id)
 
             # ----------------------
             # Final Response
@@ -0,0 +1,422 @@
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, insert, select, update
+
+from ...config import settings
+from ...utils.logger import get_logger
+from ...utils.timezone import ist_now
+from ...utils.http_client import upstream
+from ...utils.concurrency import gather_or_cancel
+from ...db.base.database_manager import DatabaseManager
+from ...models.retailer.retailer_model import Retailer
+from ...models.retailer.customer_order_model import CustomerOrder, CustomerOrderItem, CustomerOrderSyncState
+
+logger = get_logger(__name__)
+
+# Paths on settings.upstream_base_url
+CHANGES_PATH = "/orders/changes"                 # ?since=<UpdatedAt>&limit=N -> CustomerOrderChanges
+ALL_ORDERS_PATH = "/orders/retailer/"
+ALL_ORDER_ITEMS_PATH = "/orders/items/retailer/"
+
+# CustomerOrderSyncState scopes; for FULL_SCOPE the Cursor is the epoch second the last full pull started
+FEED_SCOPE = "feed"
+FULL_SCOPE = "full"
+
+
+def _retailer_scope(retailer_id: int) -> str:
+    return f"retailer:{retailer_id}"
+
+
+def _chunks(values: List, size: int) -> Iterable[List]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _text(value) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+class CustomerOrderMirror:
+    """
+    Local copy of the customer-order service in CustomerOrder / CustomerOrderItem.
+
+    Each row keeps the upstream JSON in Payload, so reads return exactly what
+    the live endpoints returned, but from an indexed local query. Rows arrive
+    in three ways, all through apply():
+      - pull(): the scheduler follows the changes feed from the cursor saved
+        in CustomerOrderSyncState. Only deltas cross the wire. If the upstream
+        has no feed (404), every retailer's lists are fetched in full and
+        reconciled instead, at most every full_pull_seconds (the feed is not
+        asked again until then either); in between, pushed batches are the
+        only deltas.
+      - the ingest endpoint, which receives the same batches pushed by upstream.
+      - writes made here (order status), applied to the copy straight away.
+    An order is never overwritten with an older UpdatedAt than the one stored,
+    so pushes and pulls can overlap in any order. When a batch carries an
+    order's complete item list, items no longer in it are removed.
+
+    A retailer is read from the mirror only once its data is known to be
+    complete: a pass over the changes feed reached the end, or a full pull
+    of that retailer went through. Until then (first pull still running or
+    cut short, only pushed rows) its reads go upstream.
+    """
+
+    def __init__(self, db_type: str, batch_size: int = 500, full_pull_seconds: float = 6 * 3600):
+        self.db_type = db_type
+        self.batch_size = batch_size
+        self.full_pull_seconds = full_pull_seconds
+        self._feed_complete = False
+        self._seeded_retailers: set = set()
+        self._status: Dict[str, object] = {"LastPullAt": None, "LastPullMode": None, "LastPullSeconds": None, "LastError": None}
+
+    # ------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------
+    async def is_seeded(self, retailer_id: int) -> bool:
+        """True once this retailer's orders are completely mirrored; until then callers read upstream."""
+        if self._feed_complete or retailer_id in self._seeded_retailers:
+            return True
+        db_manager = DatabaseManager(self.db_type)
+        await db_manager.connect()
+        try:
+            completed = set((await db_manager.execute(
+                select(CustomerOrderSyncState.Scope).where(
+                    CustomerOrderSyncState.Scope.in_([FEED_SCOPE, _retailer_scope(retailer_id)]),
+                    CustomerOrderSyncState.CompletedAt.isnot(None),
+                )
+            )).scalars().all())
+        finally:
+            await db_manager.disconnect()
+        # Completion is never undone, so only positive answers are remembered
+        if FEED_SCOPE in completed:
+            self._feed_complete = True
+        elif completed:
+            self._seeded_retailers.add(retailer_id)
+        return bool(completed)
+
+    async def _payloads(self, stmt) -> List[dict]:
+        db_manager = DatabaseManager(self.db_type)
+        await db_manager.connect()
+        try:
+            return list((await db_manager.execute(stmt)).scalars().all())
+        finally:
+            await db_manager.disconnect()
+
+    async def orders(self, retailer_id: int) -> List[dict]:
+        return await self._payloads(
+            select(CustomerOrder.Payload).where(CustomerOrder.RetailerId == retailer_id).order_by(CustomerOrder.OrderId)
+        )
+
+    async def order_items(self, retailer_id: int) -> List[dict]:
+        return await self._payloads(
+            select(CustomerOrderItem.Payload)
+            .where(CustomerOrderItem.RetailerId == retailer_id)
+            .order_by(CustomerOrderItem.OrderId, CustomerOrderItem.OrderItemId)
+        )
+
+    async def order(self, order_id: int) -> Optional[dict]:
+        payloads = await self._payloads(select(CustomerOrder.Payload).where(CustomerOrder.OrderId == order_id))
+        return payloads[0] if payloads else None
+
+    # ------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------
+    async def apply(
+        self,
+        orders: List[dict],
+        items: List[dict],
+        deleted_order_ids: Optional[List[int]] = None,
+        complete_item_orders: Optional[Iterable[int]] = None,
+    ) -> dict:
+        """
+        Upsert one batch of upstream orders / items (nested order["Items"] included).
+
+        complete_item_orders: orders whose full item list is in this batch; an
+        order sent with a nested "Items" list counts as such. Their stored
+        items missing from the batch are deleted.
+        """
+        items = list(items)
+        order_rows: Dict[int, dict] = {}
+        item_rows: Dict[int, dict] = {}
+        complete = {int(order_id) for order_id in complete_item_orders or []}
+        skipped = 0
+
+        for order in orders:
+            if not isinstance(order, dict) or order.get("OrderId") is None or order.get("RetailerId") is None:
+                skipped += 1
+                continue
+            order_rows[int(order["OrderId"])] = {
+                "OrderId": int(order["OrderId"]),
+                "RetailerId": int(order["RetailerId"]),
+                "Status": order.get("Status"),
+                "TotalAmount": order.get("TotalAmount"),
+                "OrderDateTime": _text(order.get("OrderDateTime")),
+                "UpdatedAt": _text(order.get("UpdatedAt")),
+                "Payload": order,
+            }
+            if isinstance(order.get("Items"), list):
+                complete.add(int(order["OrderId"]))
+            for item in order.get("Items") or []:
+                if isinstance(item, dict):
+                    items.append({"OrderId": order["OrderId"], "RetailerId": order["RetailerId"], **item})
+
+        for item in items:
+            if not isinstance(item, dict) or item.get("OrderItemId") is None or item.get("OrderId") is None:
+                skipped += 1
+                continue
+            retailer_id = item.get("RetailerId")
+            if retailer_id is None and int(item["OrderId"]) in order_rows:
+                retailer_id = order_rows[int(item["OrderId"])]["RetailerId"]
+            if retailer_id is None:
+                skipped += 1
+                continue
+            item_rows[int(item["OrderItemId"])] = {
+                "OrderItemId": int(item["OrderItemId"]),
+                "OrderId": int(item["OrderId"]),
+                "RetailerId": int(retailer_id),
+                "Payload": item,
+            }
+
+        db_manager = DatabaseManager(self.db_type)
+        await db_manager.connect()
+        try:
+            async with db_manager.transaction() as session:
+                orders_result, stale_ids = await self._upsert_orders(session, order_rows)
+                item_rows = {k: row for k, row in item_rows.items() if row["OrderId"] not in stale_ids}
+                items_result = await self._upsert(session, CustomerOrderItem, CustomerOrderItem.OrderItemId, item_rows)
+                items_result["Pruned"] = await self._prune_items(session, complete - stale_ids, item_rows)
+                deleted = 0
+                for ids in _chunks(list(deleted_order_ids or []), self.batch_size):
+                    await session.execute(delete(CustomerOrderItem).where(CustomerOrderItem.OrderId.in_(ids)))
+                    deleted += (await session.execute(delete(CustomerOrder).where(CustomerOrder.OrderId.in_(ids)))).rowcount
+        finally:
+            await db_manager.disconnect()
+
+        return {"Orders": orders_result, "Items": items_result, "Deleted": deleted, "Skipped": skipped}
+
+    async def _upsert_orders(self, session, rows: Dict[int, dict]) -> Tuple[dict, set]:
+        # Drop rows that are older than what is already stored (a late pull after a push)
+        stale = set()
+        for ids in _chunks(list(rows), self.batch_size):
+            result = await session.execute(
+                select(CustomerOrder.OrderId, CustomerOrder.UpdatedAt).where(CustomerOrder.OrderId.in_(ids))
+            )
+            for order_id, stored in result.all():
+                incoming = rows[order_id]["UpdatedAt"]
+                if stored and incoming and incoming < stored:
+                    del rows[order_id]
+                    stale.add(order_id)
+        result = await self._upsert(session, CustomerOrder, CustomerOrder.OrderId, rows)
+        result["Stale"] = len(stale)
+        return result, stale
+
+    async def _prune_items(self, session, order_ids: set, item_rows: Dict[int, dict]) -> int:
+        """Delete stored items of these orders that the batch no longer lists (removed upstream)."""
+        pruned = 0
+        for ids in _chunks(sorted(order_ids), self.batch_size):
+            stored = (await session.execute(
+                select(CustomerOrderItem.OrderItemId).where(CustomerOrderItem.OrderId.in_(ids))
+            )).scalars().all()
+            gone = [item_id for item_id in stored if item_id not in item_rows]
+            for gone_ids in _chunks(gone, self.batch_size):
+                pruned += (await session.execute(
+                    delete(CustomerOrderItem).where(CustomerOrderItem.OrderItemId.in_(gone_ids))
+                )).rowcount
+        return pruned
+
+    async def _upsert(self, session, model, pk, rows: Dict[int, dict]) -> dict:
+        inserted = updated = 0
+        fields = [name for name in model.__table__.c.keys() if name not in (pk.key, "SyncedAt")]
+        for ids in _chunks(list(rows), self.batch_size):
+            existing = set((await session.execute(select(pk).where(pk.in_(ids)))).scalars().all())
+            now = ist_now()
+            updates = [
+                {**{f"new_{k}": v for k, v in rows[i].items()}, "row_id": i, "new_SyncedAt": now}
+                for i in ids if i in existing
+            ]
+            inserts = [{**rows[i], "SyncedAt": now} for i in ids if i not in existing]
+            if updates:
+                stmt = (
+                    update(model.__table__)
+                    .where(pk == bindparam("row_id"))
+                    .values({field: bindparam(f"new_{field}") for field in (*fields, "SyncedAt")})
+                )
+                await session.execute(stmt, updates)
+            if inserts:
+                await session.execute(insert(model.__table__).values(inserts))
+            inserted += len(inserts)
+            updated += len(updates)
+        return {"Inserted": inserted, "Updated": updated}
+
+    async def set_status(self, order_id: int, status: str) -> None:
+        """Mirror a status change made through this app before the next sync sees it."""
+        db_manager = DatabaseManager(self.db_type)
+        await db_manager.connect()
+        try:
+            async with db_manager.transaction() as session:
+                payload = (await session.execute(
+                    select(CustomerOrder.Payload).where(CustomerOrder.OrderId == order_id)
+                )).scalar_one_or_none()
+                if payload is not None:
+                    await session.execute(
+                        update(CustomerOrder)
+                        .where(CustomerOrder.OrderId == order_id)
+                        .values(Status=status, Payload={**payload, "Status": status}, SyncedAt=ist_now())
+                    )
+        finally:
+            await db_manager.disconnect()
+
+    # ------------------------------------------------------------
+    # Pull (scheduler job)
+    # ------------------------------------------------------------
+    async def _cursor(self, scope: str = FEED_SCOPE) -> Optional[str]:
+        # Saved by the feed itself: pushed rows may be newer than what the feed has delivered
+        db_manager = DatabaseManager(self.db_type)
+        await db_manager.connect()
+        try:
+            return (await db_manager.execute(
+                select(CustomerOrderSyncState.Cursor).where(CustomerOrderSyncState.Scope == scope)
+            )).scalar()
+        finally:
+            await db_manager.disconnect()
+
+    async def _save_state(self, scope: str, cursor: Optional[str] = None, completed: bool = False) -> None:
+        values = {"UpdatedAt": ist_now()}
+        if cursor is not None:
+            values["Cursor"] = cursor
+        if completed:
+            values["CompletedAt"] = ist_now()
+        db_manager = DatabaseManager(self.db_type)
+        await db_manager.connect()
+        try:
+            async with db_manager.transaction() as session:
+                stmt = update(CustomerOrderSyncState).where(CustomerOrderSyncState.Scope == scope).values(values)
+                if not (await session.execute(stmt)).rowcount:
+                    await session.execute(insert(CustomerOrderSyncState).values(Scope=scope, **values))
+        finally:
+            await db_manager.disconnect()
+
+    async def pull(self) -> dict:
+        # Shared through the table, as each run may land on another worker
+        last_full = await self._cursor(FULL_SCOPE)
+        if last_full and time.time() - float(last_full) < self.full_pull_seconds:
+            return {"Skipped": "no changes feed, waiting for the next full pull"}
+
+        started = time.monotonic()
+        try:
+            totals = await self._pull_changes()
+            mode = "changes"
+            if totals is None:
+                # Recorded first, so a failing full pull is not retried every run either
+                await self._save_state(FULL_SCOPE, str(time.time()))
+                totals = await self._pull_full()
+                mode = "full"
+        except Exception as e:
+            self._status["LastError"] = str(e)
+            raise
+        self._status.update(
+            LastPullAt=ist_now().isoformat(),
+            LastPullMode=mode,
+            LastPullSeconds=round(time.monotonic() - started, 3),
+            LastError=None,
+            LastPull=totals,
+        )
+        logger.info(f"🔄 Customer orders synced ({mode}): {totals}")
+        return totals
+
+    async def _pull_changes(self) -> Optional[dict]:
+        """Follow the changes feed from the local cursor; None when upstream has no feed."""
+        totals = {"Orders": 0, "Items": 0, "Deleted": 0, "Batches": 0}
+        cursor = await self._cursor()
+        async with upstream.session() as client:
+            while True:
+                params = {"limit": self.batch_size}
+                if cursor:
+                    params["since"] = cursor
+                response = await client.get(CHANGES_PATH, params=params, timeout=upstream.timeout("order_changes"))
+                if response.status_code == 404:
+                    return None
+                response.raise_for_status()
+                batch = response.json()
+
+                result = await self.apply(batch.get("Orders") or [], batch.get("Items") or [], batch.get("DeletedOrderIds") or [])
+                totals["Orders"] += result["Orders"]["Inserted"] + result["Orders"]["Updated"]
+                totals["Items"] += result["Items"]["Inserted"] + result["Items"]["Updated"]
+                totals["Deleted"] += result["Deleted"]
+                totals["Batches"] += 1
+
+                next_cursor = batch.get("NextCursor")
+                if not batch.get("HasMore") or not next_cursor or next_cursor == cursor:
+                    await self._save_state(FEED_SCOPE, next_cursor or cursor, completed=True)
+                    self._feed_complete = True
+                    return totals
+                # A pass cut short resumes here, and does not mark the feed complete
+                await self._save_state(FEED_SCOPE, next_cursor)
+                cursor = next_cursor
+
+    async def _pull_full(self) -> dict:
+        """Fallback without a feed: fetch every retailer's lists and reconcile them."""
+        totals = {"Orders": 0, "Items": 0, "Deleted": 0, "Retailers": 0}
+        db_manager = DatabaseManager(self.db_type)
+        await db_manager.connect()
+        try:
+            retailer_ids = list((await db_manager.execute(select(Retailer.RetailerId))).scalars().all())
+        finally:
+            await db_manager.disconnect()
+
+        async with upstream.session() as client:
+            async def fetch(path: str, route: str):
+                response = await client.get(path, timeout=upstream.timeout(route))
+                response.raise_for_status()
+                data = response.json()
+                return data.get("data", []) if isinstance(data, dict) else data if isinstance(data, list) else []
+
+            for retailer_id in retailer_ids:
+                try:
+                    orders, items = await gather_or_cancel(
+                        fetch(f"{ALL_ORDERS_PATH}{retailer_id}", "orders"),
+                        fetch(f"{ALL_ORDER_ITEMS_PATH}{retailer_id}", "order_items"),
+                    )
+                except Exception as e:
+                    logger.error(f"❌ Customer order sync failed for retailer {retailer_id}: {e}")
+                    continue
+                for order in orders:
+                    if isinstance(order, dict):
+                        order.setdefault("RetailerId", retailer_id)
+                for item in items:
+                    if isinstance(item, dict):
+                        item.setdefault("RetailerId", retailer_id)
+
+                upstream_ids = {o.get("OrderId") for o in orders if isinstance(o, dict) and o.get("OrderId") is not None}
+                gone = await self._missing_orders(retailer_id, upstream_ids)
+                result = await self.apply(orders, items, gone, complete_item_orders=upstream_ids)
+                await self._save_state(_retailer_scope(retailer_id), completed=True)
+                self._seeded_retailers.add(retailer_id)
+                totals["Orders"] += result["Orders"]["Inserted"] + result["Orders"]["Updated"]
+                totals["Items"] += result["Items"]["Inserted"] + result["Items"]["Updated"]
+                totals["Deleted"] += result["Deleted"]
+                totals["Retailers"] += 1
+        return totals
+
+    async def _missing_orders(self, retailer_id: int, upstream_ids: set) -> List[int]:
+        db_manager = DatabaseManager(self.db_type)
+        await db_manager.connect()
+        try:
+            local = (await db_manager.execute(
+                select(CustomerOrder.OrderId).where(CustomerOrder.RetailerId == retailer_id)
+            )).scalars().all()
+        finally:
+            await db_manager.disconnect()
+        return [order_id for order_id in local if order_id not in upstream_ids]
+
+    def status(self) -> dict:
+        return {"FeedComplete": self._feed_complete, "SeededRetailers": len(self._seeded_retailers), **self._status}
+
+
+# Shared by the order views, the ingest endpoint and the scheduler job
+order_mirror = CustomerOrderMirror(
+    settings.db_type,
+    batch_size=settings.customer_order_sync_batch_size,
+    full_pull_seconds=settings.customer_order_full_sync_seconds,
+)
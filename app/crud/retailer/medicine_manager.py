@@ -1,14 +1,52 @@
 from typing import List, Optional
+import difflib
+import re
+from sqlalchemy import select, text, or_, case
+from sqlalchemy.exc import OperationalError
+from ...config import settings
 from ...utils.logger import get_logger
+from ...utils.catalog_cache import CatalogCache, CatalogSnapshot
 from ...db.base.database_manager import DatabaseManager
 from ...models.retailer.medicine_model import Medicine
+from .autocomplete_manager import autocomplete_index
 from ...schemas.retailer.medicine_schema import MedicineCreate, MedicineUpdate, MedicineRead
 import os
 
 logger = get_logger(__name__)
 
+# Shared by every MedicineManager instance so a write through any of them
+# invalidates the catalog served by GET /medicines.
+medicine_catalog = CatalogCache(ttl_seconds=settings.medicine_catalog_ttl_seconds)
+
+
+# bm25 column weights: MedicineName, Manufacturer, TherapeuticClass
+_SEARCH_WEIGHTS = "10.0, 2.0, 1.0"
+
+_PREFIX_SEARCH_SQL = text(f"""
+    SELECT m.*, bm25(MedicineSearch, {_SEARCH_WEIGHTS}) AS Score
+    FROM MedicineSearch
+    JOIN Medicine m ON m.MedicineId = MedicineSearch.rowid
+    WHERE MedicineSearch MATCH :match
+    ORDER BY Score
+    LIMIT :limit
+""")
+
+_TRIGRAM_SEARCH_SQL = text(f"""
+    SELECT m.*, bm25(MedicineSearchTrigram, {_SEARCH_WEIGHTS}) AS Score
+    FROM MedicineSearchTrigram
+    JOIN Medicine m ON m.MedicineId = MedicineSearchTrigram.rowid
+    WHERE MedicineSearchTrigram MATCH :match
+    ORDER BY Score
+    LIMIT :limit
+""")
+
+# Fuzzy candidates must look at least this much like the query to be returned
+_FUZZY_MIN_SIMILARITY = 0.6
+
+
 class MedicineManager:
     def __init__(self, db_type: str):
+        self.db_type = db_type.lower()
         self.db_manager = DatabaseManager(db_type)
 
     async def create_medicine(self, medicine: MedicineCreate) -> dict:
@@ -16,6 +54,8 @@ class MedicineManager:
             await self.db_manager.connect()
             data = medicine.dict()
             obj = await self.db_manager.create(Medicine, data)
+            medicine_catalog.bump()
+            autocomplete_index.upsert_medicine(obj.MedicineId, obj.MedicineName)
             logger.info(f"Created medicine {obj.MedicineId}")
             return {
                 "success": True,
@@ -57,12 +97,133 @@ class MedicineManager:
         finally:
             await self.db_manager.disconnect()
 
+    async def get_medicine_catalog(self) -> CatalogSnapshot:
+        """Pre-encoded GET /medicines payload, rebuilt only when the catalog version changes."""
+        async def load() -> dict:
+            result = await self.get_all_medicines()
+            if not result["success"]:
+                raise RuntimeError(result["message"])
+            return result
+
+        return await medicine_catalog.get(load)
+
+    # -------------------------------------------------------------
+    # Search
+    # -------------------------------------------------------------
+    async def search_medicines(self, q: str, limit: int = 20, offset: int = 0) -> dict:
+        """
+        Ranked search over MedicineName, Manufacturer and TherapeuticClass.
+
+        On SQLite, word-prefix matches from the MedicineSearch FTS5 index come first,
+        topped up with trigram matches (MedicineSearchTrigram) so misspelled names still
+        hit. Other backends, or a database without the FTS tables, fall back to LIKE.
+        """
+        tokens = re.findall(r"\w+", q.lower())
+        if not tokens:
+            return {"success": True, "message": "Empty query", "data": [], "limit": limit, "offset": offset, "has_more": False}
+
+        wanted = offset + limit + 1
+        try:
+            await self.db_manager.connect()
+            rows = None
+            if self.db_type in ("sqlite", "sqlite3"):
+                try:
+                    rows = await self._fts_search(q, tokens, wanted)
+                except OperationalError as e:
+                    logger.warning(f"FTS search unavailable, falling back to LIKE: {e}")
+            if rows is None:
+                rows = await self._like_search(q, wanted)
+
+            page = rows[offset:offset + limit]
+            return {
+                "success": True,
+                "message": "Medicines fetched successfully",
+                "data": page,
+                "limit": limit,
+                "offset": offset,
+                "has_more": len(rows) > offset + limit,
+            }
+        except Exception as e:
+            logger.error(f"Error searching medicines for {q!r}: {e}")
+            return {"success": False, "message": str(e)}
+        finally:
+            await self.db_manager.disconnect()
+
+    async def _fts_search(self, q: str, tokens: List[str], wanted: int) -> List[dict]:
+        match = " ".join(f'"{t}"*' for t in tokens)
+        result = await self.db_manager.execute(_PREFIX_SEARCH_SQL, {"match": match, "limit": wanted})
+        rows = [self._search_row(r, "prefix") for r in result.mappings().all()]
+        if len(rows) >= wanted:
+            return rows
+
+        trigrams = sorted({t[i:i + 3] for t in tokens if len(t) >= 3 for i in range(len(t) - 2)})
+        if not trigrams:
+            return rows
+
+        # OR over the query's trigrams: bm25 favours names sharing the most of them,
+        # then a similarity ratio on the name drops the weak candidates.
+        match = " OR ".join(f'"{t}"' for t in trigrams)
+        result = await self.db_manager.execute(_TRIGRAM_SEARCH_SQL, {"match": match, "limit": max(wanted * 4, 50)})
+
+        seen = {r["MedicineId"] for r in rows}
+        needle = " ".join(tokens)
+        fuzzy = []
+        for r in result.mappings().all():
+            if r["MedicineId"] in seen:
+                continue
+            similarity = self._similarity(needle, r)
+            if similarity >= _FUZZY_MIN_SIMILARITY:
+                fuzzy.append((similarity, self._search_row(r, "fuzzy")))
+        fuzzy.sort(key=lambda pair: pair[0], reverse=True)
+        return rows + [row for _, row in fuzzy]
+
+    async def _like_search(self, q: str, wanted: int) -> List[dict]:
+        escaped = q.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        contains = f"%{escaped}%"
+        stmt = (
+            select(Medicine)
+            .where(or_(
+                Medicine.MedicineName.ilike(contains, escape="\\"),
+                Medicine.Manufacturer.ilike(contains, escape="\\"),
+                Medicine.TherapeuticClass.ilike(contains, escape="\\"),
+            ))
+            .order_by(
+                case((Medicine.MedicineName.ilike(f"{escaped}%", escape="\\"), 0), else_=1),
+                Medicine.MedicineName,
+            )
+            .limit(wanted)
+        )
+        result = await self.db_manager.execute(stmt)
+        return [
+            {**MedicineRead.from_orm(m).dict(), "MatchType": "like"}
+            for m in result.scalars().all()
+        ]
+
+    @staticmethod
+    def _similarity(needle: str, row) -> float:
+        """Best ratio of the query against each searched field and each word in it."""
+        best = 0.0
+        for field in ("MedicineName", "Manufacturer", "TherapeuticClass"):
+            value = (row[field] or "").lower()
+            for candidate in [value, *value.split()]:
+                best = max(best, difflib.SequenceMatcher(None, needle, candidate).ratio())
+        return best
+
+    @staticmethod
+    def _search_row(row, match_type: str) -> dict:
+        data = MedicineRead(**dict(row)).dict()
+        data["MatchType"] = match_type
+        return data
+
     async def update_medicine(self, medicine_id: int, data: MedicineUpdate) -> dict:
         try:
             await self.db_manager.connect()
             update_data = data.dict(exclude_unset=True)
             rowcount = await self.db_manager.update(Medicine, {"MedicineId": medicine_id}, update_data)
             if rowcount:
+                medicine_catalog.bump()
+                if "MedicineName" in update_data:
+                    autocomplete_index.upsert_medicine(medicine_id, update_data["MedicineName"])
                 logger.info(f"Updated medicine {medicine_id}, rows affected: {rowcount}")
                 return {"success": True, "message": "Medicine updated successfully", "data": {"rows_affected": rowcount}}
             return {"success": False, "message": "Medicine not found or no changes made", "data": {"rows_affected": rowcount}}
@@ -77,6 +238,8 @@ class MedicineManager:
             await self.db_manager.connect()
             result = await self.db_manager.delete(Medicine, {"MedicineId": medicine_id})
             if result:
+                medicine_catalog.bump()
+                autocomplete_index.remove_medicine(medicine_id)
                 logger.info(f"Deleted medicine {medicine_id}, rows affected: {result}")
                 return {"success": True, "message": "Medicine deleted successfully", "data": {"rows_affected": result}}
             return {"success": False, "message": "Medicine not found", "data": {"rows_affected": result}}
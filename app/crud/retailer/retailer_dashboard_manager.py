@@ -2,7 +2,7 @@ from typing import List, Dict
 from datetime import datetime
 from ...db.base.database_manager import DatabaseManager
 # from ...models.customer.order_model import Order
-from ...models.retailer.retailer_inventory_model import RetailerInventory
+from .retailer_inventory_manager import retailer_stock_alerts
 
 class RetailerDashboardManager:
     def __init__(self, db_type: str):
@@ -41,18 +41,7 @@ class RetailerDashboardManager:
             # ----------------------
             # Low Stock Medicines
             # ----------------------
-            # low_stock_meds = await self.db_manager.read(RetailerInventory, {"RetailerId": retailer_id})
-            # low_stock_list = [
-            #     {
-            #         "MedicineName": m.MedicineName,
-            #         "MinStock": m.MinStock,
-            #         "Stock": m.Quantity,
-            #         "ExpiryDate": m.ExpiryDate.strftime("%d-%m-%Y")
-            #     }
-            #     for m in low_stock_meds if m.Quantity < m.MinStock
-            # ]
-
-            low_stock_list = []
+            low_stock_list = await retailer_stock_alerts.low_stock(self.db_manager, retailer_id)
 
             return {
                 "TodaySales": today_sales,
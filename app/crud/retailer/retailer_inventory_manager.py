@@ -1,16 +1,54 @@
-from typing import Optional, List
-from datetime import datetime
+from typing import Optional, List, Tuple, AsyncIterator
+from fastapi import UploadFile
+from datetime import date
+from sqlalchemy import select, func, update, or_
+from ...config import settings
 from ...utils.logger import get_logger
+from ...utils.timezone import ist_now
+from ...utils.inventory_query import inventory_filters, stock_status_expression
+from ...utils.stock_alerts import StockAlerts
+from ...utils.fefo_allocator import FefoAllocator
+from ...utils.inventory_import import InventoryImporter
+from ...exceptions.custom_exceptions import InsufficientStockException, StockConflictException
+from ...utils.data_export import stream_rows
 from ...db.base.database_manager import DatabaseManager
 from ...models.retailer.retailer_inventory_model import RetailerInventory
+from ...models.retailer.retailer_notification_model import RetailerNotification
+from .retailer_notification_manager import retailer_notifications_inserted
+from ...schemas.retailer.retailer_inventory_schema import RetailerInventoryRead
+from .autocomplete_manager import autocomplete_index
 
 logger = get_logger(__name__)
 
+# Per-retailer low-stock sets + stock notifications, shared by every manager instance
+retailer_stock_alerts = StockAlerts(
+    RetailerInventory,
+    RetailerNotification,
+    owner_field="RetailerId",
+    id_field="RetailerInventoryId",
+    max_accounts=settings.low_stock_max_accounts,
+    ttl_seconds=settings.low_stock_ttl_seconds,
+    on_insert=retailer_notifications_inserted,
+)
+
+_COLUMNS = RetailerInventory.__table__.c
+
+retailer_allocator = FefoAllocator(RetailerInventory, owner_field="RetailerId", id_field="RetailerInventoryId")
+
 class RetailerInventoryManager:
     """Production-ready manager for retailer inventory with full multi-retailer support."""
 
     def __init__(self, db_type: str):
+        self.db_type = db_type
         self.db_manager = DatabaseManager(db_type)
+        self.importer = InventoryImporter(
+            RetailerInventory,
+            owner_field="RetailerId",
+            id_field="RetailerInventoryId",
+            calculate_status=self._calculate_status,
+            chunk_size=settings.inventory_import_chunk_size,
+            max_errors=settings.inventory_import_max_errors,
+        )
 
     # -------------------------------------------------------------
     # Utility: Calculate stock status
@@ -23,6 +61,47 @@ class RetailerInventoryManager:
             return "low"
         return "in"
 
+    @staticmethod
+    def _as_row(obj: RetailerInventory) -> dict:
+        return {c.name: getattr(obj, c.name) for c in _COLUMNS}
+
+    async def _change_stock(self, retailer_id: int, retailer_inventory_id: int, delta: int):
+        """
+        Apply a quantity delta with one conditional UPDATE ... RETURNING. Returns the
+        updated row, or None when the item is missing or the stock would go negative.
+        """
+        new_quantity = RetailerInventory.Quantity + delta
+        stmt = (
+            update(RetailerInventory)
+            .where(
+                RetailerInventory.RetailerInventoryId == retailer_inventory_id,
+                RetailerInventory.RetailerId == retailer_id,
+                new_quantity >= 0,
+            )
+            .values(Quantity=new_quantity, Status=stock_status_expression(RetailerInventory, new_quantity))
+            .returning(*_COLUMNS)
+        )
+        row = (await self.db_manager.execute(stmt)).mappings().first()
+        if row is not None:
+            old_status = self._calculate_status(row["Quantity"] - delta, row["MinStock"])
+            await retailer_stock_alerts.record(self.db_manager, [(row, old_status)])
+        return row
+
+    async def _stock_change_failure(self, retailer_id: int, retailer_inventory_id: int) -> dict:
+        items = await self.db_manager.read(RetailerInventory, {"RetailerInventoryId": retailer_inventory_id, "RetailerId": retailer_id})
+        return {"success": False, "message": "Insufficient stock" if items else "Item not found"}
+
+    async def get_low_stock(self, retailer_id: int) -> List[dict]:
+        """Low / out-of-stock items for dashboards, served from the in-memory low-stock set."""
+        try:
+            await self.db_manager.connect()
+            return await retailer_stock_alerts.low_stock(self.db_manager, retailer_id)
+        except Exception as e:
+            logger.error(f"❌ Error fetching low stock for retailer {retailer_id}: {e}")
+            return []
+        finally:
+            await self.db_manager.disconnect()
+
     # -------------------------------------------------------------
     # Combined summary + item list
     # -------------------------------------------------------------
@@ -51,6 +130,48 @@ class RetailerInventoryManager:
         finally:
             await self.db_manager.disconnect()
 
+    # -------------------------------------------------------------
+    # Filtered, paginated query
+    # -------------------------------------------------------------
+    async def query_inventory(
+        self,
+        retailer_id: int,
+        status: Optional[str] = None,
+        expiry_before: Optional[date] = None,
+        brand: Optional[str] = None,
+        batch: Optional[str] = None,
+        name_prefix: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> dict:
+        try:
+            await self.db_manager.connect()
+            filters = inventory_filters(
+                RetailerInventory, RetailerInventory.RetailerId, retailer_id,
+                status=status, expiry_before=expiry_before, brand=brand, batch=batch, name_prefix=name_prefix,
+            )
+            order = (RetailerInventory.ExpiryDate, RetailerInventory.RetailerInventoryId) if expiry_before else (RetailerInventory.RetailerInventoryId,)
+
+            total = (await self.db_manager.execute(
+                select(func.count()).select_from(RetailerInventory).where(*filters)
+            )).scalar_one()
+            result = await self.db_manager.execute(
+                select(RetailerInventory).where(*filters).order_by(*order).limit(limit).offset(offset)
+            )
+            items = [RetailerInventoryRead.from_orm(i).dict() for i in result.scalars().all()]
+
+            return {
+                "Total": total,
+                "Limit": limit,
+                "Offset": offset,
+                "Items": items
+            }
+        except Exception as e:
+            logger.error(f"❌ Error querying inventory for retailer {retailer_id}: {e}")
+            return {"success": False, "message": str(e)}
+        finally:
+            await self.db_manager.disconnect()
+
     # -------------------------------------------------------------
     # CRUD Operations
     # -------------------------------------------------------------
@@ -59,6 +180,8 @@ class RetailerInventoryManager:
             await self.db_manager.connect()
             data["Status"] = self._calculate_status(data["Quantity"], data.get("MinStock"))
             obj = await self.db_manager.create(RetailerInventory, data)
+            autocomplete_index.upsert_inventory(obj.RetailerId, obj.RetailerInventoryId, obj.MedicineName)
+            await retailer_stock_alerts.record(self.db_manager, [(self._as_row(obj), None)])
             logger.info(f"✅ Created inventory {obj.RetailerInventoryId} for retailer {data['RetailerId']}")
             return {"success": True, "message": "Inventory item created successfully", "RetailerInventoryId": obj.RetailerInventoryId}
         except Exception as e:
@@ -92,7 +215,21 @@ class RetailerInventoryManager:
             new_min = data.get("MinStock", inv.MinStock)
             data["Status"] = self._calculate_status(new_quantity, new_min)
 
-            rows = await self.db_manager.update(RetailerInventory, {"RetailerInventoryId": retailer_inventory_id, "RetailerId": retailer_id}, data)
+            result = await self.db_manager.execute(
+                update(RetailerInventory)
+                .where(
+                    RetailerInventory.RetailerInventoryId == retailer_inventory_id,
+                    RetailerInventory.RetailerId == retailer_id,
+                )
+                .values(**data)
+                .returning(*_COLUMNS)
+            )
+            updated = result.mappings().all()
+            rows = len(updated)
+            old_status = self._calculate_status(inv.Quantity, inv.MinStock)
+            await retailer_stock_alerts.record(self.db_manager, [(row, old_status) for row in updated])
+            if rows and "MedicineName" in data:
+                autocomplete_index.upsert_inventory(retailer_id, retailer_inventory_id, data["MedicineName"])
             return {"success": True, "message": "Inventory updated", "rows_affected": rows}
         except Exception as e:
             logger.error(f"❌ Error updating inventory: {e}")
@@ -105,6 +242,8 @@ class RetailerInventoryManager:
             await self.db_manager.connect()
             rows = await self.db_manager.delete(RetailerInventory, {"RetailerInventoryId": retailer_inventory_id, "RetailerId": retailer_id})
             if rows:
+                autocomplete_index.remove_inventory(retailer_id, retailer_inventory_id)
+                retailer_stock_alerts.forget(retailer_id, retailer_inventory_id)
                 return {"success": True, "message": "Inventory deleted", "rows_affected": rows}
             return {"success": False, "message": "Inventory not found"}
         except Exception as e:
@@ -119,25 +258,12 @@ class RetailerInventoryManager:
     async def reduce_stock_after_order(self, retailer_id: int, retailer_inventory_id: int, quantity_ordered: int) -> dict:
         try:
             await self.db_manager.connect()
-            items = await self.db_manager.read(RetailerInventory, {"RetailerInventoryId": retailer_inventory_id, "RetailerId": retailer_id})
-            if not items:
-                return {"success": False, "message": "Item not found"}
-
-            item = items[0]
-            if (item.Quantity or 0) < quantity_ordered:
-                return {"success": False, "message": "Insufficient stock"}
+            row = await self._change_stock(retailer_id, retailer_inventory_id, -quantity_ordered)
+            if row is None:
+                return await self._stock_change_failure(retailer_id, retailer_inventory_id)
 
-            new_quantity = max(0, (item.Quantity or 0) - quantity_ordered)
-            new_status = self._calculate_status(new_quantity, item.MinStock)
-
-            await self.db_manager.update(
-                RetailerInventory,
-                {"RetailerInventoryId": retailer_inventory_id},
-                {"Quantity": new_quantity, "Status": new_status}
-            )
-
-            logger.info(f"📦 Reduced stock for {item.MedicineName}: {item.Quantity} → {new_quantity}")
-            return {"success": True, "message": "Stock reduced", "NewQuantity": new_quantity, "Status": new_status}
+            logger.info(f"📦 Reduced stock for {row['MedicineName']}: {row['Quantity'] + quantity_ordered} → {row['Quantity']}")
+            return {"success": True, "message": "Stock reduced", "NewQuantity": row["Quantity"], "Status": row["Status"]}
         except Exception as e:
             logger.error(f"❌ Error reducing stock: {e}")
             return {"success": False, "message": str(e)}
@@ -147,22 +273,12 @@ class RetailerInventoryManager:
     async def increase_stock_after_return(self, retailer_id: int, retailer_inventory_id: int, quantity_returned: int) -> dict:
         try:
             await self.db_manager.connect()
-            items = await self.db_manager.read(RetailerInventory, {"RetailerInventoryId": retailer_inventory_id, "RetailerId": retailer_id})
-            if not items:
-                return {"success": False, "message": "Item not found"}
-
-            item = items[0]
-            new_quantity = (item.Quantity or 0) + quantity_returned
-            new_status = self._calculate_status(new_quantity, item.MinStock)
-
-            await self.db_manager.update(
-                RetailerInventory,
-                {"RetailerInventoryId": retailer_inventory_id},
-                {"Quantity": new_quantity, "Status": new_status}
-            )
+            row = await self._change_stock(retailer_id, retailer_inventory_id, quantity_returned)
+            if row is None:
+                return await self._stock_change_failure(retailer_id, retailer_inventory_id)
 
-            logger.info(f"🔁 Increased stock for {item.MedicineName}: {item.Quantity} → {new_quantity}")
-            return {"success": True, "message": "Stock increased", "NewQuantity": new_quantity, "Status": new_status}
+            logger.info(f"🔁 Increased stock for {row['MedicineName']}: {row['Quantity'] - quantity_returned} → {row['Quantity']}")
+            return {"success": True, "message": "Stock increased", "NewQuantity": row["Quantity"], "Status": row["Status"]}
         except Exception as e:
             logger.error(f"❌ Error increasing stock: {e}")
             return {"success": False, "message": str(e)}
@@ -172,44 +288,90 @@ class RetailerInventoryManager:
     async def add_stock_from_distributor(self, retailer_id: int, retailer_inventory_id: int, quantity_received: int) -> dict:
         try:
             await self.db_manager.connect()
-            items = await self.db_manager.read(RetailerInventory, {"RetailerInventoryId": retailer_inventory_id, "RetailerId": retailer_id})
-            if not items:
-                return {"success": False, "message": "Item not found"}
-
-            item = items[0]
-            new_quantity = (item.Quantity or 0) + quantity_received
-            new_status = self._calculate_status(new_quantity, item.MinStock)
-
-            await self.db_manager.update(
-                RetailerInventory,
-                {"RetailerInventoryId": retailer_inventory_id},
-                {"Quantity": new_quantity, "Status": new_status}
-            )
+            row = await self._change_stock(retailer_id, retailer_inventory_id, quantity_received)
+            if row is None:
+                return await self._stock_change_failure(retailer_id, retailer_inventory_id)
 
-            logger.info(f"🚚 Distributor stock added for {item.MedicineName}: +{quantity_received}")
-            return {"success": True, "message": "Distributor stock added", "NewQuantity": new_quantity, "Status": new_status}
+            logger.info(f"🚚 Distributor stock added for {row['MedicineName']}: +{quantity_received}")
+            return {"success": True, "message": "Distributor stock added", "NewQuantity": row["Quantity"], "Status": row["Status"]}
         except Exception as e:
             logger.error(f"❌ Error adding distributor stock: {e}")
             return {"success": False, "message": str(e)}
         finally:
             await self.db_manager.disconnect()
 
-    async def mark_expired_stock(self, retailer_id: Optional[int] = None) -> dict:
-        """Mark expired items as out of stock."""
+    # -------------------------------------------------------------
+    # Bulk import (CSV / JSON lines)
+    # -------------------------------------------------------------
+    async def import_inventory(self, retailer_id: int, upload: UploadFile, fmt: str) -> dict:
+        """Upsert every row of the file on (RetailerId, MedicineName, Batch); see utils/inventory_import.py."""
         try:
             await self.db_manager.connect()
-            query = {"RetailerId": retailer_id} if retailer_id else None
-            all_items = await self.db_manager.read(RetailerInventory, query)
+            report = await self.importer.run(self.db_manager, retailer_id, upload, fmt)
+            retailer_stock_alerts.invalidate(retailer_id)
+            autocomplete_index.invalidate_retailer(retailer_id)
+            logger.info(
+                f"📥 Imported inventory for retailer {retailer_id}: "
+                f"{report['Inserted']} inserted, {report['Updated']} updated, {report['Failed']} failed"
+            )
+            return {"success": True, "message": "Inventory imported", **report}
+        except Exception as e:
+            logger.error(f"❌ Error importing inventory for retailer {retailer_id}: {e}")
+            return {"success": False, "message": str(e)}
+        finally:
+            await self.db_manager.disconnect()
 
-            expired_items = [i for i in all_items if i.ExpiryDate and i.ExpiryDate < datetime.now().date()]
-            count = 0
-            for i in expired_items:
-                await self.db_manager.update(
-                    RetailerInventory,
-                    {"RetailerInventoryId": i.RetailerInventoryId},
-                    {"Quantity": 0, "Status": "no"}
+    # -------------------------------------------------------------
+    # FEFO allocation across batches
+    # -------------------------------------------------------------
+    async def allocate_stock(self, retailer_id: int, lines: List[Tuple[str, int]]) -> dict:
+        """
+        Take each (MedicineName, Quantity) line from the batches that expire first,
+        in one transaction. Nothing is written when any line is short.
+        """
+        try:
+            await self.db_manager.connect()
+            async with self.db_manager.transaction() as session:
+                allocations, changes = await retailer_allocator.allocate(session, retailer_id, lines, ist_now().date())
+
+            await retailer_stock_alerts.record(self.db_manager, [
+                (
+                    {**row, "Status": self._calculate_status(row["Quantity"], row["MinStock"])},
+                    self._calculate_status(row["Quantity"] + take, row["MinStock"]),
                 )
-                count += 1
+                for row, take in changes
+            ])
+            logger.info(f"📦 Allocated {len(allocations)} line(s) across {len(changes)} batch(es) for retailer {retailer_id}")
+            return {"success": True, "message": "Stock allocated", "Allocations": allocations}
+        except InsufficientStockException as e:
+            return {"success": False, "message": "Insufficient stock", "Shortages": e.shortages}
+        except StockConflictException as e:
+            logger.warning(f"⚠️ Allocation conflict for retailer {retailer_id}: {e}")
+            return {"success": False, "message": str(e)}
+        except Exception as e:
+            logger.error(f"❌ Error allocating stock for retailer {retailer_id}: {e}")
+            return {"success": False, "message": str(e)}
+        finally:
+            await self.db_manager.disconnect()
+
+    async def mark_expired_stock(self, retailer_id: Optional[int] = None) -> dict:
+        """Mark expired items as out of stock with one set-based UPDATE."""
+        try:
+            await self.db_manager.connect()
+            stmt = (
+                update(RetailerInventory)
+                .where(
+                    RetailerInventory.ExpiryDate < ist_now().date(),
+                    or_(RetailerInventory.Quantity != 0, RetailerInventory.Status != "no"),
+                )
+                .values(Quantity=0, Status="no")
+                .returning(*_COLUMNS)
+            )
+            if retailer_id:
+                stmt = stmt.where(RetailerInventory.RetailerId == retailer_id)
+            expired = (await self.db_manager.execute(stmt)).mappings().all()
+            count = len(expired)
+            await retailer_stock_alerts.record(self.db_manager, [(row, None) for row in expired], reason="Batch expired.")
 
             logger.info(f"⚠️ Marked {count} items expired for retailer {retailer_id or 'ALL'}.")
             return {"success": True, "message": f"Marked {count} expired items"}
@@ -218,3 +380,9 @@ class RetailerInventoryManager:
             return {"success": False, "message": str(e)}
         finally:
             await self.db_manager.disconnect()
+
+    # ------------------------------------------------------------
+    # 📤 Export
+    # ------------------------------------------------------------
+    def export_inventory(self, retailer_id: int, fmt: str) -> AsyncIterator[bytes]:
+        return stream_rows(self.db_type, RetailerInventory, [RetailerInventory.RetailerId == retailer_id], fmt, settings.export_chunk_size)
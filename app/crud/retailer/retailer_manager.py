@@ -4,7 +4,8 @@ from ...db.base.database_manager import DatabaseManager
 from ...models.retailer.retailer_model import Retailer
 from ...schemas.retailer.retailer_schema import RetailerCreate, RetailerUpdate, RetailerRead
 import hashlib
-from ...utils.retailer_sync import sync_retailer
+from sqlalchemy import delete, update
+from ...utils.retailer_sync import add_retailer_event
 
 
 logger = get_logger(__name__)
@@ -25,18 +26,17 @@ class RetailerManager:
             data["PasswordHash"] = hash_password(data.pop("Password"))
             existing = await self.db_manager.read(Retailer, {"Email": data["Email"]})
             if not existing:
-                obj = await self.db_manager.create(Retailer, data)
+                async with self.db_manager.transaction() as session:
+                    obj = Retailer(**data)
+                    session.add(obj)
+                    await session.flush()
+                    # 🔁 SYNC (outbox, same transaction)
+                    add_retailer_event(session, "create", obj.RetailerId, RetailerRead.from_orm(obj).dict())
             else:
                 return {
                 "success": False,
                 "message": "Email Id Already Exists"
             }
-            # 🔁 SYNC
-            res = await sync_retailer(
-                "create",
-                RetailerRead.from_orm(obj).dict()
-            )
-            print(res)
             logger.info(f"Created retailer {obj.RetailerId}")
             return {
                 "success": True,
@@ -88,21 +88,15 @@ class RetailerManager:
             update_data = data.dict(exclude_unset=True)
             if "Password" in update_data:
                 update_data["PasswordHash"] = hash_password(update_data.pop("Password"))
-            rowcount = await self.db_manager.update(
-                Retailer, {"RetailerId": retailer_id}, update_data
-            )
-            if rowcount:
-
-                # 🔁 SYNC
-                await sync_retailer(
-                    "update",
-                    {
-                        "RetailerId": retailer_id,
-                        **update_data
-                    }
+            async with self.db_manager.transaction() as session:
+                result = await session.execute(
+                    update(Retailer).where(Retailer.RetailerId == retailer_id).values(**update_data)
                 )
-
-
+                rowcount = result.rowcount
+                if rowcount:
+                    # 🔁 SYNC (outbox, same transaction)
+                    add_retailer_event(session, "update", retailer_id, {"RetailerId": retailer_id, **update_data})
+            if rowcount:
                 logger.info(f"Updated retailer {retailer_id}, rows affected: {rowcount}")
                 return {
                     "success": True,
@@ -123,15 +117,13 @@ class RetailerManager:
     async def delete_retailer(self, retailer_id: int) -> dict:
         try:
             await self.db_manager.connect()
-            rowcount = await self.db_manager.delete(Retailer, {"RetailerId": retailer_id})
+            async with self.db_manager.transaction() as session:
+                result = await session.execute(delete(Retailer).where(Retailer.RetailerId == retailer_id))
+                rowcount = result.rowcount
+                if rowcount:
+                    # 🔁 SYNC (outbox, same transaction)
+                    add_retailer_event(session, "delete", retailer_id, {"RetailerId": retailer_id})
             if rowcount:
-
-                # 🔁 SYNC
-                await sync_retailer(
-                    "delete",
-                    {"RetailerId": retailer_id}
-                )
-
                 logger.info(f"Deleted retailer {retailer_id}, rows affected: {rowcount}")
                 return {
                     "success": True,
@@ -159,23 +151,22 @@ class RetailerManager:
             if existing:
                 return {"success": False, "message": "Email already registered"}
 
-            retailer = await self.db_manager.create(
-                Retailer,
-                {
-                    "Email": email,
-                    "PasswordHash": hash_password(password),
-                },
-            )
-
-            # 🔁 SYNC
-            await sync_retailer(
-                "register",
-                {
-                    "RetailerId": retailer.RetailerId,
-                    "Email": retailer.Email,
-                    "PasswordHash": retailer.PasswordHash,
-                }
-            )
+            async with self.db_manager.transaction() as session:
+                retailer = Retailer(Email=email, PasswordHash=hash_password(password))
+                session.add(retailer)
+                await session.flush()
+
+                # 🔁 SYNC (outbox, same transaction)
+                add_retailer_event(
+                    session,
+                    "register",
+                    retailer.RetailerId,
+                    {
+                        "RetailerId": retailer.RetailerId,
+                        "Email": retailer.Email,
+                        "PasswordHash": retailer.PasswordHash,
+                    }
+                )
 
             return {
                 "success": True,
@@ -1,12 +1,32 @@
-from ...utils.timezone import ist_now
+from ...utils.timezone import ist_now, to_ist
 from typing import Optional, List
+from datetime import datetime
+from sqlalchemy import delete, select, update
+from ...config import settings
 from ...db.base.database_manager import DatabaseManager
 from ...models.retailer.retailer_notification_model import RetailerNotification
 from ...schemas.retailer.retailer_notification_schema import RetailerNotificationCreate, RetailerNotificationUpdate
 from ...utils.logger import get_logger
+from ...utils.notification_counters import NotificationCounters
+from ...utils.event_hub import event_hub
 
 logger = get_logger(__name__)
 
+# Per-retailer inbox counters, shared by every manager instance
+retailer_notification_counters = NotificationCounters(
+    RetailerNotification,
+    owner_field="RetailerId",
+    max_accounts=settings.notification_counter_max_accounts,
+    ttl_seconds=settings.notification_counter_ttl_seconds,
+)
+
+
+def retailer_notifications_inserted(rows: List[dict]) -> None:
+    """Every RetailerNotification insert reports here: counters first, then the push to connected apps."""
+    retailer_notification_counters.added(rows)
+    for row in rows:
+        event_hub.publish("retailer", row["RetailerId"], "notification", row)
+
 
 class RetailerNotificationManager:
     def __init__(self, db_type: str):
@@ -20,7 +40,9 @@ class RetailerNotificationManager:
             await self.db_manager.connect()
             data = notification.dict()
             data["Date"] = ist_now()
-            await self.db_manager.create(RetailerNotification, data)
+            created = await self.db_manager.create(RetailerNotification, data)
+            data["NotificationId"] = created.NotificationId
+            retailer_notifications_inserted([data])
 
             logger.info(f"✅ Notification created: {data['Title']}")
             return {"success": True, "message": "Notification created successfully"}
@@ -33,22 +55,37 @@ class RetailerNotificationManager:
     # ------------------------------------------------------------
     # 🟡 Get All Notifications (by retailer)
     # ------------------------------------------------------------
-    async def get_notifications(self, retailer_id: int) -> dict:
+    async def get_notifications(
+        self,
+        retailer_id: int,
+        limit: int = 50,
+        before_id: Optional[int] = None,
+        unread_only: bool = False,
+    ) -> dict:
+        """
+        Newest-first page of the inbox plus the cached counters. Pages are keyset
+        based: pass the returned NextBeforeId to get the next (older) page.
+        """
         try:
             await self.db_manager.connect()
-            notifications = await self.db_manager.read(
-                RetailerNotification, {"RetailerId": retailer_id}
+            filters = [RetailerNotification.RetailerId == retailer_id]
+            if unread_only:
+                filters.append(RetailerNotification.IsRead.is_not(True))
+            if before_id is not None:
+                filters.append(RetailerNotification.NotificationId < before_id)
+            result = await self.db_manager.execute(
+                select(*RetailerNotification.__table__.c)
+                .where(*filters)
+                .order_by(RetailerNotification.NotificationId.desc())
+                .limit(limit)
             )
-            total = len(notifications)
-            unread = len([n for n in notifications if not n.IsRead])
-            order_related = len([n for n in notifications if "order" in n.Type.lower()])
-            stock_related = len([n for n in notifications if "stock" in n.Type.lower()])
+            notifications = [dict(row) for row in result.mappings().all()]
+            counts = await retailer_notification_counters.counts(self.db_manager, retailer_id)
 
             return {
-                "Total": total,
-                "Unread": unread,
-                "Orders": order_related,
-                "StockAlerts": stock_related,
+                **counts,
+                "Limit": limit,
+                "NextBeforeId": notifications[-1]["NotificationId"] if len(notifications) == limit else None,
                 "Notifications": notifications,
             }
         except Exception as e:
@@ -57,16 +94,41 @@ class RetailerNotificationManager:
         finally:
             await self.db_manager.disconnect()
 
+    # ------------------------------------------------------------
+    # 🔢 Inbox Counters (cheap enough to poll)
+    # ------------------------------------------------------------
+    async def get_counts(self, retailer_id: int) -> dict:
+        try:
+            await self.db_manager.connect()
+            return await retailer_notification_counters.counts(self.db_manager, retailer_id)
+        except Exception as e:
+            logger.error(f"❌ Error fetching notification counts for retailer {retailer_id}: {e}")
+            return {"success": False, "message": f"Error fetching notification counts: {e}"}
+        finally:
+            await self.db_manager.disconnect()
+
     # ------------------------------------------------------------
     # 🟠 Mark Notification as Read
     # ------------------------------------------------------------
     async def mark_as_read(self, notification_id: int) -> dict:
         try:
             await self.db_manager.connect()
-            rowcount = await self.db_manager.update(
-                RetailerNotification, {"NotificationId": notification_id}, {"IsRead": True}
+            result = await self.db_manager.execute(
+                update(RetailerNotification)
+                .where(RetailerNotification.NotificationId == notification_id, RetailerNotification.IsRead.is_not(True))
+                .values(IsRead=True)
+                .returning(RetailerNotification.RetailerId)
             )
-            if rowcount:
+            row = result.first()
+            if row:
+                retailer_notification_counters.read(row[0], 1)
+            else:
+                # Already read is still a success, only a missing id is not
+                result = await self.db_manager.execute(
+                    select(RetailerNotification.NotificationId).where(RetailerNotification.NotificationId == notification_id)
+                )
+                row = result.first()
+            if row:
                 logger.info(f"✅ Notification {notification_id} marked as read")
                 return {"success": True, "message": "Notification marked as read"}
             return {"success": False, "message": "Notification not found"}
@@ -76,16 +138,48 @@ class RetailerNotificationManager:
         finally:
             await self.db_manager.disconnect()
 
+    # ------------------------------------------------------------
+    # 🟠 Mark Many Notifications as Read
+    # ------------------------------------------------------------
+    async def mark_many_as_read(
+        self,
+        retailer_id: int,
+        notification_ids: Optional[List[int]] = None,
+        before: Optional[datetime] = None,
+    ) -> dict:
+        """One UPDATE for an id list or for everything dated at or before `before`."""
+        try:
+            await self.db_manager.connect()
+            filters = [RetailerNotification.RetailerId == retailer_id, RetailerNotification.IsRead.is_not(True)]
+            if notification_ids:
+                filters.append(RetailerNotification.NotificationId.in_(notification_ids))
+            if before is not None:
+                filters.append(RetailerNotification.Date <= to_ist(before))
+            result = await self.db_manager.execute(update(RetailerNotification).where(*filters).values(IsRead=True))
+            retailer_notification_counters.read(retailer_id, result.rowcount)
+
+            logger.info(f"✅ Marked {result.rowcount} notification(s) as read for retailer {retailer_id}")
+            return {"success": True, "message": f"Marked {result.rowcount} notifications as read", "Updated": result.rowcount}
+        except Exception as e:
+            logger.error(f"❌ Error marking notifications as read for retailer {retailer_id}: {e}")
+            return {"success": False, "message": f"Error marking notifications as read: {e}"}
+        finally:
+            await self.db_manager.disconnect()
+
     # ------------------------------------------------------------
     # 🔴 Delete Notification
     # ------------------------------------------------------------
     async def delete_notification(self, notification_id: int) -> dict:
         try:
             await self.db_manager.connect()
-            rowcount = await self.db_manager.delete(
-                RetailerNotification, {"NotificationId": notification_id}
+            result = await self.db_manager.execute(
+                delete(RetailerNotification)
+                .where(RetailerNotification.NotificationId == notification_id)
+                .returning(RetailerNotification.RetailerId)
             )
-            if rowcount:
+            row = result.first()
+            if row:
+                retailer_notification_counters.invalidate(row[0])
                 logger.info(f"🗑️ Notification {notification_id} deleted successfully")
                 return {"success": True, "message": "Notification deleted successfully"}
             return {"success": False, "message": "Notification not found"}
@@ -104,6 +198,7 @@ class RetailerNotificationManager:
             rowcount = await self.db_manager.delete(
                 RetailerNotification, {"RetailerId": retailer_id}
             )
+            retailer_notification_counters.invalidate(retailer_id)
             if rowcount:
                 logger.info(f"🧹 Deleted all notifications for Retailer {retailer_id}")
                 return {"success": True, "message": f"Deleted {rowcount} notifications"}
@@ -1,6 +1,10 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator
 from ...utils.timezone import ist_now
 from ...utils.logger import get_logger
+from ...config import settings
+from ...utils.data_export import stream_rows
+from ...utils.event_hub import event_hub
+from sqlalchemy import update
 from ...db.base.database_manager import DatabaseManager
 from ...models.retailer.retailer_order_model import RetailerOrder
 from ...models.retailer.retailer_model import Retailer
@@ -17,6 +21,7 @@ from ...schemas.retailer.retailer_order_schema import (
 )
 
 # Invoice Imports for Auto-generation
+from ..distributor.retailer_invoice_manager import RetailerInvoiceManager as DistributorInvoiceManager
 from ...models.distributor.retailer_invoice_model import RetailerInvoice, RetailerInvoiceItem
 from ...schemas.distributor.retailer_invoice_schema import (
     RetailerInvoiceCreate,
@@ -27,11 +32,18 @@ from ...schemas.distributor.retailer_invoice_schema import (
 logger = get_logger(__name__)
 
 
+def _publish_order_event(event_type: str, order: Dict[str, Any]) -> None:
+    """Both sides of a retailer order get the push."""
+    event_hub.publish("retailer", order.get("RetailerId"), event_type, order)
+    event_hub.publish("distributor", order.get("DistributorId"), event_type, order)
+
+
 class RetailerOrderManager:
     def __init__(self, db_type: str):
+        self.db_type = db_type
         self.db_manager = DatabaseManager(db_type)
-        # Initialize Invoice Manager for internal calls
-        self.invoice_manager = RetailerInvoiceManager(db_type)
+        # Initialize Invoice Manager for internal calls (the distributor one, which stores the invoice snapshot)
+        self.invoice_manager = DistributorInvoiceManager(db_type)
 
     # ------------------------------------------------------------
     #  Create Order + Items
@@ -76,6 +88,15 @@ class RetailerOrderManager:
             )
 
             logger.info(f" Retailer Order {order_id} created with items")
+            _publish_order_event("order.created", {
+                "OrderId": order_id,
+                "RetailerId": new_order.RetailerId,
+                "DistributorId": new_order.DistributorId,
+                "Status": new_order.Status,
+                "TotalItems": total_items,
+                "TotalAmount": total_amount,
+                "OrderDateTime": order_data["OrderDateTime"],
+            })
 
             return {
                 "success": True,
@@ -280,16 +301,21 @@ class RetailerOrderManager:
             await self.db_manager.connect()
             print(f"DEBUG: Updating Order {order_id} status to {status}")
 
-            rowcount = await self.db_manager.update(
-                RetailerOrder,
-                {"OrderId": order_id},
-                {
-                    "Status": status,
-                    "UpdatedAt": ist_now()
-                }
+            result = await self.db_manager.execute(
+                update(RetailerOrder)
+                .where(RetailerOrder.OrderId == order_id)
+                .values(Status=status, UpdatedAt=ist_now())
+                .returning(RetailerOrder.RetailerId, RetailerOrder.DistributorId)
             )
+            row = result.first()
 
-            if rowcount:
+            if row:
+                _publish_order_event("order.status", {
+                    "OrderId": order_id,
+                    "RetailerId": row.RetailerId,
+                    "DistributorId": row.DistributorId,
+                    "Status": status,
+                })
                 invoice_msg = ""
                 if status == "Accepted":
                     print(f"DEBUG: Triggering Auto-Invoice for Order {order_id}")
@@ -406,6 +432,17 @@ class RetailerOrderManager:
         finally:
             await self.db_manager.disconnect()
 
+    # ------------------------------------------------------------
+    # 📤 Export (by retailer)
+    # ------------------------------------------------------------
+    def export_orders_by_retailer(self, retailer_id: int, fmt: str) -> AsyncIterator[bytes]:
+        return stream_rows(self.db_type, RetailerOrder, [RetailerOrder.RetailerId == retailer_id], fmt, settings.export_chunk_size)
+
+    # ------------------------------------------------------------
+    # 📤 Export (by distributor)
+    # ------------------------------------------------------------
+    def export_orders_by_distributor(self, distributor_id: int, fmt: str) -> AsyncIterator[bytes]:
+        return stream_rows(self.db_type, RetailerOrder, [RetailerOrder.DistributorId == distributor_id], fmt, settings.export_chunk_size)
 
 
 class RetailerOrderItemManager:
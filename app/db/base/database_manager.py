@@ -39,3 +39,10 @@ class DatabaseManager:
 
     async def execute_query(self, raw_sql: str) -> Any:
         return await self.db.execute_query(raw_sql)
+
+    async def execute(self, statement: Any, params: Optional[Dict] = None) -> Any:
+        return await self.db.execute(statement, params)
+
+    def transaction(self) -> Any:
+        """async with db_manager.transaction() as session: ... (one commit / rollback)"""
+        return self.db.transaction()
@@ -47,3 +47,19 @@ class IDatabase(ABC):
         For SQL DBs, run raw SQL. For Mongo, you may raise NotImplementedError or support aggregation.
         """
         pass
+
+    @abstractmethod
+    async def execute(self, statement: Any, params: Optional[Dict] = None) -> Any:
+        """
+        Run a SQLAlchemy statement (select / insert / update / delete / text) with bound
+        parameters in its own transaction and return the buffered result.
+        """
+        pass
+
+    @abstractmethod
+    def transaction(self) -> Any:
+        """
+        Async context manager yielding a session inside one transaction: committed
+        when the block exits normally, rolled back if it raises.
+        """
+        pass
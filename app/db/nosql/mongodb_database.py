@@ -51,3 +51,9 @@ class MongoDBDatabase(IDatabase):
 
     async def execute_query(self, raw_sql: str) -> Any:
         raise NotImplementedError("Raw SQL not supported in MongoDB backend")
+
+    async def execute(self, statement: Any, params: Optional[Dict] = None) -> Any:
+        raise NotImplementedError("SQL statements not supported in MongoDB backend")
+
+    def transaction(self) -> Any:
+        raise NotImplementedError("SQL transactions not supported in MongoDB backend")
@@ -3,7 +3,8 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import text, select, update as sql_update, delete as sql_delete
-from typing import Any, Dict, List, Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from ..base.idatabase import IDatabase
 
@@ -83,3 +84,17 @@ class SQLiteDatabase(IDatabase):
         async with session:
             result = await session.execute(text(raw_sql))
             return result.fetchall()
+
+    async def execute(self, statement: Any, params: Optional[Dict] = None) -> Any:
+        session = self.get_session()
+        async with session:
+            result = await session.execute(statement, params or {})
+            await session.commit()
+            return result
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[AsyncSession]:
+        session = self.get_session()
+        async with session:
+            async with session.begin():
+                yield session
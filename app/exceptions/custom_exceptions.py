@@ -14,4 +14,12 @@ class NotFoundException(Exception):
     pass
 
 class UnauthorizedException(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class InsufficientStockException(Exception):
+    def __init__(self, shortages):
+        self.shortages = shortages
+        super().__init__("Insufficient stock")
+
+class StockConflictException(Exception):
+    pass
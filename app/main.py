@@ -1,10 +1,11 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 
 
 from .api.retailer.medicine_api import MedicineAPI
 from .api.retailer.customer_order_api import CustomerOrderAPI
+from .api.retailer.autocomplete_api import AutocompleteAPI
 
 
 # Retailer
@@ -14,22 +15,52 @@ from .api.retailer.retailer_order_api import RetailerOrderAPI, RetailerOrderItem
 from .api.retailer.retailer_report_api import RetailerReportAPI
 from .api.retailer.retailer_dashboard_api import RetailerDashboardAPI
 from .api.retailer.customer_invoice_api import CustomerInvoiceAPI
+from .api.retailer.image_api import ImageAPI
 from .api.retailer.retailer_notification_api import RetailerNotificationAPI
+from .api.retailer.retailer_event_api import RetailerEventAPI
 
 
 # Distributor
 from .api.distributor.distributor_api import DistributorAPI
 from .api.distributor.distributor_notification_api import DistributorNotificationAPI
+from .api.distributor.distributor_event_api import DistributorEventAPI
 from .api.distributor.distributor_inventory_api import DistributorInventoryAPI
 from .api.distributor.retailer_invoice_api import RetailerInvoiceAPI
 from .api.distributor.distributor_report_api import DistributorReportAPI
 from .api.distributor.distributor_dashboard_api import DistributorDashboardAPI
 from .api.distributor.pharma_order_api import PharmaOrderAPI
 
+from .config import settings
+from .crud.retailer.retailer_inventory_manager import RetailerInventoryManager
+from .crud.distributor.distributor_inventory_manager import DistributorInventoryManager
+from .crud.retailer.customer_order_mirror import order_mirror
+from .utils.scheduler import Scheduler, parse_time_of_day
+from .utils.http_client import upstream
+from .utils.retailer_sync import retailer_sync_dispatcher
+from .utils.pdf_renderer import invoice_pdf
+from .utils.image_uploader import BASE_DIR as IMAGES_DIR
+from .utils.static_files import ImmutableStaticFiles
+from .utils.image_gc import image_gc
 
 
 
-app = FastAPI(title="Medical App API list")
+
+scheduler = Scheduler(settings.db_type, lease_seconds=settings.job_lease_seconds)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await upstream.start()
+    invoice_pdf.start()
+    if settings.scheduler_enabled:
+        scheduler.start()
+    yield
+    await scheduler.stop()
+    invoice_pdf.shutdown()
+    await upstream.aclose()
+
+
+app = FastAPI(title="Medical App API list", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -39,11 +70,13 @@ app.add_middleware(
     allow_headers=["*"],          # allow all headers
 )
 
-app.mount("/Images", StaticFiles(directory="Images"), name="Images")
+app.mount("/Images", ImmutableStaticFiles(directory=IMAGES_DIR), name="Images")
 
 
 medicine_api = MedicineAPI()
 customer_order_api = CustomerOrderAPI()
+autocomplete_api = AutocompleteAPI()
+image_api = ImageAPI()
 
 # Retailer
 retailer_api = RetailerAPI()
@@ -54,11 +87,13 @@ retailer_report_api = RetailerReportAPI()
 retailer_dashboard_api = RetailerDashboardAPI()
 customer_invoice_api = CustomerInvoiceAPI()
 retailer_notification_api = RetailerNotificationAPI()
+retailer_event_api = RetailerEventAPI()
 
 
 # Distributor
 distributor_api = DistributorAPI()
 distributor_notification_api = DistributorNotificationAPI()
+distributor_event_api = DistributorEventAPI()
 distributor_inventory_api = DistributorInventoryAPI()
 # distributor_order_api = DistributorAPI()
 retailer_invoice_api = RetailerInvoiceAPI()
@@ -67,10 +102,23 @@ distributor_dashboard_api = DistributorDashboardAPI()
 pharma_order_api = PharmaOrderAPI()
 
 
+# Scheduled jobs
+async def sweep_expired_stock():
+    await RetailerInventoryManager(settings.db_type).mark_expired_stock()
+    await DistributorInventoryManager(settings.db_type).mark_expired_stock()
+
+scheduler.daily("expiry_sweep", parse_time_of_day(settings.expiry_sweep_time), sweep_expired_stock)
+scheduler.every("customer_order_sync", settings.customer_order_sync_seconds, order_mirror.pull)
+scheduler.every("retailer_sync", settings.retailer_sync_interval_seconds, retailer_sync_dispatcher.dispatch)
+scheduler.every("image_gc", settings.image_gc_interval_seconds, image_gc.scheduled_run)
+
+
 
 
 app.include_router(medicine_api.router, tags=["Medicine"])
 app.include_router(customer_order_api.router, tags=["Customer Order Api"])
+app.include_router(autocomplete_api.router, tags=["Autocomplete"])
+app.include_router(image_api.router, tags=["Images"])
 
 
 # Retailer
@@ -82,12 +130,14 @@ app.include_router(customer_invoice_api.router, tags=["Retailer Invoices"])
 # app.include_router(retailer_report_api.router, tags=["Retailer Reports"])
 app.include_router(retailer_api.router, tags=["Retailer"])
 app.include_router(retailer_notification_api.router, tags=["Retailer Notifications"])
+app.include_router(retailer_event_api.router, tags=["Retailer Events"])
 
 
 
 # Distributor
 app.include_router(distributor_api.router, tags=["Distributor"])
 app.include_router(distributor_notification_api.router, tags=["Distributor Notification"])
+app.include_router(distributor_event_api.router, tags=["Distributor Events"])
 app.include_router(distributor_inventory_api.router, tags=["Distributor Inventory"])
 # app.include_router(distributor_order_api.router, tags=["Distributor Orders"])
 app.include_router(retailer_invoice_api.router, tags=["Distributor Invoices"])
@@ -1,11 +1,17 @@
-from sqlalchemy import Column, Integer, String, Float, Date
+from sqlalchemy import Column, Integer, String, Float, Date, Index
 from .sql_base import Base
 
 class DistributorInventory(Base):
     __tablename__ = "DistributorInventory"
+    __table_args__ = (
+        Index("ix_DistributorInventory_DistributorId_Status", "DistributorId", "Status"),
+        Index("ix_DistributorInventory_DistributorId_ExpiryDate", "DistributorId", "ExpiryDate"),
+        Index("ix_DistributorInventory_ExpiryDate", "ExpiryDate"),
+        Index("ix_DistributorInventory_DistributorId_MedicineName_ExpiryDate", "DistributorId", "MedicineName", "ExpiryDate"),
+    )
 
     DistributorInventoryId = Column(Integer, primary_key=True, index=True)
-    DistributorId = Column(Integer, nullable=False)
+    DistributorId = Column(Integer, nullable=False, index=True)
 
     MedicineName = Column(String, nullable=False)
     Brand = Column(String, nullable=True)
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
 from ...utils.timezone import ist_now
 from .sql_base import Base
 
 
 class DistributorNotification(Base):
     __tablename__ = "DistributorNotification"
+    __table_args__ = (
+        Index("ix_DistributorNotification_DistributorId_IsRead_Date", "DistributorId", "IsRead", "Date"),
+        Index("ix_DistributorNotification_DistributorId_NotificationId", "DistributorId", "NotificationId"),
+    )
 
     NotificationId = Column(Integer, primary_key=True, index=True)
     DistributorId = Column(Integer, nullable=False)
@@ -7,7 +7,7 @@ class PharmaOrder(Base):
     __tablename__ = "PharmaOrder"
 
     PONumber = Column(Integer, primary_key=True, index=True)
-    DistributorId = Column(Integer, nullable=False)
+    DistributorId = Column(Integer, nullable=False, index=True)
     PharmaId = Column(Integer, nullable=False)
     PharmaName = Column(String, nullable=False)
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON
 from ...utils.timezone import ist_now
 from .sql_base import Base
 
@@ -8,7 +8,7 @@ class RetailerInvoice(Base):
 
     InvoiceId = Column(Integer, primary_key=True, index=True)
     OrderId = Column(Integer, nullable=False)   # linked to RetailerOrder
-    DistributorId = Column(Integer, nullable=False)  # link to distributor
+    DistributorId = Column(Integer, nullable=False, index=True)  # link to distributor
     RetailerName = Column(String, nullable=False)
 
     InvoiceDate = Column(DateTime, default=ist_now)
@@ -22,6 +22,9 @@ class RetailerInvoice(Base):
     PaymentMode = Column(String, nullable=True)
     PaymentTransactionId = Column(String, nullable=True)
 
+    # Invoice document as issued (parties, lines, tax, totals); see RetailerInvoiceManager.get_invoice
+    Snapshot = Column(JSON, nullable=True)
+
     CreatedAt = Column(DateTime, default=ist_now)
     UpdatedAt = Column(DateTime, default=ist_now, onupdate=ist_now)
     CreatedBy = Column(String, nullable=True)
@@ -8,7 +8,7 @@ class CustomerInvoice(Base):
 
     InvoiceId = Column(Integer, primary_key=True, index=True)
     OrderId = Column(Integer, nullable=False)   # linked to CustomerOrder
-    RetailerId = Column(Integer, nullable=False)  # link to retailer
+    RetailerId = Column(Integer, nullable=False, index=True)  # link to retailer
     CustomerName = Column(String, nullable=False)
 
     InvoiceDate = Column(DateTime, default=ist_now)
@@ -0,0 +1,51 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Index
+from ...utils.timezone import ist_now
+from .sql_base import Base
+
+
+class CustomerOrder(Base):
+    """Local mirror of the customer-order service (kept current by CustomerOrderMirror.pull in crud/retailer/customer_order_mirror.py)."""
+    __tablename__ = "CustomerOrder"
+    __table_args__ = (
+        Index("ix_CustomerOrder_RetailerId_OrderId", "RetailerId", "OrderId"),
+        Index("ix_CustomerOrder_UpdatedAt", "UpdatedAt"),
+    )
+
+    OrderId = Column(Integer, primary_key=True, autoincrement=False)  # upstream id
+    RetailerId = Column(Integer, nullable=False)
+    Status = Column(String, nullable=True)
+    TotalAmount = Column(Float, nullable=True)
+    OrderDateTime = Column(String, nullable=True)  # as sent by upstream (ISO text)
+    UpdatedAt = Column(String, nullable=True)      # upstream change cursor (ISO text)
+
+    Payload = Column(JSON, nullable=False)         # full upstream order, served as-is
+    SyncedAt = Column(DateTime, default=ist_now, onupdate=ist_now)
+
+
+class CustomerOrderItem(Base):
+    __tablename__ = "CustomerOrderItem"
+    __table_args__ = (
+        Index("ix_CustomerOrderItem_RetailerId_OrderId", "RetailerId", "OrderId"),
+    )
+
+    OrderItemId = Column(Integer, primary_key=True, autoincrement=False)  # upstream id
+    OrderId = Column(Integer, nullable=False)
+    RetailerId = Column(Integer, nullable=False)
+
+    Payload = Column(JSON, nullable=False)
+    SyncedAt = Column(DateTime, default=ist_now, onupdate=ist_now)
+
+
+class CustomerOrderSyncState(Base):
+    """
+    Progress of the mirror sync. Scope 'feed' holds the changes-feed cursor
+    and is completed once a pass reached the end of the feed; 'retailer:<id>'
+    is completed when a full pull of that retailer's lists went through.
+    'full' holds (in Cursor) the epoch second the last full pull started.
+    """
+    __tablename__ = "CustomerOrderSyncState"
+
+    Scope = Column(String, primary_key=True)
+    Cursor = Column(String, nullable=True)
+    CompletedAt = Column(DateTime, nullable=True)
+    UpdatedAt = Column(DateTime, default=ist_now, onupdate=ist_now)
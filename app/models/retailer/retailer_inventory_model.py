@@ -1,11 +1,17 @@
-from sqlalchemy import Column, Integer, String, Float, Date
+from sqlalchemy import Column, Integer, String, Float, Date, Index
 from .sql_base import Base
 
 class RetailerInventory(Base):
     __tablename__ = "RetailerInventory"
+    __table_args__ = (
+        Index("ix_RetailerInventory_RetailerId_Status", "RetailerId", "Status"),
+        Index("ix_RetailerInventory_RetailerId_ExpiryDate", "RetailerId", "ExpiryDate"),
+        Index("ix_RetailerInventory_ExpiryDate", "ExpiryDate"),
+        Index("ix_RetailerInventory_RetailerId_MedicineName_ExpiryDate", "RetailerId", "MedicineName", "ExpiryDate"),
+    )
 
     RetailerInventoryId = Column(Integer, primary_key=True, index=True)
-    RetailerId = Column(Integer, nullable=False)  # No foreign key
+    RetailerId = Column(Integer, nullable=False, index=True)  # No foreign key
     MedicineName = Column(String, nullable=False)
     Brand = Column(String, nullable=True)
     MinStock = Column(Integer, nullable=True)
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
 from ...utils.timezone import ist_now
 from .sql_base import Base
 
 
 class RetailerNotification(Base):
     __tablename__ = "RetailerNotification"
+    __table_args__ = (
+        Index("ix_RetailerNotification_RetailerId_IsRead_Date", "RetailerId", "IsRead", "Date"),
+        Index("ix_RetailerNotification_RetailerId_NotificationId", "RetailerId", "NotificationId"),
+    )
 
     NotificationId = Column(Integer, primary_key=True, index=True)
     RetailerId = Column(Integer, nullable=False)
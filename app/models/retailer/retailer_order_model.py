@@ -7,8 +7,8 @@ class RetailerOrder(Base):
     __tablename__ = "RetailerOrders"
 
     OrderId = Column(Integer, primary_key=True, index=True)
-    RetailerId = Column(Integer, nullable=False)
-    DistributorId = Column(Integer, nullable=False)
+    RetailerId = Column(Integer, nullable=False, index=True)
+    DistributorId = Column(Integer, nullable=False, index=True)
     DistributorName = Column(String, nullable=False)
     
     OrderDateTime = Column(DateTime, default=ist_now)
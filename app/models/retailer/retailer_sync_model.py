@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Index
+from ...utils.timezone import ist_now
+from .sql_base import Base
+
+
+class RetailerSyncOutbox(Base):
+    """Retailer changes waiting to be sent to the partner app (see utils/retailer_sync.py)."""
+    __tablename__ = "RetailerSyncOutbox"
+    __table_args__ = (
+        Index("ix_RetailerSyncOutbox_RetailerId_EventId", "RetailerId", "EventId"),
+    )
+
+    EventId = Column(Integer, primary_key=True, autoincrement=True)
+    RetailerId = Column(Integer, nullable=False)
+    Action = Column(String, nullable=False)        # create / update / delete / register
+    Payload = Column(JSON, nullable=False)
+
+    Attempts = Column(Integer, nullable=False, default=0)
+    NextAttemptAt = Column(Float, nullable=False, default=0)  # epoch seconds; pushed ahead while claimed
+    ClaimedBy = Column(String, nullable=True)                 # dispatch run that is sending the event
+    LastError = Column(String, nullable=True)
+    CreatedAt = Column(DateTime, default=ist_now)
+
+
+class RetailerSyncDeadLetter(Base):
+    """Events the partner app rejected or that ran out of retries; kept for inspection / replay."""
+    __tablename__ = "RetailerSyncDeadLetter"
+
+    EventId = Column(Integer, primary_key=True, autoincrement=False)  # id it had in the outbox
+    RetailerId = Column(Integer, nullable=False, index=True)
+    Action = Column(String, nullable=False)
+    Payload = Column(JSON, nullable=False)
+
+    Attempts = Column(Integer, nullable=False, default=0)
+    LastError = Column(String, nullable=True)
+    CreatedAt = Column(DateTime, nullable=True)
+    FailedAt = Column(DateTime, default=ist_now)
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
 from ...utils.timezone import ist_now
-from typing import Optional
+from typing import List, Optional
 
 
 class DistributorNotificationBase(BaseModel):
@@ -30,3 +30,9 @@ class DistributorNotificationUpdate(BaseModel):
 class DistributorNotificationRead(DistributorNotificationBase):
     NotificationId: int
     CreatedAt: datetime = Field(default_factory=ist_now)
+
+
+class DistributorNotificationMarkRead(BaseModel):
+    """Either explicit ids or every notification dated at or before Before."""
+    NotificationIds: Optional[List[int]] = Field(None, min_length=1, max_length=1000)
+    Before: Optional[datetime] = None
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, computed_field, EmailStr
+from typing import Dict, Optional
+from ...utils.image_uploader import image_variants
 
 class DistributorBase(BaseModel):
     CompanyName: Optional[str] = None
@@ -43,6 +44,11 @@ class DistributorRead(DistributorBase):
     DistributorId: int
     # PasswordHash: Optional[str]
 
+    @computed_field
+    @property
+    def CompanyPictureVariants(self) -> Optional[Dict[str, str]]:
+        return image_variants(self.CompanyPicture)
+
 
 # ---------------- SCHEMAS ----------------
 class DistributorRegisterSchema(BaseModel):
@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+
+class CustomerOrderChanges(BaseModel):
+    """
+    One batch of changes from the customer-order service, pushed to the
+    ingest endpoint or returned by its changes feed. Orders / Items are the
+    upstream JSON as-is (OrderId + RetailerId, OrderItemId + OrderId required).
+    """
+    Orders: List[Dict[str, Any]] = Field(default_factory=list, max_length=5000)
+    Items: List[Dict[str, Any]] = Field(default_factory=list, max_length=20000)
+    DeletedOrderIds: List[int] = Field(default_factory=list, max_length=5000)
+    NextCursor: Optional[str] = None
+    HasMore: bool = False
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, computed_field
+from typing import Dict, Optional
+from ...utils.image_uploader import image_variants
 
 class MedicineBase(BaseModel):
     MedicineName: str
@@ -26,3 +27,8 @@ class MedicineUpdate(MedicineBase):
 
 class MedicineRead(MedicineBase):
     MedicineId: int
+
+    @computed_field
+    @property
+    def ImgVariants(self) -> Optional[Dict[str, str]]:
+        return image_variants(self.ImgUrl)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Optional, List
 from datetime import date
 
 class RetailerInventoryBase(BaseModel):
@@ -34,3 +34,10 @@ class RetailerInventorySummary(BaseModel):
     InStock: int
     LowStock: int
     NoStock: int
+
+class StockAllocationLine(BaseModel):
+    MedicineName: str
+    Quantity: int = Field(..., gt=0)
+
+class StockAllocationRequest(BaseModel):
+    Items: List[StockAllocationLine] = Field(..., min_length=1, max_length=500)
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, computed_field, EmailStr
+from typing import Dict, Optional
+from ...utils.image_uploader import image_variants
 
 class RetailerBase(BaseModel):
     ShopName: Optional[str] = None
@@ -47,6 +48,11 @@ class RetailerRead(RetailerBase):
     RetailerId: int
     # PasswordHash: Optional[str]
 
+    @computed_field
+    @property
+    def ShopPicVariants(self) -> Optional[Dict[str, str]]:
+        return image_variants(self.ShopPic)
+
 
 class RetailerRegisterSchema(BaseModel):
     Email: str
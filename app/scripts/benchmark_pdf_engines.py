@@ -0,0 +1,142 @@
+"""
+Compare the invoice PDF engines (app/utils/pdf_engines.py) on sample invoices.
+
+    python -m app.scripts.benchmark_pdf_engines --iterations 50 --items 5 20 100
+
+Every engine runs in its own fresh process, so import cost and memory are
+measured per engine: throughput (invoices/s, one process), mean / p95
+latency, peak traced Python allocations per render, peak RSS of the process
+and output size. Pick the winner with PDF_ENGINE in the environment / .env.
+"""
+
+import argparse
+import logging
+import math
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from app.utils.pdf_engines import PDF_ENGINES
+
+
+def sample_invoice(items: int) -> dict:
+    """Shaped like RetailerInvoiceManager.get_invoice()."""
+    rows = []
+    for i in range(1, items + 1):
+        price = round(10 + i * 3.75, 2)
+        quantity = i % 7 + 1
+        gst = round(price * 5 / 100, 2)
+        rows.append({
+            "ItemId": i,
+            "Medicine": f"Paracetamol 500mg Tablet #{i}",
+            "Quantity": quantity,
+            "UnitPrice": price,
+            "GST": "5%",
+            "GSTAmount": gst,
+            "Total": round(price * quantity + gst, 2),
+        })
+    return {
+        "InvoiceNo": "INV-2026-1001",
+        "RetailerDetails": {
+            "Name": "Suresh Kumar",
+            "Address": "Flat 2, ABC Apartment, Chennai, TamilNadu - 600091",
+            "Contact": "9999999998",
+            "Email": "suresh@example.com",
+            "OrderID": "ORD-1001",
+            "OrderDate": "30/01/2026",
+            "ExpectedDelivery": "03/02/2026",
+        },
+        "OrderSummary": {"Items": rows, "TotalAmount": round(sum(r["Total"] for r in rows), 2)},
+        "PaymentAndDelivery": {
+            "PaymentMode": "UPI",
+            "PaymentStatus": "Paid",
+            "DeliveryMethod": "Courier",
+            "DeliveryPartner": "BlueDart",
+        },
+        "DistributorDetails": {
+            "DistributorName": "MediSupply Distributors",
+            "Address": "12 Industrial Estate, Guindy, Chennai",
+            "LicenseNo": "TN-DL-2026-0042",
+            "GSTIN": "33ABCDE1234F1Z5",
+            "Support": {"Phone": "044-1234567", "Email": "support@medisupply.example"},
+        },
+        "FooterNotes": [
+            "All medicines are sold under valid license and verified prescriptions.",
+            "Prices include applicable taxes (GST @5%).",
+            "For replacement or issues, contact support within 24 hours of delivery.",
+        ],
+    }
+
+
+def _run_engine(engine_name: str, template_dir: str, template_name: str, items: int, iterations: int) -> dict:
+    """Runs in a fresh process."""
+    from jinja2 import Environment, FileSystemLoader
+
+    logging.disable(logging.WARNING)  # xhtml2pdf warns about every unsupported CSS rule / glyph
+    started = time.perf_counter()
+    engine = PDF_ENGINES[engine_name]()
+    template = Environment(loader=FileSystemLoader(template_dir)).get_template(template_name) if engine.uses_template else None
+    context = {"invoice": sample_invoice(items)}
+    size = len(engine.render(template, context))  # warm-up
+    setup = time.perf_counter() - started
+
+    timings = []
+    for _ in range(iterations):
+        t = time.perf_counter()
+        engine.render(template, context)
+        timings.append(time.perf_counter() - t)
+
+    tracemalloc.start()
+    engine.render(template, context)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "setup_s": setup,
+        "per_s": iterations / sum(timings),
+        "mean_ms": statistics.mean(timings) * 1000,
+        "p95_ms": timings[math.ceil(len(timings) * 0.95) - 1] * 1000,  # nearest rank
+        "alloc_mb": peak / 1024 / 1024,
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024),
+        "pdf_kb": size / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--engines", nargs="+", default=list(PDF_ENGINES), choices=list(PDF_ENGINES))
+    parser.add_argument("--items", nargs="+", type=int, default=[5, 25, 100], help="line items per sample invoice")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--template-dir", default="templates")
+    parser.add_argument("--template", default="invoice_template.html")
+    args = parser.parse_args()
+
+    header = f"{'engine':<11} {'items':>5} {'inv/s':>8} {'mean ms':>8} {'p95 ms':>8} {'alloc MB':>9} {'RSS MB':>7} {'PDF KB':>7} {'setup s':>8}"
+    print(header)
+    print("-" * len(header))
+    context = multiprocessing.get_context("spawn")
+    for engine_name in args.engines:
+        if not PDF_ENGINES[engine_name].available():
+            print(f"{engine_name:<11} skipped: '{PDF_ENGINES[engine_name].module}' is not installed or cannot be loaded")
+            continue
+        for items in args.items:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                try:
+                    r = pool.submit(_run_engine, engine_name, args.template_dir, args.template, items, args.iterations).result()
+                except Exception as e:
+                    print(f"{engine_name:<11} {items:>5} failed: {e}")
+                    continue
+            print(
+                f"{engine_name:<11} {items:>5} {r['per_s']:>8.1f} {r['mean_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+                f"{r['alloc_mb']:>9.2f} {r['rss_mb']:>7.0f} {r['pdf_kb']:>7.1f} {r['setup_s']:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
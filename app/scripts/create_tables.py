@@ -34,6 +34,56 @@ class TableCreator:
         """
         self._execute(sql, "Medicine")
 
+    # ------------------------
+    # Medicine full-text search (FTS5, kept in sync by triggers)
+    # ------------------------
+    def create_medicine_search_tables(self):
+        columns = "MedicineName, Manufacturer, TherapeuticClass"
+        new_values = "new.MedicineId, new.MedicineName, new.Manufacturer, new.TherapeuticClass"
+        old_values = "old.MedicineId, old.MedicineName, old.Manufacturer, old.TherapeuticClass"
+
+        # Word / prefix index
+        self._execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS MedicineSearch USING fts5(
+            {columns},
+            content='Medicine',
+            content_rowid='MedicineId',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        );
+        """, "MedicineSearch")
+
+        # Trigram index used for misspelled / partial names
+        self._execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS MedicineSearchTrigram USING fts5(
+            {columns},
+            content='Medicine',
+            content_rowid='MedicineId',
+            tokenize='trigram'
+        );
+        """, "MedicineSearchTrigram")
+
+        for fts in ("MedicineSearch", "MedicineSearchTrigram"):
+            self._execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON Medicine BEGIN
+                INSERT INTO {fts}(rowid, {columns}) VALUES ({new_values});
+            END;
+            """, f"{fts}_ai trigger")
+            self._execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON Medicine BEGIN
+                INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', {old_values});
+            END;
+            """, f"{fts}_ad trigger")
+            self._execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON Medicine BEGIN
+                INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', {old_values});
+                INSERT INTO {fts}(rowid, {columns}) VALUES ({new_values});
+            END;
+            """, f"{fts}_au trigger")
+
+            # Index rows that existed before the triggers
+            self._execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild');", f"{fts} rebuild")
+
 
     # Retailer Tables
     # ------------------------------------------------------------------
@@ -90,6 +140,26 @@ class TableCreator:
         """
         self._execute(sql, "RetailerInventory")
 
+    def create_retailer_inventory_indexes(self):
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_RetailerInventory_RetailerId_Status ON RetailerInventory (RetailerId, Status);",
+            "ix_RetailerInventory_RetailerId_Status index",
+        )
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_RetailerInventory_RetailerId_ExpiryDate ON RetailerInventory (RetailerId, ExpiryDate);",
+            "ix_RetailerInventory_RetailerId_ExpiryDate index",
+        )
+        # Used by the all-accounts expiry sweep
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_RetailerInventory_ExpiryDate ON RetailerInventory (ExpiryDate);",
+            "ix_RetailerInventory_ExpiryDate index",
+        )
+        # FEFO allocation: batches of one medicine in expiry order
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_RetailerInventory_RetailerId_MedicineName_ExpiryDate ON RetailerInventory (RetailerId, MedicineName, ExpiryDate);",
+            "ix_RetailerInventory_RetailerId_MedicineName_ExpiryDate index",
+        )
+
     # ------------------------------------------------------------------
     # 3️⃣ RetailerNotification
     # ------------------------------------------------------------------
@@ -108,6 +178,18 @@ class TableCreator:
         """
         self._execute(sql, "RetailerNotification")
 
+    def create_retailer_notification_indexes(self):
+        # Unread filters, mark-read-before and the counter seed all lead with the owner
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_RetailerNotification_RetailerId_IsRead_Date ON RetailerNotification (RetailerId, IsRead, Date);",
+            "ix_RetailerNotification_RetailerId_IsRead_Date index",
+        )
+        # Keyset pages walk NotificationId newest first, with or without the unread filter
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_RetailerNotification_RetailerId_NotificationId ON RetailerNotification (RetailerId, NotificationId);",
+            "ix_RetailerNotification_RetailerId_NotificationId index",
+        )
+
     # ------------------------------------------------------------------
     # 4️⃣ RetailerOrder + RetailerOrderItem
     # ------------------------------------------------------------------
@@ -194,6 +276,55 @@ class TableCreator:
         self._execute(invoice_sql, "CustomerInvoice")
         self._execute(item_sql, "CustomerInvoiceItem")
 
+    # ------------------------------------------------------------------
+    # CustomerOrder + CustomerOrderItem (local mirror of the order service)
+    # ------------------------------------------------------------------
+    def create_customer_order_mirror_tables(self):
+        order_sql = """
+        CREATE TABLE IF NOT EXISTS CustomerOrder (
+            OrderId INTEGER PRIMARY KEY,
+            RetailerId INTEGER NOT NULL,
+            Status TEXT,
+            TotalAmount REAL,
+            OrderDateTime TEXT,
+            UpdatedAt TEXT,
+            Payload JSON NOT NULL,
+            SyncedAt DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+        """
+        item_sql = """
+        CREATE TABLE IF NOT EXISTS CustomerOrderItem (
+            OrderItemId INTEGER PRIMARY KEY,
+            OrderId INTEGER NOT NULL,
+            RetailerId INTEGER NOT NULL,
+            Payload JSON NOT NULL,
+            SyncedAt DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+        """
+        sync_state_sql = """
+        CREATE TABLE IF NOT EXISTS CustomerOrderSyncState (
+            Scope TEXT PRIMARY KEY,
+            Cursor TEXT,
+            CompletedAt DATETIME,
+            UpdatedAt DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+        """
+        self._execute(order_sql, "CustomerOrder")
+        self._execute(item_sql, "CustomerOrderItem")
+        self._execute(sync_state_sql, "CustomerOrderSyncState")
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_CustomerOrder_RetailerId_OrderId ON CustomerOrder (RetailerId, OrderId);",
+            "ix_CustomerOrder_RetailerId_OrderId index",
+        )
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_CustomerOrder_UpdatedAt ON CustomerOrder (UpdatedAt);",
+            "ix_CustomerOrder_UpdatedAt index",
+        )
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_CustomerOrderItem_RetailerId_OrderId ON CustomerOrderItem (RetailerId, OrderId);",
+            "ix_CustomerOrderItem_RetailerId_OrderId index",
+        )
+
 
     # ------------------------------------------------------------------
     # Distributor
@@ -253,6 +384,26 @@ class TableCreator:
         """
         self._execute(sql, "DistributorInventory")
 
+    def create_distributor_inventory_indexes(self):
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_DistributorInventory_DistributorId_Status ON DistributorInventory (DistributorId, Status);",
+            "ix_DistributorInventory_DistributorId_Status index",
+        )
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_DistributorInventory_DistributorId_ExpiryDate ON DistributorInventory (DistributorId, ExpiryDate);",
+            "ix_DistributorInventory_DistributorId_ExpiryDate index",
+        )
+        # Used by the all-accounts expiry sweep
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_DistributorInventory_ExpiryDate ON DistributorInventory (ExpiryDate);",
+            "ix_DistributorInventory_ExpiryDate index",
+        )
+        # FEFO allocation: batches of one medicine in expiry order
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_DistributorInventory_DistributorId_MedicineName_ExpiryDate ON DistributorInventory (DistributorId, MedicineName, ExpiryDate);",
+            "ix_DistributorInventory_DistributorId_MedicineName_ExpiryDate index",
+        )
+
 
 
     # ------------------------------------------------------------------
@@ -274,6 +425,7 @@ class TableCreator:
             PaymentStatus TEXT DEFAULT 'Pending',
             PaymentMode TEXT,
             PaymentTransactionId TEXT,
+            Snapshot JSON,
             CreatedAt DATETIME DEFAULT CURRENT_TIMESTAMP,
             UpdatedAt DATETIME DEFAULT CURRENT_TIMESTAMP,
             CreatedBy TEXT,
@@ -316,6 +468,18 @@ class TableCreator:
         """
         self._execute(sql, "DistributorNotification")
 
+    def create_distributor_notification_indexes(self):
+        # Unread filters, mark-read-before and the counter seed all lead with the owner
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_DistributorNotification_DistributorId_IsRead_Date ON DistributorNotification (DistributorId, IsRead, Date);",
+            "ix_DistributorNotification_DistributorId_IsRead_Date index",
+        )
+        # Keyset pages walk NotificationId newest first, with or without the unread filter
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_DistributorNotification_DistributorId_NotificationId ON DistributorNotification (DistributorId, NotificationId);",
+            "ix_DistributorNotification_DistributorId_NotificationId index",
+        )
+
     
     # ------------------------------------------------------------------
     # PharmaOrder & PharmaOrderItem
@@ -491,6 +655,98 @@ class TableCreator:
 
 
 
+    # ------------------------------------------------------------------
+    # Owner indexes (keyset-paged exports walk the primary key per owner)
+    # ------------------------------------------------------------------
+    def create_export_indexes(self):
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_RetailerOrders_RetailerId ON RetailerOrders (RetailerId);",
+            "ix_RetailerOrders_RetailerId index",
+        )
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_RetailerOrders_DistributorId ON RetailerOrders (DistributorId);",
+            "ix_RetailerOrders_DistributorId index",
+        )
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_PharmaOrder_DistributorId ON PharmaOrder (DistributorId);",
+            "ix_PharmaOrder_DistributorId index",
+        )
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_RetailerInvoice_DistributorId ON RetailerInvoice (DistributorId);",
+            "ix_RetailerInvoice_DistributorId index",
+        )
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_CustomerInvoice_RetailerId ON CustomerInvoice (RetailerId);",
+            "ix_CustomerInvoice_RetailerId index",
+        )
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_RetailerInventory_RetailerId ON RetailerInventory (RetailerId);",
+            "ix_RetailerInventory_RetailerId index",
+        )
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_DistributorInventory_DistributorId ON DistributorInventory (DistributorId);",
+            "ix_DistributorInventory_DistributorId index",
+        )
+
+
+
+    # ------------------------------------------------------------------
+    # RetailerSyncOutbox + RetailerSyncDeadLetter (see app/utils/retailer_sync.py)
+    # ------------------------------------------------------------------
+    def create_retailer_sync_tables(self):
+        outbox_sql = """
+        CREATE TABLE IF NOT EXISTS RetailerSyncOutbox (
+            EventId INTEGER PRIMARY KEY AUTOINCREMENT,
+            RetailerId INTEGER NOT NULL,
+            Action TEXT NOT NULL,
+            Payload JSON NOT NULL,
+            Attempts INTEGER NOT NULL DEFAULT 0,
+            NextAttemptAt REAL NOT NULL DEFAULT 0,
+            ClaimedBy TEXT,
+            LastError TEXT,
+            CreatedAt DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+        """
+        dead_letter_sql = """
+        CREATE TABLE IF NOT EXISTS RetailerSyncDeadLetter (
+            EventId INTEGER PRIMARY KEY,
+            RetailerId INTEGER NOT NULL,
+            Action TEXT NOT NULL,
+            Payload JSON NOT NULL,
+            Attempts INTEGER NOT NULL DEFAULT 0,
+            LastError TEXT,
+            CreatedAt DATETIME,
+            FailedAt DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+        """
+        self._execute(outbox_sql, "RetailerSyncOutbox")
+        self._execute(dead_letter_sql, "RetailerSyncDeadLetter")
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_RetailerSyncOutbox_RetailerId_EventId ON RetailerSyncOutbox (RetailerId, EventId);",
+            "ix_RetailerSyncOutbox_RetailerId_EventId index",
+        )
+        self._execute(
+            "CREATE INDEX IF NOT EXISTS ix_RetailerSyncDeadLetter_RetailerId ON RetailerSyncDeadLetter (RetailerId);",
+            "ix_RetailerSyncDeadLetter_RetailerId index",
+        )
+
+
+
+    # ------------------------------------------------------------------
+    # JobLock (scheduler leases, see app/utils/scheduler.py)
+    # ------------------------------------------------------------------
+    def create_job_lock_table(self):
+        sql = """
+        CREATE TABLE IF NOT EXISTS JobLock (
+            JobName TEXT PRIMARY KEY,
+            Owner TEXT NOT NULL,
+            LeaseUntil REAL NOT NULL
+        );
+        """
+        self._execute(sql, "JobLock")
+
+
+
     # ------------------------------------------------------------------
     # INTERNAL HELPER
     # ------------------------------------------------------------------
@@ -512,21 +768,33 @@ class TableCreator:
     def create_all_tables(self):       
 
         # self.create_medicine_table()
+        self.create_medicine_search_tables()
 
         # Retailer tables
         self.create_retailer_table()
         # self.create_retailer_inventory_table()
+        self.create_retailer_inventory_indexes()
         # self.create_retailer_notification_table()
+        self.create_retailer_notification_indexes()
         # self.create_retailer_order_tables()
         # self.create_customer_invoice_tables()
+        self.create_customer_order_mirror_tables()
 
 
         # Distributor tables
         self.create_distributor_table()
         # self.create_distributor_inventory_table()
+        self.create_distributor_inventory_indexes()
         # self.create_distributor_notification_table()
+        self.create_distributor_notification_indexes()
         # self.create_retailer_invoice_tables()
         # self.create_pharma_order_tables()
+        self.add_column_if_not_exists("RetailerInvoice", "Snapshot", "JSON")
+
+        self.create_job_lock_table()
+        self.create_retailer_sync_tables()
+        self.add_column_if_not_exists("RetailerSyncOutbox", "ClaimedBy", "TEXT")
+        self.create_export_indexes()
 
 
         # self.add_column_if_not_exists("PharmaOrder", "PharmaName", "TEXT")
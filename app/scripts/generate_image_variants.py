@@ -0,0 +1,49 @@
+"""
+Create the thumb / medium / WebP variants (see utils/image_uploader.py) for
+pictures uploaded before variants existed, or after changing IMAGE_*_PX.
+
+    python -m app.scripts.generate_image_variants [--force]
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import settings
+from app.utils.image_uploader import BASE_DIR, make_variants, variant_files
+
+
+def originals():
+    """Uploaded files: <uuid>.<ext>, skipping <uuid>.<size>.<ext> and the <uuid>.webp copy of another upload."""
+    for path in sorted(BASE_DIR.rglob("*")):
+        if not path.is_file() or path.name.startswith(".") or path.name.count(".") != 1:
+            continue
+        if path.suffix.lower() == ".webp" and any(p != path and p.stem == path.stem and p.name.count(".") == 1 for p in path.parent.glob(f"{path.stem}.*")):
+            continue
+        yield path
+
+
+def process(path, force: bool) -> str:
+    if not force and all(p.exists() for p in variant_files(path)):
+        return "skipped"
+    try:
+        make_variants(path)
+        return "created"
+    except Exception as e:
+        print(f"❌ {path.relative_to(BASE_DIR.parent)}: {e}")
+        return "failed"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--force", action="store_true", help="rebuild variants that already exist")
+    args = parser.parse_args()
+
+    counts = {"created": 0, "skipped": 0, "failed": 0}
+    with ThreadPoolExecutor(max_workers=settings.image_workers) as pool:
+        for outcome in pool.map(lambda p: process(p, args.force), originals()):
+            counts[outcome] += 1
+    print(f"✅ Image variants: {counts['created']} created, {counts['skipped']} already there, {counts['failed']} failed")
+
+
+if __name__ == "__main__":
+    main()
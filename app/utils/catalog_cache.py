@@ -0,0 +1,90 @@
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    version: int
+    etag: str
+    body: bytes
+    built_at: float
+
+
+class CatalogCache:
+    """
+    Keeps one pre-encoded JSON payload in memory, tagged with a monotonically
+    increasing version. Writers call bump(); readers get the encoded body for
+    the current version, which is rebuilt at most once per version.
+
+    ttl_seconds (0 = never) forces a periodic rebuild so that writes made by
+    other worker processes are eventually picked up as well.
+    """
+
+    def __init__(self, ttl_seconds: float = 0):
+        self.ttl_seconds = ttl_seconds
+        self._version = 0
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def bump(self) -> int:
+        self._version += 1
+        return self._version
+
+    def _is_fresh(self, snapshot: Optional[CatalogSnapshot]) -> bool:
+        if snapshot is None or snapshot.version != self._version:
+            return False
+        if self.ttl_seconds and time.monotonic() - snapshot.built_at > self.ttl_seconds:
+            return False
+        return True
+
+    async def get(self, loader: Callable[[], Awaitable[dict]]) -> CatalogSnapshot:
+        """Return the snapshot for the current version, building it with loader() if needed."""
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+
+        async with self._lock:
+            snapshot = self._snapshot
+            if self._is_fresh(snapshot):
+                return snapshot
+
+            version = self._version
+            payload = await loader()
+            body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode("utf-8")
+            snapshot = CatalogSnapshot(
+                version=version,
+                etag=f'"{hashlib.sha1(body).hexdigest()}"',
+                body=body,
+                built_at=time.monotonic(),
+            )
+
+            # A write that landed while we were loading leaves this snapshot stale;
+            # serve it to this caller but let the next one rebuild.
+            if version == self._version:
+                self._snapshot = snapshot
+            return snapshot
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an If-None-Match header against a strong ETag."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
@@ -0,0 +1,20 @@
+import asyncio
+from typing import Any, Awaitable, Tuple
+
+
+async def gather_or_cancel(*calls: Awaitable[Any]) -> Tuple[Any, ...]:
+    """
+    Run independent awaitables concurrently in one TaskGroup and return their
+    results in order. The first failure cancels the others and is re-raised
+    as-is (not wrapped in an ExceptionGroup), so callers keep their usual
+    `except httpx.HTTPError` style handlers.
+    """
+    try:
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(call) for call in calls]
+    except BaseExceptionGroup as errors:
+        error: BaseException = errors
+        while isinstance(error, BaseExceptionGroup):
+            error = error.exceptions[0]
+        raise error from None
+    return tuple(task.result() for task in tasks)
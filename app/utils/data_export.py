@@ -0,0 +1,150 @@
+import csv
+import io
+import json
+import zipfile
+from enum import Enum
+from typing import Any, AsyncIterator, List, Optional, Sequence, Tuple
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from .logger import get_logger
+from ..db.base.database_manager import DatabaseManager
+
+logger = get_logger(__name__)
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class ExportFormat(str, Enum):
+    """?format= of the export endpoints; FastAPI rejects anything else with a 422."""
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+def _json_default(value: Any) -> Any:
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=_json_default, ensure_ascii=False)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+async def iter_keyset(
+    db_type: str, model, filters: Sequence, chunk_size: int = 1000, columns: Optional[Sequence] = None
+) -> AsyncIterator[List[Sequence]]:
+    """
+    Yield every matching row of model, chunk_size rows at a time, walking the
+    primary key (WHERE ... AND pk > :last ORDER BY pk LIMIT n). Each chunk is an
+    independent indexed query, so no long-lived cursor or OFFSET scan is needed.
+    Uses its own connection because the stream outlives the request handler.
+    columns defaults to every column of the table and must include the primary key.
+    """
+    pk = model.__table__.primary_key.columns.values()[0]
+    columns = list(columns) if columns is not None else list(model.__table__.c)
+    pk_index = [c.key for c in columns].index(pk.key)
+
+    db_manager = DatabaseManager(db_type)
+    await db_manager.connect()
+    try:
+        last = None
+        while True:
+            stmt = select(*columns).where(*filters).order_by(pk).limit(chunk_size)
+            if last is not None:
+                stmt = stmt.where(pk > last)
+            rows = (await db_manager.execute(stmt)).all()
+            if not rows:
+                break
+            yield rows
+            if len(rows) < chunk_size:
+                break
+            last = rows[-1][pk_index]
+    finally:
+        await db_manager.disconnect()
+
+
+async def stream_rows(
+    db_type: str, model, filters: Sequence, fmt: str, chunk_size: int = 1000, columns: Optional[Sequence] = None
+) -> AsyncIterator[bytes]:
+    """Encode model rows (all columns, or the given ones) as CSV with a header line or NDJSON, one chunk per yield."""
+    columns = list(columns) if columns is not None else list(model.__table__.c)
+    names = [c.name for c in columns]
+    sent = 0
+    try:
+        if fmt == "csv":
+            yield (",".join(names) + "\r\n").encode("utf-8")
+        async for rows in iter_keyset(db_type, model, filters, chunk_size, columns):
+            if fmt == "csv":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows([_csv_value(v) for v in row] for row in rows)
+                chunk = buffer.getvalue()
+            else:
+                chunk = "".join(
+                    json.dumps(dict(zip(names, row)), default=_json_default, ensure_ascii=False) + "\n"
+                    for row in rows
+                )
+            sent += len(rows)
+            yield chunk.encode("utf-8")
+        logger.info(f"📤 Exported {sent} {model.__tablename__} rows as {fmt}")
+    except Exception as e:
+        # Headers are already sent; all we can do is stop the stream and log it
+        logger.error(f"❌ Export of {model.__tablename__} failed after {sent} rows: {e}")
+        raise
+
+
+def export_response(body: AsyncIterator[bytes], fmt: str, filename: str) -> StreamingResponse:
+    extension = "csv" if fmt == "csv" else "ndjson"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{extension}"'},
+    )
+
+
+class _ZipSink:
+    """Write-only file for zipfile; hands back whatever was written since the last drain()."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def zip_stream(entries: AsyncIterator[Tuple[str, bytes]]) -> AsyncIterator[bytes]:
+    """
+    Encode (filename, content) pairs as a ZIP archive, yielding each file's
+    bytes as soon as it arrives. The sink cannot seek, so zipfile writes
+    sizes after the data and the central directory at the end; only one file
+    is held in memory at a time. Entries are stored uncompressed, as PDFs
+    and images already are compressed.
+    """
+    sink = _ZipSink()
+    try:
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+            async for name, content in entries:
+                archive.writestr(name, content)
+                yield sink.drain()
+        yield sink.drain()
+    finally:
+        await entries.aclose()
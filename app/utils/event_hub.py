@@ -0,0 +1,202 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+from fastapi import Request, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+
+from .logger import get_logger
+from ..config import settings
+
+logger = get_logger(__name__)
+
+Channel = Tuple[str, int]  # ("retailer" | "distributor", account id)
+
+
+class Subscription:
+    """One connected client. Fed by EventHub.publish, never blocks the publisher."""
+
+    def __init__(self, channel: Channel, queue_size: int):
+        self.channel = channel
+        self.queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def offer(self, event: dict) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Backpressure: a client that cannot keep up is dropped rather than
+            # buffered without bound; it reconnects with its last id and replays.
+            self.overflowed = True
+
+    async def next(self, timeout: float) -> Optional[dict]:
+        """Next event, or None when nothing arrived within timeout (time for a heartbeat)."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class _Channel:
+    def __init__(self, buffer_size: int, floor: int):
+        self.events: Deque[dict] = deque(maxlen=buffer_size)
+        self.floor = floor  # newest id this channel may have lost; older resumes need a resync
+        self.subscribers: Set[Subscription] = set()
+
+
+class EventHub:
+    """
+    In-process pub/sub for per-account pushes (notifications, order changes).
+
+    Every event gets an increasing id (seeded from the clock, so ids keep
+    growing across restarts) and is kept in a per-channel ring buffer of
+    buffer_size events. A client reconnecting with the last id it saw gets
+    what it missed; when those events are gone (buffer wrapped, channel
+    evicted, process restarted) it gets a single "resync" event and should
+    reload over REST. Idle channels are evicted past max_channels.
+
+    Events only reach clients connected to the same worker process; with
+    several workers, pin event connections to one worker or run a single one.
+    """
+
+    def __init__(self, buffer_size: int = 256, queue_size: int = 100, max_channels: int = 10000):
+        self.buffer_size = buffer_size
+        self.queue_size = queue_size
+        self.max_channels = max_channels
+        self._last_id = int(time.time() * 1000)
+        self._lost_up_to = self._last_id  # anything before this process is unknown
+        self._channels: "OrderedDict[Channel, _Channel]" = OrderedDict()
+
+    def _channel(self, channel: Channel) -> _Channel:
+        state = self._channels.get(channel)
+        if state is None:
+            state = self._channels[channel] = _Channel(self.buffer_size, self._lost_up_to)
+            if len(self._channels) > self.max_channels:
+                self._evict()
+        else:
+            self._channels.move_to_end(channel)
+        return state
+
+    def _evict(self) -> None:
+        for key in list(self._channels):
+            if len(self._channels) <= self.max_channels:
+                break
+            if not self._channels[key].subscribers:
+                del self._channels[key]
+                # A later resume on that channel cannot be served from memory
+                self._lost_up_to = self._last_id
+
+    # ---------------- Publishing ----------------
+    def publish(self, scope: str, account_id: Optional[int], event_type: str, data: Any) -> None:
+        """Never raises: a failed push must not fail the write that triggered it."""
+        if account_id is None:
+            return
+        try:
+            state = self._channel((scope, int(account_id)))
+            self._last_id += 1
+            event = {"id": self._last_id, "type": event_type, "data": jsonable_encoder(data)}
+            if len(state.events) == state.events.maxlen:
+                state.floor = state.events[0]["id"]
+            state.events.append(event)
+            for subscription in state.subscribers:
+                subscription.offer(event)
+        except Exception as e:
+            logger.error(f"❌ Error publishing {event_type} event to {scope} {account_id}: {e}")
+
+    # ---------------- Subscribing ----------------
+    def subscribe(self, scope: str, account_id: int, last_id: Optional[int] = None) -> Tuple[Subscription, List[dict]]:
+        """Register a client; returns it with the events to replay first."""
+        channel = (scope, int(account_id))
+        state = self._channel(channel)
+        subscription = Subscription(channel, self.queue_size)
+        state.subscribers.add(subscription)
+
+        if last_id is None:
+            return subscription, []
+        if last_id < state.floor or last_id > self._last_id:
+            return subscription, [{"id": None, "type": "resync", "data": None}]
+        return subscription, [event for event in state.events if event["id"] > last_id]
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        state = self._channels.get(subscription.channel)
+        if state is not None:
+            state.subscribers.discard(subscription)
+
+    def stats(self) -> dict:
+        return {
+            "LastEventId": self._last_id,
+            "Channels": len(self._channels),
+            "Subscribers": sum(len(state.subscribers) for state in self._channels.values()),
+        }
+
+
+# Shared by every publisher (notification inserts, order changes) and the event endpoints
+event_hub = EventHub(
+    buffer_size=settings.event_buffer_size,
+    queue_size=settings.event_queue_size,
+    max_channels=settings.event_max_channels,
+)
+
+
+# ---------------- Transports ----------------
+def _sse(event: dict) -> str:
+    lines = [f"event: {event['type']}"]
+    if event["id"] is not None:
+        lines.insert(0, f"id: {event['id']}")
+    lines.append(f"data: {json.dumps(event['data'])}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def sse_stream(
+    hub: EventHub,
+    request: Request,
+    scope: str,
+    account_id: int,
+    last_id: Optional[int],
+    heartbeat_seconds: float,
+) -> AsyncIterator[str]:
+    """text/event-stream body: replay, then live events, with a comment line as heartbeat."""
+    subscription, replay = hub.subscribe(scope, account_id, last_id)
+    try:
+        yield f"retry: {int(heartbeat_seconds * 1000)}\n\n"
+        for event in replay:
+            yield _sse(event)
+        while not subscription.overflowed:
+            event = await subscription.next(heartbeat_seconds)
+            if event is not None:
+                yield _sse(event)
+            elif await request.is_disconnected():
+                break
+            else:
+                yield ": ping\n\n"
+    finally:
+        hub.unsubscribe(subscription)
+
+
+async def websocket_stream(
+    hub: EventHub,
+    websocket: WebSocket,
+    scope: str,
+    account_id: int,
+    last_id: Optional[int],
+    heartbeat_seconds: float,
+) -> None:
+    """Same stream as sse_stream as JSON frames; {"type": "ping"} is the heartbeat."""
+    await websocket.accept()
+    subscription, replay = hub.subscribe(scope, account_id, last_id)
+    try:
+        for event in replay:
+            await websocket.send_json(event)
+        while not subscription.overflowed:
+            event = await subscription.next(heartbeat_seconds)
+            await websocket.send_json(event if event is not None else {"id": None, "type": "ping", "data": None})
+        # Too slow to keep up: close so the client reconnects with its last id
+        await websocket.close(code=1013)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        hub.unsubscribe(subscription)
@@ -0,0 +1,106 @@
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import bindparam, or_, select, update
+
+from .inventory_query import stock_status_expression
+from ..exceptions.custom_exceptions import InsufficientStockException, StockConflictException
+
+
+class FefoAllocator:
+    """
+    First-expiry-first-out allocation over an inventory table that keeps one
+    row per batch.
+
+    allocate() runs inside a caller-provided transaction and always issues two
+    statements, however many lines the order has:
+      1. one SELECT of every non-expired batch with stock for the requested
+         medicines, ordered by (MedicineName, ExpiryDate) so it is served by the
+         (Owner, MedicineName, ExpiryDate) index;
+      2. one executemany UPDATE that decrements each chosen batch only if it
+         still holds the planned quantity.
+    If any decrement misses (a concurrent write took the stock) the whole
+    allocation raises StockConflictException and the transaction rolls back.
+    Drivers that cannot count rows over an executemany (asyncpg reports -1)
+    get one UPDATE per batch instead, each checked on its own rowcount.
+    """
+
+    def __init__(self, inventory_model, owner_field: str, id_field: str):
+        self.model = inventory_model
+        self.owner_column = getattr(inventory_model, owner_field)
+        self.id_field = id_field
+        self.id_column = getattr(inventory_model, id_field)
+
+    @staticmethod
+    def merge_lines(lines: Iterable[Tuple[str, int]]) -> "OrderedDict[str, int]":
+        """Sum repeated medicines, keeping first-seen order."""
+        demand: "OrderedDict[str, int]" = OrderedDict()
+        for name, quantity in lines:
+            demand[name] = demand.get(name, 0) + quantity
+        return demand
+
+    async def allocate(self, session, owner_id: int, lines: Iterable[Tuple[str, int]], today: date) -> Tuple[List[dict], List[Tuple[dict, int]]]:
+        """
+        Returns (allocations, changes): one allocation per medicine with its batch
+        breakdown, and (batch row after the decrement, quantity taken) pairs.
+        """
+        model = self.model
+        demand = self.merge_lines(lines)
+
+        result = await session.execute(
+            select(*model.__table__.c)
+            .where(
+                self.owner_column == owner_id,
+                model.MedicineName.in_(list(demand)),
+                model.Quantity > 0,
+                or_(model.ExpiryDate.is_(None), model.ExpiryDate >= today),
+            )
+            .order_by(model.MedicineName, model.ExpiryDate.is_(None), model.ExpiryDate, self.id_column)
+        )
+        batches: Dict[str, List[dict]] = {}
+        for row in result.mappings().all():
+            batches.setdefault(row["MedicineName"], []).append(dict(row))
+
+        allocations, takes, touched, shortages = [], [], [], []
+        for name, requested in demand.items():
+            remaining = requested
+            picked = []
+            for row in batches.get(name, []):
+                if remaining <= 0:
+                    break
+                take = min(remaining, row["Quantity"])
+                remaining -= take
+                picked.append({
+                    "InventoryId": row[self.id_field],
+                    "Batch": row["Batch"],
+                    "ExpiryDate": row["ExpiryDate"],
+                    "Price": row["Price"],
+                    "Quantity": take,
+                })
+                takes.append({"row_id": row[self.id_field], "take": take})
+                touched.append(({**row, "Quantity": row["Quantity"] - take}, take))
+            if remaining > 0:
+                shortages.append({"MedicineName": name, "Requested": requested, "Available": requested - remaining})
+            allocations.append({"MedicineName": name, "Requested": requested, "Batches": picked})
+
+        if shortages:
+            raise InsufficientStockException(shortages)
+
+        if takes:
+            new_quantity = model.Quantity - bindparam("take")
+            stmt = (
+                update(model.__table__)
+                .where(self.id_column == bindparam("row_id"), model.Quantity >= bindparam("take"))
+                .values(Quantity=new_quantity, Status=stock_status_expression(model, new_quantity))
+            )
+            if session.get_bind().dialect.supports_sane_multi_rowcount:
+                updated = (await session.execute(stmt, takes)).rowcount
+            else:
+                updated = 0
+                for take in takes:
+                    updated += (await session.execute(stmt, take)).rowcount
+            if updated != len(takes):
+                raise StockConflictException("Stock changed during allocation, please retry")
+
+        return allocations, touched
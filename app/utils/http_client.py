@@ -0,0 +1,169 @@
+import importlib.util
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+import httpx
+
+from .logger import get_logger
+from .resilience import CircuitBreaker, ConcurrencyLimiter, SingleFlight
+from ..config import settings
+
+logger = get_logger(__name__)
+
+
+class UpstreamUnavailable(httpx.TransportError):
+    """Circuit open or too many calls in flight; raised before any network I/O."""
+
+
+class _ResilientTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps the real transport: identical in-flight GETs share one upstream call,
+    at most max_concurrency calls run at once (waiters give up after the queue
+    timeout) and a circuit breaker fails fast while the upstream keeps
+    erroring or timing out. Transport errors and 5xx count as failures.
+    """
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, breaker: CircuitBreaker, limiter: ConcurrencyLimiter, singleflight: SingleFlight):
+        self.inner = inner
+        self.breaker = breaker
+        self.limiter = limiter
+        self.singleflight = singleflight
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            status, headers, content = await self.singleflight.do(str(request.url), lambda: self._send(request))
+        else:
+            status, headers, content = await self._send(request)
+        # Every coalesced caller gets its own Response over the same raw bytes
+        return httpx.Response(status, headers=headers, content=content, request=request)
+
+    async def _send(self, request: httpx.Request):
+        if not await self.limiter.acquire():
+            raise UpstreamUnavailable("Too many upstream calls in flight", request=request)
+        try:
+            if not self.breaker.allow():
+                raise UpstreamUnavailable("Upstream circuit is open", request=request)
+            try:
+                response = await self.inner.handle_async_request(request)
+                try:
+                    content = b"".join([chunk async for chunk in response.aiter_raw()])
+                finally:
+                    await response.aclose()
+            except httpx.TransportError:
+                self.breaker.failure()
+                raise
+            except BaseException:
+                self.breaker.abandon()
+                raise
+        finally:
+            self.limiter.release()
+
+        if response.status_code >= 500:
+            self.breaker.failure()
+        else:
+            self.breaker.success()
+        return response.status_code, response.headers, content
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class UpstreamClient:
+    """
+    One pooled httpx.AsyncClient per process for the customer-order service.
+
+    Connections are kept alive and reused across requests instead of a new
+    client (and TCP handshake) per call. start() / aclose() run in the app
+    lifespan; code running outside it (scripts) gets a client created lazily
+    on first use. Pass transport=httpx.ASGITransport(app=stub) to start() to
+    serve every call from a local ASGI app in tests; the coalescing, limit
+    and breaker layer wraps whatever transport is used.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30,
+        http2: bool = False,
+        default_timeout: float = 10,
+        route_timeouts: Optional[Dict[str, float]] = None,
+        max_concurrency: int = 50,
+        queue_timeout: float = 2,
+        breaker_failure_threshold: int = 5,
+        breaker_reset_timeout: float = 30,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self.default_timeout = default_timeout
+        self.route_timeouts = dict(route_timeouts or {})
+        self.breaker = CircuitBreaker("upstream", breaker_failure_threshold, breaker_reset_timeout)
+        self.limiter = ConcurrencyLimiter(max_concurrency, queue_timeout)
+        self.singleflight = SingleFlight()
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _build(self, transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+        http2 = self.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("⚠️ UPSTREAM_HTTP2 is set but the 'h2' package is not installed, using HTTP/1.1")
+            http2 = False
+        inner = transport or httpx.AsyncHTTPTransport(limits=self.limits, http2=http2)
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.default_timeout,
+            transport=_ResilientTransport(inner, self.breaker, self.limiter, self.singleflight),
+        )
+
+    async def start(self, transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        await self.aclose()
+        self._client = self._build(transport)
+        logger.info(f"🌐 Upstream client ready for {self.base_url}")
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = self._build()
+        return self._client
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[httpx.AsyncClient]:
+        """Drop-in for `async with httpx.AsyncClient() as client` that keeps the pool open."""
+        yield self.client
+
+    def timeout(self, route: str) -> float:
+        """Timeout for a named upstream route (falls back to the default)."""
+        return self.route_timeouts.get(route, self.default_timeout)
+
+    def metrics(self) -> dict:
+        return {
+            "Breaker": self.breaker.metrics(),
+            "Concurrency": self.limiter.metrics(),
+            "SingleFlight": self.singleflight.metrics(),
+        }
+
+
+# Shared by every upstream caller; started and closed in the app lifespan
+upstream = UpstreamClient(
+    settings.upstream_base_url,
+    max_connections=settings.upstream_max_connections,
+    max_keepalive_connections=settings.upstream_max_keepalive_connections,
+    keepalive_expiry=settings.upstream_keepalive_expiry,
+    http2=settings.upstream_http2,
+    default_timeout=settings.upstream_timeout_seconds,
+    route_timeouts=settings.upstream_route_timeouts,
+    max_concurrency=settings.upstream_max_concurrency,
+    queue_timeout=settings.upstream_queue_timeout_seconds,
+    breaker_failure_threshold=settings.upstream_breaker_failure_threshold,
+    breaker_reset_timeout=settings.upstream_breaker_reset_seconds,
+)
@@ -0,0 +1,196 @@
+import asyncio
+import os
+import time
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from .logger import get_logger
+from .image_uploader import BASE_DIR, image_variants
+from ..config import settings
+from ..db.base.database_manager import DatabaseManager
+from ..models.retailer.retailer_model import Retailer
+from ..models.retailer.medicine_model import Medicine
+from ..models.distributor.distributor_model import Distributor
+
+logger = get_logger(__name__)
+
+# Columns that hold picture paths, and the Images/ folders they upload into.
+# Only these folders are collected; anything else under Images/ is left alone.
+IMAGE_REFERENCES = (
+    (Retailer.RetailerId, Retailer.ShopPic),
+    (Distributor.DistributorId, Distributor.CompanyPicture),
+    (Medicine.MedicineId, Medicine.ImgUrl),
+)
+IMAGE_FOLDERS = ("Shop", "CompanyPic", "Medicine")
+
+# Orphan paths listed in a report
+_SAMPLE_SIZE = 100
+
+
+def _normalize(path: str) -> Optional[str]:
+    """'./Images/Shop/x.jpg', '/srv/app/Images\\Shop\\x.jpg', ... -> 'Images/Shop/x.jpg'."""
+    path = path.replace("\\", "/")
+    start = path.find(f"{BASE_DIR.name}/")
+    return path[start:] if start >= 0 else None
+
+
+def _list_files(folder: str) -> List[Tuple[str, int, float]]:
+    """(path relative to the app root, size, mtime) of every file in one Images/ folder."""
+    try:
+        with os.scandir(BASE_DIR / folder) as entries:
+            files = []
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    stat = entry.stat()
+                    files.append((f"{BASE_DIR.name}/{folder}/{entry.name}", stat.st_size, stat.st_mtime))
+            return files
+    except FileNotFoundError:
+        return []
+
+
+def _group(path: str) -> str:
+    """Original and variants share the name up to the first dot: Images/Shop/<hash>.thumb.jpg -> Images/Shop/<hash>."""
+    folder, name = path.rsplit("/", 1)
+    return f"{folder}/{name.split('.', 1)[0]}" if not name.startswith(".") else path
+
+
+def _remove_stale(paths: List[str], cutoff: float) -> Tuple[int, int, int]:
+    """Delete files still older than cutoff (re-checked: a duplicate upload touches the file it reuses)."""
+    removed = freed = skipped = 0
+    for path in paths:
+        full_path = BASE_DIR.parent / path
+        try:
+            stat = os.stat(full_path)
+            if stat.st_mtime >= cutoff:
+                skipped += 1
+                continue
+            os.remove(full_path)
+            removed += 1
+            freed += stat.st_size
+        except FileNotFoundError:
+            continue
+    return removed, freed, skipped
+
+
+class ImageGarbageCollector:
+    """
+    Removes picture files that no Retailer.ShopPic, Distributor.CompanyPicture
+    or Medicine.ImgUrl points at any more: replaced or deleted pictures (the
+    APIs keep them, as content-hashed files can be shared), their resized /
+    WebP variants, and temp files of uploads that died half way.
+
+    The folders are listed first, then every reference is read in keyset
+    batches, so a picture saved during a run is already in the references.
+    Files younger than grace_seconds are never touched (uploads whose record
+    is not written yet), nor are the other files of the same picture, and the
+    age is checked again right before deleting.
+    If the references cannot be read completely nothing is deleted. Runs as
+    a scheduler job (one worker per slot) and from the admin endpoint, where
+    dry_run only reports what would go. The scheduled run is a dry run too
+    unless enabled is set (IMAGE_GC_ENABLED), so a fresh deploy never deletes
+    before someone has looked at a report.
+    """
+
+    def __init__(self, db_type: str, grace_seconds: float = 3600, batch_size: int = 500, enabled: bool = False):
+        self.db_type = db_type
+        self.enabled = enabled
+        self.grace_seconds = grace_seconds
+        self.batch_size = batch_size
+        self._lock = asyncio.Lock()
+        self._last_report: Optional[dict] = None
+
+    async def _referenced(self) -> Set[str]:
+        referenced: Set[str] = set()
+        db_manager = DatabaseManager(self.db_type)
+        await db_manager.connect()
+        try:
+            for pk, column in IMAGE_REFERENCES:
+                last = None
+                while True:
+                    stmt = select(pk, column).where(column.isnot(None)).order_by(pk).limit(self.batch_size)
+                    if last is not None:
+                        stmt = stmt.where(pk > last)
+                    rows = (await db_manager.execute(stmt)).all()
+                    for _, path in rows:
+                        normalized = _normalize(path)
+                        if normalized:
+                            variants = image_variants(normalized)
+                            referenced.update(variants.values() if variants else [normalized])
+                    if len(rows) < self.batch_size:
+                        break
+                    last = rows[-1][0]
+        finally:
+            await db_manager.disconnect()
+        return referenced
+
+    async def run(self, dry_run: bool = False) -> dict:
+        if self._lock.locked():
+            return {"success": False, "message": "Image cleanup is already running"}
+        async with self._lock:
+            started = time.monotonic()
+            cutoff = time.time() - self.grace_seconds
+
+            files = []
+            for folder in IMAGE_FOLDERS:
+                files.extend(await asyncio.to_thread(_list_files, folder))
+            referenced = await self._referenced()
+
+            # A picture is kept whole while any of its files is recent (a re-upload touched it)
+            fresh = {_group(path) for path, _, mtime in files if mtime >= cutoff}
+            orphans = [(path, size) for path, size, _ in files if path not in referenced and _group(path) not in fresh]
+            recent = sum(1 for path, _, _ in files if path not in referenced and _group(path) in fresh)
+            report = {
+                "success": True,
+                "DryRun": dry_run,
+                "Scanned": len(files),
+                "Referenced": len(files) - len(orphans) - recent,
+                "Orphans": len(orphans),
+                "OrphanBytes": sum(size for _, size in orphans),
+                "SkippedRecent": recent,
+                "Deleted": 0,
+                "FreedBytes": 0,
+                "Sample": [path for path, _ in orphans[:_SAMPLE_SIZE]],
+            }
+
+            if orphans and not dry_run:
+                # The report goes to the log before anything is removed
+                logger.info(
+                    f"🧹 Image cleanup deleting {len(orphans)} of {len(files)} files "
+                    f"({report['OrphanBytes']} bytes), e.g. {', '.join(report['Sample'][:5])}"
+                )
+                paths = [path for path, _ in orphans]
+                for i in range(0, len(paths), self.batch_size):
+                    removed, freed, skipped = await asyncio.to_thread(_remove_stale, paths[i:i + self.batch_size], cutoff)
+                    report["Deleted"] += removed
+                    report["FreedBytes"] += freed
+                    report["SkippedRecent"] += skipped
+
+            report["Seconds"] = round(time.monotonic() - started, 3)
+            report["FinishedAt"] = time.time()
+            self._last_report = report
+            if orphans:
+                verb = "would delete" if dry_run else "deleted"
+                count = len(orphans) if dry_run else report["Deleted"]
+                logger.info(f"🧹 Image cleanup {verb} {count} of {len(files)} files")
+            return report
+
+    async def scheduled_run(self) -> dict:
+        return await self.run(dry_run=not self.enabled)
+
+    def status(self) -> dict:
+        return {
+            "Running": self._lock.locked(),
+            "Enabled": self.enabled,
+            "GraceSeconds": self.grace_seconds,
+            "LastRun": self._last_report,
+        }
+
+
+# Scheduled in main.py; also run from POST /images/cleanup
+image_gc = ImageGarbageCollector(
+    settings.db_type,
+    grace_seconds=settings.image_gc_grace_seconds,
+    batch_size=settings.image_gc_batch_size,
+    enabled=settings.image_gc_enabled,
+)
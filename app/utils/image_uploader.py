@@ -1,9 +1,17 @@
 import os
+import re
+import asyncio
+import hashlib
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, Optional
 from uuid import uuid4
 from fastapi import UploadFile
 import aiofiles
+import aiofiles.os
+from PIL import Image, ImageOps
+from ..config import settings
 
 # ------------------------------------------------------------
 # 🔧 Logger
@@ -19,6 +27,107 @@ BASE_DIR.mkdir(parents=True, exist_ok=True)
 logger.info(f"[FileHandler] BASE_DIR = {BASE_DIR}")
 
 
+# Uploads are named after their content (first HASH_LENGTH hex digits of the SHA-256),
+# so a given URL always serves the same bytes and identical uploads share one file.
+# Older uploads keep their uuid4 names.
+HASH_LENGTH = 32
+HASHED_NAME = re.compile(rf"^[0-9a-f]{{{HASH_LENGTH}}}(\.|$)")
+
+
+# ------------------------------------------------------------
+# 🖼️ Variants: resized copies stored next to the original
+# ------------------------------------------------------------
+# Images/Shop/<id>.jpg -> <id>.thumb.jpg, <id>.thumb.webp, <id>.medium.jpg, <id>.medium.webp, <id>.webp
+VARIANT_SIZES = {"thumb": settings.image_thumb_px, "medium": settings.image_medium_px}
+
+# Pillow decodes, resizes and encodes without holding the GIL, so threads run in parallel
+_image_pool = ThreadPoolExecutor(max_workers=settings.image_workers, thread_name_prefix="image")
+
+
+def _variant_ext(ext: str) -> str:
+    """Resized copies keep PNG (transparency) and turn everything else into JPEG."""
+    return "png" if ext.lower() == "png" else "jpg"
+
+
+def image_variants(path: Optional[str]) -> Optional[Dict[str, str]]:
+    """
+    Paths of every variant of a stored picture (as saved in the DB), for API
+    responses: clients pick Thumb / Medium for lists and the WebP ones where
+    supported. Derived from the name only, no disk access.
+    """
+    if not path:
+        return None
+    stem, dot, ext = path.rpartition(".")
+    if not dot or "/" in ext:
+        return None
+    fallback = _variant_ext(ext)
+    variants = {"Original": path, "Webp": path if ext.lower() == "webp" else f"{stem}.webp"}
+    for name in VARIANT_SIZES:
+        variants[name.capitalize()] = f"{stem}.{name}.{fallback}"
+        variants[f"{name.capitalize()}Webp"] = f"{stem}.{name}.webp"
+    return variants
+
+
+def _save(image: Image.Image, target: Path, ext: str) -> None:
+    temp = target.with_name(f".{target.name}.tmp")
+    if ext == "webp":
+        image.save(temp, "WEBP", quality=settings.image_webp_quality, method=4)
+    elif ext == "png":
+        image.save(temp, "PNG", optimize=True)
+    else:
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        image.save(temp, "JPEG", quality=85, optimize=True, progressive=True)
+    os.replace(temp, target)
+
+
+def make_variants(file_path: Path) -> None:
+    """Write the resized / WebP variants of one picture (blocking; see save_picture)."""
+    stem, ext = file_path.stem, file_path.suffix.lstrip(".").lower()
+    fallback = _variant_ext(ext)
+    with Image.open(file_path) as source:
+        # Phone photos are stored sideways with an EXIF rotation flag
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+        if ext != "webp":
+            _save(image, file_path.with_name(f"{stem}.webp"), "webp")
+        for name, size in VARIANT_SIZES.items():
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.Resampling.LANCZOS)  # never upscales
+            _save(resized, file_path.with_name(f"{stem}.{name}.{fallback}"), fallback)
+            _save(resized, file_path.with_name(f"{stem}.{name}.webp"), "webp")
+
+
+def variant_files(file_path: Path) -> list:
+    """The original and every variant file of a stored picture."""
+    variants = image_variants(file_path.relative_to(BASE_DIR.parent).as_posix())
+    return [BASE_DIR.parent / p for p in set(variants.values())] if variants else [file_path]
+
+
+def _reuse(file_path: Path) -> bool:
+    """
+    Touch a stored picture and all its variants, so none of them is collected
+    (utils/image_gc.py) before the new reference is written, and rebuild
+    variants that are missing. False if the picture itself is gone.
+    """
+    files = variant_files(file_path)
+    missing = False
+    for path in files:
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            if path == file_path:
+                return False
+            missing = True
+    if missing:
+        try:
+            make_variants(file_path)
+        except Exception as e:
+            logger.warning(f"[FileHandler] Could not rebuild variants of {file_path.name}: {e}")
+    return True
+
+
 # ------------------------------------------------------------
 # 💾 Async File Save Function (Final Clean Version)
 # ------------------------------------------------------------
@@ -50,31 +159,57 @@ async def save_picture(file: UploadFile, folder: str) -> str:
     upload_dir.mkdir(parents=True, exist_ok=True)
 
     # --------------------------
-    # Prepare filename
+    # Prepare extension
     # --------------------------
     original_name = (file.filename or "file").replace(" ", "_")
-    ext = original_name.split(".")[-1] if "." in original_name else ""
-    filename = f"{uuid4()}.{ext}" if ext else str(uuid4())
-
-    file_path = upload_dir / filename
+    ext = re.sub(r"[^a-z0-9]", "", original_name.rsplit(".", 1)[-1].lower())[:10] if "." in original_name else ""
 
     logger.info(f"[FileHandler] Saving: {original_name}")
-    logger.info(f"[FileHandler] Target Path: {file_path}")
 
     # Reset stream pointer
     await file.seek(0)
 
     # --------------------------
-    # Save file asynchronously
+    # Save asynchronously, hashing on the way; the hash becomes the name
+    # --------------------------
+    digest = hashlib.sha256()
+    temp_path = upload_dir / f".{uuid4()}.upload"
+    try:
+        async with aiofiles.open(temp_path, "wb") as out:
+            while chunk := await file.read(64 * 1024):
+                digest.update(chunk)
+                await out.write(chunk)
+
+        name = digest.hexdigest()[:HASH_LENGTH]
+        file_path = upload_dir / (f"{name}.{ext}" if ext else name)
+        relative_path = file_path.relative_to(BASE_DIR.parent).as_posix()
+
+        # Same bytes already stored (variants included): reuse them
+        if await aiofiles.os.path.exists(file_path) and await asyncio.get_running_loop().run_in_executor(
+            _image_pool, _reuse, file_path
+        ):
+            logger.info(f"[FileHandler] Already stored: {relative_path}")
+            return relative_path
+        await aiofiles.os.replace(temp_path, file_path)
+    finally:
+        if await aiofiles.os.path.exists(temp_path):
+            await aiofiles.os.remove(temp_path)
+
+    # --------------------------
+    # Resized / WebP variants (off the event loop)
     # --------------------------
-    async with aiofiles.open(file_path, "wb") as out:
-        while chunk := await file.read(8192):
-            await out.write(chunk)
+    try:
+        if ext:
+            await asyncio.get_running_loop().run_in_executor(_image_pool, make_variants, file_path)
+    except Exception as e:
+        logger.warning(f"[FileHandler] Not a usable image, discarding {original_name}: {e}")
+        for path in variant_files(file_path):
+            path.unlink(missing_ok=True)
+        raise ValueError(f"Unsupported image file: {original_name}")
 
     # --------------------------
     # Return path used for DB
     # --------------------------
-    relative_path = file_path.relative_to(BASE_DIR.parent).as_posix()
     logger.info(f"[FileHandler] Saved Successfully: {relative_path}")
 
     return relative_path
@@ -0,0 +1,178 @@
+import csv
+import io
+import json
+from datetime import date
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import UploadFile
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import bindparam, insert, select, update
+from starlette.concurrency import run_in_threadpool
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+_FIELDS = ("MedicineName", "Brand", "MinStock", "MaxStock", "Price", "Batch", "ExpiryDate", "Quantity")
+
+
+class _ImportRow(BaseModel):
+    MedicineName: str = Field(..., min_length=1)
+    Brand: Optional[str] = None
+    MinStock: Optional[int] = Field(None, ge=0)
+    MaxStock: Optional[int] = Field(None, ge=0)
+    Price: float = Field(..., ge=0)
+    Batch: Optional[str] = None
+    ExpiryDate: Optional[date] = None
+    Quantity: int = Field(..., ge=0)
+
+
+def detect_format(filename: Optional[str], requested: Optional[str] = None) -> Optional[str]:
+    """Explicit format wins; otherwise go by extension (.csv, .jsonl / .ndjson / .json)."""
+    if requested:
+        return requested.lower() if requested.lower() in IMPORT_FORMATS else None
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return None
+
+
+class InventoryImporter:
+    """
+    Streams an uploaded CSV / JSON-lines file into an inventory table.
+
+    The file is read chunk_size records at a time (parsing runs in the thread
+    pool, the upload is already spooled to disk by Starlette), so memory stays
+    bounded by one chunk however large the file is. Every chunk is upserted on
+    (Owner, MedicineName, Batch) in one transaction with three statements:
+    a SELECT of the existing keys, an executemany UPDATE and one multi-row
+    INSERT. Later rows for the same key win.
+    """
+
+    def __init__(
+        self,
+        inventory_model,
+        owner_field: str,
+        id_field: str,
+        calculate_status: Callable[[int, Optional[int]], str],
+        chunk_size: int = 500,
+        max_errors: int = 1000,
+    ):
+        self.model = inventory_model
+        self.owner_field = owner_field
+        self.id_field = id_field
+        self.calculate_status = calculate_status
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+
+    # ---------------- Reading ----------------
+    @staticmethod
+    def _records(text: io.TextIOBase, fmt: str) -> Iterator[Tuple[int, object]]:
+        """(source line number, raw record) pairs."""
+        if fmt == "csv":
+            reader = csv.DictReader(text)
+            for raw in reader:
+                yield reader.line_num, raw
+        else:
+            for line_no, line in enumerate(text, 1):
+                if line.strip():
+                    yield line_no, line
+
+    def _parse(self, raw: object) -> dict:
+        if isinstance(raw, str):
+            raw = json.loads(raw)
+            if not isinstance(raw, dict):
+                raise ValueError("expected a JSON object")
+        values = {}
+        for key, value in raw.items():
+            if not key:
+                continue
+            if isinstance(value, str):
+                value = value.strip() or None
+            values[key.strip()] = value
+        return _ImportRow(**values).dict()
+
+    @staticmethod
+    def _describe(error: Exception) -> str:
+        if isinstance(error, ValidationError):
+            return "; ".join(f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors())
+        return str(error)
+
+    # ---------------- Writing ----------------
+    async def _upsert_chunk(self, db_manager, owner_id: int, rows: Dict[Tuple[str, Optional[str]], dict]) -> Tuple[int, int]:
+        model = self.model
+        owner_column = getattr(model, self.owner_field)
+        id_column = getattr(model, self.id_field)
+        names = list({name for name, _ in rows})
+
+        async with db_manager.transaction() as session:
+            result = await session.execute(
+                select(id_column, model.MedicineName, model.Batch)
+                .where(owner_column == owner_id, model.MedicineName.in_(names))
+            )
+            existing = {(name, batch): row_id for row_id, name, batch in result.all()}
+
+            updates, inserts = [], []
+            for key, row in rows.items():
+                row_id = existing.get(key)
+                if row_id is None:
+                    inserts.append({**row, self.owner_field: owner_id})
+                else:
+                    # bind names must not clash with the columns being SET
+                    updates.append({**{f"new_{k}": v for k, v in row.items()}, "row_id": row_id})
+
+            if updates:
+                stmt = (
+                    update(model.__table__)
+                    .where(id_column == bindparam("row_id"))
+                    .values({field: bindparam(f"new_{field}") for field in (*_FIELDS, "Status")})
+                )
+                await session.execute(stmt, updates)
+            if inserts:
+                await session.execute(insert(model.__table__).values(inserts))
+
+        return len(inserts), len(updates)
+
+    async def run(self, db_manager, owner_id: int, upload: UploadFile, fmt: str) -> dict:
+        """db_manager must be connected. Returns counts and the per-row error report."""
+        inserted = updated = failed = 0
+        errors: List[dict] = []
+
+        text = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        try:
+            records = self._records(text, fmt)
+            while True:
+                chunk = await run_in_threadpool(lambda: list(islice(records, self.chunk_size)))
+                if not chunk:
+                    break
+
+                rows: Dict[Tuple[str, Optional[str]], dict] = {}
+                for line_no, raw in chunk:
+                    try:
+                        row = self._parse(raw)
+                    except Exception as e:
+                        failed += 1
+                        if len(errors) < self.max_errors:
+                            errors.append({"Row": line_no, "Error": self._describe(e)})
+                        continue
+                    row["Status"] = self.calculate_status(row["Quantity"], row["MinStock"])
+                    rows[(row["MedicineName"], row["Batch"])] = row
+
+                if rows:
+                    chunk_inserted, chunk_updated = await self._upsert_chunk(db_manager, owner_id, rows)
+                    inserted += chunk_inserted
+                    updated += chunk_updated
+        except UnicodeDecodeError as e:
+            failed += 1
+            errors.append({"Row": None, "Error": f"File is not valid UTF-8: {e}"})
+        finally:
+            text.detach()
+
+        return {
+            "Inserted": inserted,
+            "Updated": updated,
+            "Failed": failed,
+            "Errors": errors,
+            "ErrorsTruncated": failed > len(errors),
+        }
@@ -0,0 +1,47 @@
+from datetime import date
+from typing import List, Optional
+from sqlalchemy import case, func
+
+STOCK_STATUSES = ("in", "low", "no")
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input is matched literally (use with escape="\\")."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def inventory_filters(
+    model,
+    owner_column,
+    owner_id: int,
+    status: Optional[str] = None,
+    expiry_before: Optional[date] = None,
+    brand: Optional[str] = None,
+    batch: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+) -> List:
+    """
+    WHERE clauses for an inventory query. The owner column always leads so the
+    (Owner, Status) and (Owner, ExpiryDate) composite indexes can be used.
+    """
+    filters = [owner_column == owner_id]
+    if status:
+        filters.append(model.Status == status)
+    if expiry_before:
+        filters.append(model.ExpiryDate < expiry_before)
+    if brand:
+        filters.append(model.Brand.ilike(escape_like(brand), escape="\\"))
+    if batch:
+        filters.append(model.Batch == batch)
+    if name_prefix:
+        filters.append(model.MedicineName.ilike(f"{escape_like(name_prefix)}%", escape="\\"))
+    return filters
+
+
+def stock_status_expression(model, quantity):
+    """SQL twin of the managers' _calculate_status for a (new) quantity expression."""
+    return case(
+        (quantity == 0, "no"),
+        (quantity <= func.coalesce(model.MinStock, 0), "low"),
+        else_="in",
+    )
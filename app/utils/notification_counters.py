@@ -0,0 +1,103 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from sqlalchemy import case, func, select
+
+COUNTER_KEYS = ("Total", "Unread", "Orders", "StockAlerts")
+
+
+def _categories(notification_type: Optional[str]) -> Tuple[str, ...]:
+    """Same rule the inbox always used: "order" / "stock" anywhere in Type."""
+    kind = (notification_type or "").lower()
+    return tuple(key for word, key in (("order", "Orders"), ("stock", "StockAlerts")) if word in kind)
+
+
+class NotificationCounters:
+    """
+    Per-account inbox counters (Total, Unread, Orders, StockAlerts) for one
+    notification table.
+
+    An account is seeded on first read with a single aggregate query on the
+    (Owner, IsRead, Date) index and then kept current by the writers: inserts
+    call added(), mark-read calls read(), deletes call invalidate(). Entries
+    are reseeded after ttl_seconds so writes made by other worker processes
+    are picked up too. Polling the counts is therefore a dict lookup.
+    """
+
+    def __init__(self, notification_model, owner_field: str, max_accounts: int = 10000, ttl_seconds: float = 60):
+        self.model = notification_model
+        self.owner_field = owner_field
+        self.max_accounts = max_accounts
+        self.ttl_seconds = ttl_seconds
+        self._accounts: "OrderedDict[int, Tuple[float, Dict[str, int]]]" = OrderedDict()
+        self._generation: Dict[int, int] = {}
+        self._lock = asyncio.Lock()
+
+    def _cached(self, account_id: int) -> Optional[Dict[str, int]]:
+        cached = self._accounts.get(account_id)
+        if cached is None:
+            return None
+        loaded_at, counts = cached
+        if self.ttl_seconds and time.monotonic() - loaded_at > self.ttl_seconds:
+            self._accounts.pop(account_id, None)
+            return None
+        self._accounts.move_to_end(account_id)
+        return counts
+
+    async def _load(self, db_manager, account_id: int) -> Dict[str, int]:
+        model = self.model
+        kind = func.lower(model.Type)
+        result = await db_manager.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(case((model.IsRead.is_not(True), 1), else_=0)), 0),
+                func.coalesce(func.sum(case((kind.like("%order%"), 1), else_=0)), 0),
+                func.coalesce(func.sum(case((kind.like("%stock%"), 1), else_=0)), 0),
+            ).where(getattr(model, self.owner_field) == account_id)
+        )
+        return dict(zip(COUNTER_KEYS, (int(v) for v in result.one())))
+
+    async def counts(self, db_manager, account_id: int) -> Dict[str, int]:
+        """Counters for an account. db_manager must be connected."""
+        counts = self._cached(account_id)
+        if counts is None:
+            async with self._lock:
+                counts = self._cached(account_id)
+                if counts is None:
+                    generation = self._generation.get(account_id, 0)
+                    counts = await self._load(db_manager, account_id)
+                    if generation == self._generation.get(account_id, 0):
+                        self._accounts[account_id] = (time.monotonic(), counts)
+                        while len(self._accounts) > self.max_accounts:
+                            evicted, _ = self._accounts.popitem(last=False)
+                            self._generation.pop(evicted, None)
+        return dict(counts)
+
+    def _bump(self, account_id: int) -> Optional[Dict[str, int]]:
+        self._generation[account_id] = self._generation.get(account_id, 0) + 1
+        cached = self._accounts.get(account_id)
+        return cached[1] if cached is not None else None
+
+    def added(self, rows: Iterable[Mapping]) -> None:
+        """Count freshly inserted notification rows (dicts with owner, Type and IsRead)."""
+        for row in rows:
+            counts = self._bump(row[self.owner_field])
+            if counts is None:
+                continue
+            counts["Total"] += 1
+            if not row.get("IsRead"):
+                counts["Unread"] += 1
+            for category in _categories(row.get("Type")):
+                counts[category] += 1
+
+    def read(self, account_id: int, count: int) -> None:
+        """count notifications of the account went from unread to read."""
+        counts = self._bump(account_id)
+        if counts is not None and count:
+            counts["Unread"] = max(counts["Unread"] - count, 0)
+
+    def invalidate(self, account_id: int) -> None:
+        self._generation[account_id] = self._generation.get(account_id, 0) + 1
+        self._accounts.pop(account_id, None)
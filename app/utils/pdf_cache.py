@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from starlette.concurrency import run_in_threadpool
+
+from .logger import get_logger
+from .resilience import SingleFlight
+from ..config import settings
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CachedFile:
+    content: bytes
+    etag: str
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+
+def content_hash(data: Any, version: str = "") -> str:
+    """Stable hash of a JSON-like value (dict key order does not matter) plus a version tag."""
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{version}\n{encoded}".encode()).hexdigest()[:32]
+
+
+class DiskCache:
+    """
+    Content-addressed files on local disk, e.g. rendered invoice PDFs.
+
+    A file is named <prefix>_<hash>.pdf where hash covers everything the
+    output depends on (the invoice dict and the template version), so a
+    changed invoice simply misses and a hit never needs checking. Hits touch
+    the file's mtime and read it whole while still inside the cache (the
+    files are small), so a concurrent store / invalidate / eviction cannot
+    pull a file out from under a response. When the folder grows past
+    max_bytes the least recently used files are removed until it is back
+    under 90% of it. Concurrent misses for one key render once. Writes go to
+    a temp file and are renamed into place, so several workers can share the
+    folder.
+
+    Which hashes are on disk per prefix is indexed (one folder scan, then
+    kept current by this worker), so replacing or invalidating a document
+    removes its files without listing the folder. Files another worker wrote
+    for a prefix are not in the index; eviction gets to them.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, suffix: str = ".pdf"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._singleflight = SingleFlight()
+        # Scanned lazily, then kept current by this worker's writes
+        self._approx_bytes = None
+        self._index: Dict[str, Set[str]] = {}
+        self._stats = {"Hits": 0, "Misses": 0, "Evictions": 0, "Invalidations": 0}
+
+    def _path(self, prefix: str, digest: str) -> str:
+        return os.path.join(self.directory, f"{prefix}_{digest}{self.suffix}")
+
+    async def get_or_create(self, prefix: str, digest: str, create: Callable[[], Awaitable[bytes]]) -> CachedFile:
+        path = self._path(prefix, digest)
+        content = await run_in_threadpool(self._read, path)
+        if content is not None:
+            self._stats["Hits"] += 1
+            self._index.setdefault(prefix, set()).add(digest)
+            return CachedFile(content, f'"{digest}"')
+
+        async def miss() -> CachedFile:
+            self._stats["Misses"] += 1
+            content = await create()
+            await run_in_threadpool(self._store, prefix, digest, content)
+            return CachedFile(content, f'"{digest}"')
+
+        return await self._singleflight.do(path, miss)
+
+    @staticmethod
+    def _read(path: str) -> Optional[bytes]:
+        try:
+            os.utime(path)
+            with open(path, "rb") as handle:
+                return handle.read()
+        except FileNotFoundError:
+            return None
+
+    def _store(self, prefix: str, digest: str, content: bytes) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        if self._approx_bytes is None:
+            self._scan()
+        # Older renders of the same document can never be hit again
+        self._remove_digests(prefix, self._index.get(prefix, set()) - {digest})
+        path = self._path(prefix, digest)
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "wb") as handle:
+            handle.write(content)
+        os.replace(temp, path)
+        self._index[prefix] = {digest}
+
+        self._approx_bytes += len(content)
+        if self._approx_bytes > self.max_bytes:
+            self._evict()
+
+    def _entries(self):
+        try:
+            return [e for e in os.scandir(self.directory) if e.is_file() and e.name.endswith(self.suffix)]
+        except FileNotFoundError:
+            return []
+
+    def _scan(self, entries=None) -> None:
+        """Rebuild the size estimate and the prefix index from the folder."""
+        index: Dict[str, Set[str]] = {}
+        total = 0
+        for entry in self._entries() if entries is None else entries:
+            prefix, _, digest = entry.name[:-len(self.suffix)].rpartition("_")
+            if prefix:
+                index.setdefault(prefix, set()).add(digest)
+            try:
+                total += entry.stat().st_size
+            except FileNotFoundError:
+                continue
+        self._index = index
+        self._approx_bytes = total
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries(), key=lambda e: e.stat().st_mtime)
+        total = sum(e.stat().st_size for e in entries)
+        target = self.max_bytes * 0.9
+        kept = []
+        for entry in entries:
+            if total <= target:
+                kept.append(entry)
+                continue
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            self._stats["Evictions"] += 1
+        self._scan(kept)
+
+    def _remove_digests(self, prefix: str, digests: Set[str]) -> int:
+        removed = 0
+        for digest in digests:
+            path = self._path(prefix, digest)
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+            if self._approx_bytes is not None:
+                self._approx_bytes -= size
+        return removed
+
+    def _remove_prefix(self, prefix: str) -> int:
+        if self._approx_bytes is None:
+            self._scan()
+        return self._remove_digests(prefix, self._index.pop(prefix, set()))
+
+    async def invalidate(self, prefix: str) -> int:
+        """Drop every cached file of one document (e.g. 'invoice_12')."""
+        removed = await run_in_threadpool(self._remove_prefix, prefix)
+        self._stats["Invalidations"] += removed
+        return removed
+
+    def stats(self) -> dict:
+        served = self._stats["Hits"] + self._stats["Misses"]
+        return {
+            **self._stats,
+            "HitRatio": round(self._stats["Hits"] / served, 4) if served else None,
+            "MaxBytes": self.max_bytes,
+        }
+
+
+# Rendered distributor invoice PDFs (see RetailerInvoiceAPI.generate_invoice_pdf)
+invoice_pdf_cache = DiskCache(settings.pdf_cache_dir, settings.pdf_cache_max_mb * 1024 * 1024)
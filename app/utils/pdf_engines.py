@@ -0,0 +1,232 @@
+import importlib
+import importlib.util
+import io
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Type
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# Engine class -> whether its package imports (checked once per process)
+_availability: Dict[type, bool] = {}
+
+
+class PdfEngine(ABC):
+    """
+    Turns the invoice dict (RetailerInvoiceManager.get_invoice) into PDF bytes.
+
+    HTML engines render the Jinja template first; layout engines draw the
+    page themselves and ignore it. Engines are created inside the PDF worker
+    processes (utils/pdf_renderer.py); the app process only imports the
+    configured engine's package once at startup, to check that it loads.
+    """
+
+    name: str = ""
+    module: str = ""         # import needed for the engine to work
+    uses_template = True
+
+    @classmethod
+    def available(cls) -> bool:
+        """
+        Whether the engine's package imports here. An installed package is not
+        enough: WeasyPrint loads Pango when imported and fails on hosts
+        without it, which would break every worker the pool starts.
+        """
+        if cls not in _availability:
+            if importlib.util.find_spec(cls.module) is None:
+                _availability[cls] = False
+            else:
+                try:
+                    importlib.import_module(cls.module)
+                    _availability[cls] = True
+                except Exception as e:  # OSError from a missing native library, among others
+                    logger.warning(f"⚠️ PDF engine '{cls.name}': importing '{cls.module}' failed: {e}")
+                    _availability[cls] = False
+        return _availability[cls]
+
+    @abstractmethod
+    def render(self, template, context: dict) -> bytes:
+        ...
+
+
+class Xhtml2PdfEngine(PdfEngine):
+    """HTML -> PDF with xhtml2pdf (pure Python, slowest, the original path)."""
+
+    name = "xhtml2pdf"
+    module = "xhtml2pdf"
+
+    def __init__(self):
+        from xhtml2pdf import pisa
+        self._pisa = pisa
+
+    def render(self, template, context: dict) -> bytes:
+        buffer = io.BytesIO()
+        result = self._pisa.CreatePDF(io.StringIO(template.render(**context)), dest=buffer)
+        if result.err:
+            raise RuntimeError(f"PDF rendering failed with {result.err} error(s)")
+        return buffer.getvalue()
+
+
+class WeasyPrintEngine(PdfEngine):
+    """HTML -> PDF with WeasyPrint (full CSS support; needs Pango on the host)."""
+
+    name = "weasyprint"
+    module = "weasyprint"
+
+    def __init__(self):
+        from weasyprint import HTML
+        self._html = HTML
+
+    def render(self, template, context: dict) -> bytes:
+        return self._html(string=template.render(**context)).write_pdf()
+
+
+class FpdfInvoiceEngine(PdfEngine):
+    """
+    Draws the standard invoice directly with fpdf: no HTML or CSS parsing,
+    so it is by far the fastest. The layout mirrors templates/invoice_template.html;
+    changes to that template are not picked up here. Core fonts are Latin-1
+    only, so amounts are printed as 'Rs.' instead of the rupee sign.
+    """
+
+    name = "fpdf"
+    module = "fpdf"
+    uses_template = False
+
+    GREEN = (46, 125, 50)
+    COLUMNS = (("S.No", 12), ("Medicine", 70), ("Quantity", 22), ("Unit Price", 28), ("GST", 18), ("Total", 30))
+
+    def __init__(self):
+        from fpdf import FPDF
+        self._fpdf = FPDF
+
+    @staticmethod
+    def _text(value) -> str:
+        text = "" if value is None else str(value)
+        return text.replace("₹", "Rs.").encode("latin-1", "replace").decode("latin-1")
+
+    def _heading(self, pdf, title: str) -> None:
+        pdf.ln(4)
+        pdf.set_font("Arial", "B", 11)
+        pdf.set_text_color(*self.GREEN)
+        pdf.cell(0, 7, title, ln=1)
+        pdf.set_text_color(51, 51, 51)
+        pdf.set_font("Arial", "", 10)
+
+    def _line(self, pdf, label: Optional[str], value) -> None:
+        if label:
+            pdf.set_font("Arial", "B", 10)
+            pdf.cell(pdf.get_string_width(label) + 2, 5, label)
+            pdf.set_font("Arial", "", 10)
+        pdf.cell(0, 5, self._text(value), ln=1)
+
+    def render(self, template, context: dict) -> bytes:
+        invoice = context["invoice"]
+        retailer = invoice.get("RetailerDetails") or {}
+        summary = invoice.get("OrderSummary") or {}
+        payment = invoice.get("PaymentAndDelivery") or {}
+        distributor = invoice.get("DistributorDetails") or {}
+        support = distributor.get("Support") or {}
+
+        pdf = self._fpdf(unit="mm", format="A4")
+        pdf.set_auto_page_break(True, margin=15)
+        pdf.add_page()
+
+        # Header
+        pdf.set_font("Arial", "B", 18)
+        pdf.set_text_color(*self.GREEN)
+        pdf.cell(0, 9, "HealthPlus", ln=1)
+        pdf.set_font("Arial", "B", 14)
+        pdf.set_text_color(51, 51, 51)
+        pdf.cell(0, 7, "Invoice / Bill of Sale", ln=1)
+        self._line(pdf, "Invoice No:", invoice.get("InvoiceNo"))
+        pdf.set_draw_color(*self.GREEN)
+        pdf.line(10, pdf.get_y() + 1, 200, pdf.get_y() + 1)
+
+        self._heading(pdf, "Retailer Details")
+        pdf.set_font("Arial", "B", 10)
+        pdf.cell(0, 5, self._text(retailer.get("Name")), ln=1)
+        pdf.set_font("Arial", "", 10)
+        self._line(pdf, None, retailer.get("Address"))
+        self._line(pdf, "Contact:", retailer.get("Contact"))
+        self._line(pdf, "Email:", retailer.get("Email"))
+        self._line(pdf, "Order ID:", retailer.get("OrderID"))
+        self._line(pdf, "Order Date:", retailer.get("OrderDate"))
+        self._line(pdf, "Expected Delivery:", retailer.get("ExpectedDelivery"))
+
+        self._heading(pdf, "Order Summary")
+        pdf.set_font("Arial", "B", 10)
+        pdf.set_fill_color(242, 242, 242)
+        pdf.set_draw_color(221, 221, 221)
+        for title, width in self.COLUMNS:
+            pdf.cell(width, 7, title, border=1, fill=True)
+        pdf.ln()
+        pdf.set_font("Arial", "", 10)
+        for index, item in enumerate(summary.get("Items") or [], start=1):
+            values = (
+                index,
+                item.get("Medicine"),
+                item.get("Quantity"),
+                f"Rs.{item.get('UnitPrice')}",
+                item.get("GST"),
+                f"Rs.{item.get('Total')}",
+            )
+            for (_, width), value in zip(self.COLUMNS, values):
+                pdf.cell(width, 7, self._text(value)[:45], border=1)
+            pdf.ln()
+        pdf.ln(2)
+        pdf.set_font("Arial", "B", 12)
+        pdf.cell(0, 7, self._text(f"Total: Rs.{summary.get('TotalAmount')}"), align="R", ln=1)
+        pdf.set_font("Arial", "", 10)
+
+        self._heading(pdf, "Payment & Delivery")
+        self._line(pdf, "Payment Mode:", payment.get("PaymentMode"))
+        self._line(pdf, "Payment Status:", payment.get("PaymentStatus"))
+        self._line(pdf, "Delivery Method:", payment.get("DeliveryMethod"))
+        self._line(pdf, "Delivery Partner:", payment.get("DeliveryPartner"))
+
+        self._heading(pdf, "Notes")
+        pdf.set_font("Arial", "", 9)
+        for note in invoice.get("FooterNotes") or []:
+            pdf.multi_cell(0, 5, self._text(f"- {note}"))
+        pdf.set_font("Arial", "", 10)
+
+        self._heading(pdf, "Distributor Details")
+        pdf.set_font("Arial", "B", 10)
+        pdf.cell(0, 5, self._text(distributor.get("DistributorName")), ln=1)
+        pdf.set_font("Arial", "", 10)
+        self._line(pdf, None, distributor.get("Address"))
+        self._line(pdf, "License No:", distributor.get("LicenseNo"))
+        self._line(pdf, "GSTIN:", distributor.get("GSTIN"))
+        self._line(pdf, "Support:", f"{support.get('Phone')} | {support.get('Email')}")
+
+        pdf.ln(6)
+        pdf.set_font("Arial", "I", 9)
+        pdf.cell(0, 5, "Thank you for choosing HealthPlus!", align="C", ln=1)
+        pdf.cell(0, 5, "Stay Healthy. Stay Safe.", align="C", ln=1)
+
+        output = pdf.output(dest="S")
+        # fpdf 1.x returns a latin-1 str, fpdf2 a bytearray
+        return output.encode("latin-1") if isinstance(output, str) else bytes(output)
+
+
+PDF_ENGINES: Dict[str, Type[PdfEngine]] = {
+    engine.name: engine for engine in (Xhtml2PdfEngine, WeasyPrintEngine, FpdfInvoiceEngine)
+}
+DEFAULT_PDF_ENGINE = Xhtml2PdfEngine.name
+
+
+def resolve_pdf_engine(name: str) -> str:
+    """Validated engine name; an engine whose package is missing or fails to import falls back to the default."""
+    engine = PDF_ENGINES.get((name or "").lower())
+    if engine is None:
+        raise ValueError(f"Unknown PDF engine '{name}', expected one of: {', '.join(PDF_ENGINES)}")
+    if not engine.available():
+        logger.warning(f"⚠️ PDF_ENGINE is '{engine.name}' but the '{engine.module}' package is not installed or cannot be loaded, using {DEFAULT_PDF_ENGINE}")
+        return DEFAULT_PDF_ENGINE
+    return engine.name
+
+
+def create_pdf_engine(name: str) -> PdfEngine:
+    return PDF_ENGINES[resolve_pdf_engine(name)]()
@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from .logger import get_logger
+from .pdf_engines import create_pdf_engine, resolve_pdf_engine, PDF_ENGINES
+from ..config import settings
+
+logger = get_logger(__name__)
+
+# Set in each worker process by _init_worker: engine and template are built once per process
+_engine = None
+_template = None
+
+
+def _init_worker(template_dir: str, template_name: str, engine_name: str) -> None:
+    global _engine, _template
+    _engine = create_pdf_engine(engine_name)
+    if _engine.uses_template:
+        from jinja2 import Environment, FileSystemLoader
+
+        _template = Environment(loader=FileSystemLoader(template_dir), auto_reload=False).get_template(template_name)
+
+
+def _render_pdf(context: dict) -> bytes:
+    """Runs in a worker process: context -> PDF bytes with the configured engine."""
+    return _engine.render(_template, context)
+
+
+class PdfRendererBusy(Exception):
+    """Every worker is busy and the wait queue is full."""
+
+
+class PdfRenderer:
+    """
+    Renders invoice PDFs in a small process pool so that the PDF engine
+    (utils/pdf_engines.py), which is CPU-bound and holds the GIL, never runs
+    on the event loop. Each worker builds the engine and compiles the Jinja
+    template once when it starts. At most
+    max_workers + max_queue renders are accepted at a time; beyond that
+    render() raises PdfRendererBusy straight away (the API answers 503)
+    instead of letting requests pile up. start() / shutdown() run in the app
+    lifespan; a pool that dies (e.g. a worker crashed) is rebuilt on next use.
+    """
+
+    def __init__(self, template_dir: str, template_name: str, engine: str = "xhtml2pdf", max_workers: int = 2, max_queue: int = 8):
+        self.template_dir = template_dir
+        self.template_name = template_name
+        self.engine = resolve_pdf_engine(engine)
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._version: Optional[str] = None
+        self._pending = 0
+        self._bulk_slots = asyncio.Semaphore(max_workers)
+        self._stats = {"Rendered": 0, "Rejected": 0, "Failed": 0}
+
+    def _build(self) -> ProcessPoolExecutor:
+        # spawn: forking a process that runs an event loop and threads is unsafe
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.template_dir, self.template_name, self.engine),
+        )
+
+    @property
+    def template_version(self) -> str:
+        """Engine plus a hash of the template source; part of every cache key for rendered output."""
+        if self._version is None:
+            digest = "layout"
+            if PDF_ENGINES[self.engine].uses_template:
+                with open(os.path.join(self.template_dir, self.template_name), "rb") as handle:
+                    digest = hashlib.sha256(handle.read()).hexdigest()[:16]
+            self._version = f"{self.engine}:{digest}"
+        return self._version
+
+    def start(self) -> None:
+        if self._pool is None:
+            self._pool = self._build()
+            logger.info(f"🧾 PDF renderer ready ({self.engine}, {self.max_workers} workers, queue {self.max_queue})")
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def render(self, context: dict, wait: bool = False) -> bytes:
+        """
+        wait=False (interactive downloads): raise PdfRendererBusy when the queue is full.
+        wait=True (bulk exports): queue up behind at most max_workers other waiting
+        renders instead, so bulk work never fails for being busy and never takes
+        more than max_workers of the slots interactive requests are admitted to.
+        """
+        if wait:
+            async with self._bulk_slots:
+                return await self._run(context)
+        if self._pending >= self.max_workers + self.max_queue:
+            self._stats["Rejected"] += 1
+            raise PdfRendererBusy("PDF renderer is busy, try again shortly")
+        return await self._run(context)
+
+    async def _run(self, context: dict) -> bytes:
+        self.start()
+        self._pending += 1
+        try:
+            pdf = await asyncio.get_running_loop().run_in_executor(self._pool, _render_pdf, context)
+        except BrokenProcessPool:
+            self._stats["Failed"] += 1
+            logger.error("❌ PDF worker pool broke, rebuilding it")
+            self.shutdown()
+            raise
+        except Exception:
+            self._stats["Failed"] += 1
+            raise
+        finally:
+            self._pending -= 1
+        self._stats["Rendered"] += 1
+        return pdf
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "Engine": self.engine,
+            "Pending": self._pending,
+            "MaxWorkers": self.max_workers,
+            "MaxQueue": self.max_queue,
+        }
+
+
+# Invoice PDFs; the pool is started and shut down in the app lifespan
+invoice_pdf = PdfRenderer(
+    settings.pdf_template_dir,
+    "invoice_template.html",
+    engine=settings.pdf_engine,
+    max_workers=settings.pdf_max_workers,
+    max_queue=settings.pdf_max_queue,
+)
@@ -0,0 +1,161 @@
+import asyncio
+import bisect
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+Entries = Iterable[Tuple[int, str]]
+
+
+class PrefixIndex:
+    """
+    Compact prefix index: a sorted array of (normalized name, entry id) pairs
+    searched with bisect. Entries are keyed by id so writes can update or
+    remove a single row without a rebuild.
+    """
+
+    def __init__(self, entries: Entries = ()):
+        self._names: Dict[int, str] = {i: n for i, n in entries if n}
+        self._keys: List[Tuple[str, int]] = sorted(
+            (self.normalize(n), i) for i, n in self._names.items()
+        )
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        return " ".join(name.lower().split())
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def upsert(self, entry_id: int, name: Optional[str]) -> None:
+        self.remove(entry_id)
+        if not name:
+            return
+        self._names[entry_id] = name
+        bisect.insort(self._keys, (self.normalize(name), entry_id))
+
+    def remove(self, entry_id: int) -> None:
+        name = self._names.pop(entry_id, None)
+        if name is None:
+            return
+        key = (self.normalize(name), entry_id)
+        pos = bisect.bisect_left(self._keys, key)
+        if pos < len(self._keys) and self._keys[pos] == key:
+            del self._keys[pos]
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        """Distinct names starting with prefix, in alphabetical order."""
+        prefix = self.normalize(prefix)
+        pos = bisect.bisect_left(self._keys, (prefix,))
+        results, seen = [], set()
+        while pos < len(self._keys) and len(results) < limit:
+            key, entry_id = self._keys[pos]
+            if not key.startswith(prefix):
+                break
+            if key not in seen:
+                seen.add(key)
+                results.append(self._names[entry_id])
+            pos += 1
+        return results
+
+
+class _RetailerLoad:
+    __slots__ = ("lock", "waiters", "generation")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.waiters = 0
+        self.generation = 0
+
+
+class AutocompleteIndex:
+    """
+    Process-wide prefix indexes: one for the Medicine catalog and one per
+    retailer inventory. Each index is loaded lazily on first use; per-retailer
+    indexes are kept in an LRU bounded by max_retailers.
+
+    Writes go through upsert_* / remove_*. A write that lands while an index
+    is loading bumps a generation counter, and the freshly loaded index is
+    then discarded instead of installed, so it is never missing that write.
+    Each retailer loads under its own lock; the lock and its counter exist
+    only while someone is loading or waiting on that retailer.
+    """
+
+    def __init__(self, max_retailers: int = 1000):
+        self.max_retailers = max_retailers
+        self._medicine: Optional[PrefixIndex] = None
+        self._medicine_generation = 0
+        self._retailers: "OrderedDict[int, PrefixIndex]" = OrderedDict()
+        self._retailer_loads: Dict[int, _RetailerLoad] = {}
+        self._lock = asyncio.Lock()  # medicine catalog only
+
+    # ---------------- Medicine catalog ----------------
+    async def medicine(self, loader: Callable[[], Awaitable[Entries]]) -> PrefixIndex:
+        if self._medicine is not None:
+            return self._medicine
+        async with self._lock:
+            if self._medicine is None:
+                generation = self._medicine_generation
+                index = PrefixIndex(await loader())
+                if generation != self._medicine_generation:
+                    return index
+                self._medicine = index
+            return self._medicine
+
+    def upsert_medicine(self, medicine_id: int, name: Optional[str]) -> None:
+        self._medicine_generation += 1
+        if self._medicine is not None:
+            self._medicine.upsert(medicine_id, name)
+
+    def remove_medicine(self, medicine_id: int) -> None:
+        self._medicine_generation += 1
+        if self._medicine is not None:
+            self._medicine.remove(medicine_id)
+
+    # ---------------- Retailer inventory ----------------
+    async def retailer(self, retailer_id: int, loader: Callable[[], Awaitable[Entries]]) -> PrefixIndex:
+        index = self._retailers.get(retailer_id)
+        if index is not None:
+            self._retailers.move_to_end(retailer_id)
+            return index
+        load = self._retailer_loads.get(retailer_id)
+        if load is None:
+            load = self._retailer_loads[retailer_id] = _RetailerLoad()
+        load.waiters += 1
+        try:
+            async with load.lock:
+                index = self._retailers.get(retailer_id)
+                if index is not None:
+                    return index
+                generation = load.generation
+                index = PrefixIndex(await loader())
+                if generation != load.generation:
+                    return index
+                self._retailers[retailer_id] = index
+                while len(self._retailers) > self.max_retailers:
+                    self._retailers.popitem(last=False)
+                return index
+        finally:
+            load.waiters -= 1
+            if not load.waiters:
+                del self._retailer_loads[retailer_id]
+
+    def _touch_retailer(self, retailer_id: int) -> Optional[PrefixIndex]:
+        load = self._retailer_loads.get(retailer_id)
+        if load is not None:
+            load.generation += 1
+        return self._retailers.get(retailer_id)
+
+    def upsert_inventory(self, retailer_id: int, inventory_id: int, name: Optional[str]) -> None:
+        index = self._touch_retailer(retailer_id)
+        if index is not None:
+            index.upsert(inventory_id, name)
+
+    def remove_inventory(self, retailer_id: int, inventory_id: int) -> None:
+        index = self._touch_retailer(retailer_id)
+        if index is not None:
+            index.remove(inventory_id)
+
+    def invalidate_retailer(self, retailer_id: int) -> None:
+        """Drop a retailer's index (e.g. after a bulk change); it reloads on next use."""
+        self._touch_retailer(retailer_id)
+        self._retailers.pop(retailer_id, None)
@@ -0,0 +1,150 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed    -> calls pass; failure_threshold failures in a row open it.
+    open      -> calls fail fast until reset_timeout has passed.
+    half_open -> up to half_open_max_calls probe calls pass; a success closes
+                 the breaker, a failure opens it again.
+    Callers pair allow() with exactly one success() / failure() / abandon().
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = self.CLOSED
+        self._state_since = time.monotonic()
+        self._consecutive_failures = 0
+        self._probes = 0
+        self._counters = {"Successes": 0, "Failures": 0, "Rejected": 0}
+        self._transitions = {self.CLOSED: 0, self.OPEN: 0, self.HALF_OPEN: 0}
+        self._time_in_state = {self.CLOSED: 0.0, self.OPEN: 0.0, self.HALF_OPEN: 0.0}
+
+    def _move(self, state: str) -> None:
+        now = time.monotonic()
+        self._time_in_state[self.state] += now - self._state_since
+        logger.warning(f"⚡ Circuit '{self.name}' {self.state} -> {state}")
+        self.state, self._state_since = state, now
+        self._transitions[state] += 1
+        self._probes = 0
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN and time.monotonic() - self._state_since >= self.reset_timeout:
+            self._move(self.HALF_OPEN)
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and self._probes < self.half_open_max_calls:
+            self._probes += 1
+            return True
+        self._counters["Rejected"] += 1
+        return False
+
+    def success(self) -> None:
+        self._counters["Successes"] += 1
+        self._consecutive_failures = 0
+        if self.state == self.HALF_OPEN:
+            self._move(self.CLOSED)
+
+    def failure(self) -> None:
+        self._counters["Failures"] += 1
+        self._consecutive_failures += 1
+        if self.state == self.HALF_OPEN or (
+            self.state == self.CLOSED and self._consecutive_failures >= self.failure_threshold
+        ):
+            self._move(self.OPEN)
+
+    def abandon(self) -> None:
+        """The call was cancelled before it said anything about the dependency."""
+        if self.state == self.HALF_OPEN and self._probes:
+            self._probes -= 1
+
+    def metrics(self) -> dict:
+        in_state = dict(self._time_in_state)
+        in_state[self.state] += time.monotonic() - self._state_since
+        return {
+            "State": self.state,
+            "ConsecutiveFailures": self._consecutive_failures,
+            **self._counters,
+            "Transitions": dict(self._transitions),
+            "SecondsInState": {state: round(seconds, 3) for state, seconds in in_state.items()},
+        }
+
+
+class ConcurrencyLimiter:
+    """Semaphore that gives up after wait_timeout instead of queueing without bound."""
+
+    def __init__(self, max_concurrency: int, wait_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.wait_timeout = wait_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_use = 0
+        self._waiting = 0
+        self._rejected = 0
+
+    async def acquire(self) -> bool:
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.wait_timeout)
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            return False
+        finally:
+            self._waiting -= 1
+        self._in_use += 1
+        return True
+
+    def release(self) -> None:
+        self._in_use -= 1
+        self._semaphore.release()
+
+    def metrics(self) -> dict:
+        return {
+            "MaxConcurrency": self.max_concurrency,
+            "InUse": self._in_use,
+            "Waiting": self._waiting,
+            "Rejected": self._rejected,
+        }
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one execution of fn."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, "asyncio.Future"] = {}
+        self._calls = 0
+        self._coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future: Optional["asyncio.Future"] = self._inflight.get(key)
+        if future is not None:
+            self._coalesced += 1
+            return await asyncio.shield(future)
+
+        self._calls += 1
+        future = asyncio.ensure_future(fn())
+        self._inflight[key] = future
+
+        def done(f: "asyncio.Future") -> None:
+            if self._inflight.get(key) is f:
+                del self._inflight[key]
+            # Retrieve the error even if every caller went away (shielded, so it still runs)
+            f.cancelled() or f.exception()
+
+        future.add_done_callback(done)
+        return await asyncio.shield(future)
+
+    def metrics(self) -> dict:
+        return {"Calls": self._calls, "Coalesced": self._coalesced, "InFlight": len(self._inflight)}
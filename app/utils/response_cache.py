@@ -0,0 +1,116 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+Loader = Callable[[], Awaitable[Any]]
+
+
+class ResponseCache:
+    """
+    TTL cache with stale-while-revalidate for upstream responses.
+
+    get(key, loader):
+      - younger than ttl_seconds: served from memory;
+      - up to stale_seconds older than that: served from memory while one
+        background task refreshes it;
+      - missing or older: loaded inline. Concurrent misses for one key share
+        that single load, so a refresh storm costs one upstream call per TTL.
+    A failed background refresh keeps the stale value; a failed inline load
+    raises to every waiter and caches nothing.
+    """
+
+    def __init__(self, ttl_seconds: float = 30, stale_seconds: float = 300, max_entries: int = 5000):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, "asyncio.Future"] = {}
+        self._generation: Dict[Hashable, int] = {}
+        self._stats = {"Hits": 0, "StaleHits": 0, "Misses": 0, "Coalesced": 0, "Refreshes": 0, "RefreshErrors": 0, "Evictions": 0}
+
+    async def get(self, key: Hashable, loader: Loader) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < self.ttl_seconds:
+                self._stats["Hits"] += 1
+                self._entries.move_to_end(key)
+                return entry[1]
+            if age < self.ttl_seconds + self.stale_seconds:
+                self._stats["StaleHits"] += 1
+                self._entries.move_to_end(key)
+                if key not in self._inflight:
+                    self._stats["Refreshes"] += 1
+                    self._start_load(key, loader, background=True)
+                return entry[1]
+
+        future = self._inflight.get(key)
+        if future is None:
+            self._stats["Misses"] += 1
+            future = self._start_load(key, loader, background=False)
+        else:
+            self._stats["Coalesced"] += 1
+        return await asyncio.shield(future)
+
+    def _start_load(self, key: Hashable, loader: Loader, background: bool) -> "asyncio.Future":
+        generation = self._generation.get(key, 0)
+
+        async def load() -> Any:
+            try:
+                value = await loader()
+                if generation == self._generation.get(key, 0):
+                    self._store(key, value)
+                return value
+            except Exception as e:
+                if background:
+                    self._stats["RefreshErrors"] += 1
+                    logger.error(f"❌ Background refresh of {key} failed, serving stale data: {e}")
+                raise
+            finally:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+        future = asyncio.ensure_future(load())
+        # A background refresh (or a load whose callers went away) has nobody awaiting it;
+        # retrieve the error so it is not reported as unhandled
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        return future
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._generation.pop(evicted, None)
+            self._stats["Evictions"] += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop an entry; a load already in flight neither stores its (older) result nor serves new callers."""
+        self._generation[key] = self._generation.get(key, 0) + 1
+        self._entries.pop(key, None)
+        self._inflight.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        keys = [key for key in list(self._entries) + list(self._inflight) if predicate(key)]
+        for key in set(keys):
+            self.invalidate(key)
+        return len(set(keys))
+
+    def stats(self) -> dict:
+        served = self._stats["Hits"] + self._stats["StaleHits"] + self._stats["Coalesced"]
+        lookups = served + self._stats["Misses"]
+        return {
+            **self._stats,
+            "Entries": len(self._entries),
+            "InFlight": len(self._inflight),
+            # Share of lookups that did not cost an upstream call of their own
+            "HitRatio": round(served / lookups, 4) if lookups else None,
+            "TtlSeconds": self.ttl_seconds,
+            "StaleSeconds": self.stale_seconds,
+        }
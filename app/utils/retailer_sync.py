@@ -1,28 +1,321 @@
+import asyncio
+import time
+import uuid
+from typing import List, Optional, Tuple
+
 import httpx
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import bindparam, delete, func, insert, or_, select, update
+from sqlalchemy.orm import aliased
+
 from ..utils.logger import get_logger
+from .timezone import ist_now
+from .http_client import upstream
+from ..config import settings
+from ..db.base.database_manager import DatabaseManager
+from ..models.retailer.retailer_sync_model import RetailerSyncOutbox, RetailerSyncDeadLetter
 
 logger = get_logger(__name__)
 
-# change port depending on the other app
-# local
-# OTHER_APP_BASE_URL = "http://localhost:8000"
+# Paths on settings.upstream_base_url
+SYNC_PATH = "/internal/retailers/sync"              # one {"action", "data"} per call
+SYNC_BATCH_PATH = "/internal/retailers/sync/batch"  # {"events": [{"EventId", "action", "data"}, ...]}
 
-# host
-OTHER_APP_BASE_URL = "http://151.185.41.194:8000"
 
-
-async def sync_retailer(action: str, data: dict):
+def add_retailer_event(session, action: str, retailer_id: int, data: dict) -> None:
     """
     action: create | update | delete | register
+
+    Queue a sync event in the caller's transaction, so it is stored if and
+    only if the retailer change itself commits. Sending happens later in
+    RetailerSyncDispatcher; the request never waits on the partner app.
+    """
+    session.add(RetailerSyncOutbox(
+        RetailerId=retailer_id,
+        Action=action,
+        Payload=jsonable_encoder(data),
+        Attempts=0,
+        NextAttemptAt=0,
+    ))
+
+
+def _permanent(status_code: int) -> bool:
+    """4xx other than timeout / rate limit: resending the same event will not help."""
+    return 400 <= status_code < 500 and status_code not in (408, 429)
+
+
+class RetailerSyncDispatcher:
     """
-    try:
-        async with httpx.AsyncClient(timeout=5) as client:
-            await client.post(
-                f"{OTHER_APP_BASE_URL}/internal/retailers/sync",
-                json={
-                    "action": action,
-                    "data": data
-                }
+    Drains RetailerSyncOutbox to the partner app (scheduler job, so one worker per slot).
+
+    Events leave in EventId order, batch_size at a time, in one POST to the
+    batch endpoint; if the partner app has no batch endpoint (404) they are
+    sent one by one instead. Ordering holds per RetailerId: while any event of
+    a retailer waits for a retry, none of its later events are sent. Failures
+    back off exponentially (retry_seconds doubling up to max_retry_seconds);
+    after max_attempts, or straight away when the partner rejects an event
+    with a 4xx, the event moves to RetailerSyncDeadLetter. A batch the
+    partner rejects with a 4xx is resent one event at a time, so only the
+    bad event is dead-lettered. Delivery is at-least-once: the partner
+    de-duplicates on EventId.
+
+    Each batch is claimed before it is sent: ClaimedBy is set and
+    NextAttemptAt pushed claim_seconds ahead in one UPDATE, which also keeps
+    every later event of those retailers waiting. Another worker running at
+    the same time therefore never sends the same events or overtakes a
+    retailer's earlier event; a crashed worker's claim lapses after
+    claim_seconds.
+    """
+
+    def __init__(
+        self,
+        db_type: str,
+        batch_size: int = 100,
+        max_batches: int = 20,
+        max_attempts: int = 8,
+        retry_seconds: float = 5,
+        max_retry_seconds: float = 600,
+        claim_seconds: float = 300,
+    ):
+        self.db_type = db_type
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self.claim_seconds = claim_seconds
+        self._batch_supported = True
+        self._lock = asyncio.Lock()
+
+    def _backoff(self, attempts: int) -> float:
+        return min(self.retry_seconds * 2 ** (attempts - 1), self.max_retry_seconds)
+
+    # ------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------
+    async def dispatch(self) -> dict:
+        totals = {"Sent": 0, "Retrying": 0, "DeadLettered": 0}
+        async with self._lock:
+            db_manager = DatabaseManager(self.db_type)
+            await db_manager.connect()
+            try:
+                for _ in range(self.max_batches):
+                    events = await self._claim_events(db_manager)
+                    if not events:
+                        break
+                    sent, retry, dead = await self._send(events)
+                    await self._record(db_manager, events, sent, retry, dead)
+                    totals["Sent"] += len(sent)
+                    totals["Retrying"] += len(retry)
+                    totals["DeadLettered"] += len(dead)
+                    if not sent:
+                        break  # partner app is failing; leave the rest for the next run
+            finally:
+                await db_manager.disconnect()
+        if any(totals.values()):
+            logger.info(f"🔁 Retailer sync: {totals}")
+        return totals
+
+    async def _claim_events(self, db_manager) -> List[RetailerSyncOutbox]:
+        now = time.time()
+        token = uuid.uuid4().hex
+        outbox = RetailerSyncOutbox
+        waiting = select(outbox.RetailerId).where(outbox.NextAttemptAt > now)
+        due = (
+            select(outbox.EventId)
+            .where(outbox.RetailerId.not_in(waiting))
+            .order_by(outbox.EventId)
+            .limit(self.batch_size)
+        )
+        async with db_manager.transaction() as session:
+            ids = list((await session.execute(due)).scalars().all())
+            if not ids:
+                return []
+            await session.execute(
+                update(outbox)
+                .where(outbox.EventId.in_(ids), outbox.NextAttemptAt <= now)
+                .values(ClaimedBy=token, NextAttemptAt=now + self.claim_seconds)
+                .execution_options(synchronize_session=False)
+            )
+
+        # A concurrent run may have claimed an earlier event of the same
+        # retailer between our SELECT and UPDATE; hand those retailers back.
+        earlier = aliased(outbox)
+        overtaking = (
+            select(earlier.EventId)
+            .where(
+                earlier.RetailerId == outbox.RetailerId,
+                earlier.EventId < outbox.EventId,
+                or_(earlier.ClaimedBy.is_(None), earlier.ClaimedBy != token),
             )
-    except Exception as e:
-        logger.error(f"Retailer sync failed: {e}")
+            .exists()
+        )
+        async with db_manager.transaction() as session:
+            blocked = list((await session.execute(
+                select(outbox.EventId).where(outbox.ClaimedBy == token, overtaking)
+            )).scalars().all())
+            if blocked:
+                await session.execute(
+                    update(outbox)
+                    .where(outbox.EventId.in_(blocked))
+                    .values(ClaimedBy=None, NextAttemptAt=now)
+                    .execution_options(synchronize_session=False)
+                )
+            stmt = select(outbox).where(outbox.ClaimedBy == token).order_by(outbox.EventId)
+            return list((await session.execute(stmt)).scalars().all())
+
+    async def _send(self, events: List[RetailerSyncOutbox]) -> Tuple[List[int], List[Tuple[RetailerSyncOutbox, str]], List[Tuple[RetailerSyncOutbox, str]]]:
+        """Returns (delivered ids, [(event, error)] to retry, [(event, error)] to dead-letter)."""
+        async with upstream.session() as client:
+            if self._batch_supported:
+                body = {"events": [{"EventId": e.EventId, "action": e.Action, "data": e.Payload} for e in events]}
+                try:
+                    response = await client.post(SYNC_BATCH_PATH, json=body, timeout=upstream.timeout("retailer_sync"))
+                except httpx.HTTPError as e:
+                    return [], [(event, str(e) or type(e).__name__) for event in events], []
+                if response.is_success:
+                    return [e.EventId for e in events], [], []
+                error = f"HTTP {response.status_code}: {response.text[:200]}"
+                if response.status_code == 404:
+                    logger.warning("⚠️ Partner app has no batch sync endpoint, sending retailer events one by one")
+                    self._batch_supported = False
+                elif _permanent(response.status_code):
+                    logger.warning(f"⚠️ Partner app rejected a batch of {len(events)} retailer events ({error}), resending them one by one")
+                else:
+                    return [], [(event, error) for event in events], []
+
+            sent, retry, dead = [], [], []
+            blocked = set()
+            for event in events:
+                if event.RetailerId in blocked:
+                    continue  # keep this retailer's order; its earlier event is retrying
+                try:
+                    response = await client.post(
+                        SYNC_PATH,
+                        json={"action": event.Action, "data": event.Payload},
+                        timeout=upstream.timeout("retailer_sync"),
+                    )
+                except httpx.HTTPError as e:
+                    retry.append((event, str(e) or type(e).__name__))
+                    blocked.add(event.RetailerId)
+                    continue
+                if response.is_success:
+                    sent.append(event.EventId)
+                elif _permanent(response.status_code):
+                    dead.append((event, f"HTTP {response.status_code}: {response.text[:200]}"))
+                else:
+                    retry.append((event, f"HTTP {response.status_code}: {response.text[:200]}"))
+                    blocked.add(event.RetailerId)
+            return sent, retry, dead
+
+    async def _record(self, db_manager, events: List[RetailerSyncOutbox], sent: List[int], retry: List[Tuple[RetailerSyncOutbox, str]], dead: List[Tuple[RetailerSyncOutbox, str]]) -> None:
+        now = time.time()
+        # Skipped behind a retrying event of their retailer: release the claim
+        settled = set(sent) | {e.EventId for e, _ in retry} | {e.EventId for e, _ in dead}
+        unsent = [e.EventId for e in events if e.EventId not in settled]
+        rescheduled = []
+        for event, error in retry:
+            attempts = event.Attempts + 1
+            if attempts >= self.max_attempts:
+                dead.append((event, error))
+            else:
+                rescheduled.append({"row_id": event.EventId, "attempts": attempts, "next_at": now + self._backoff(attempts), "error": error})
+
+        async with db_manager.transaction() as session:
+            if sent:
+                await session.execute(delete(RetailerSyncOutbox).where(RetailerSyncOutbox.EventId.in_(sent)))
+            if rescheduled:
+                stmt = (
+                    update(RetailerSyncOutbox.__table__)
+                    .where(RetailerSyncOutbox.EventId == bindparam("row_id"))
+                    .values(Attempts=bindparam("attempts"), NextAttemptAt=bindparam("next_at"), LastError=bindparam("error"), ClaimedBy=None)
+                )
+                await session.execute(stmt, rescheduled)
+            if unsent:
+                await session.execute(
+                    update(RetailerSyncOutbox)
+                    .where(RetailerSyncOutbox.EventId.in_(unsent))
+                    .values(ClaimedBy=None, NextAttemptAt=now)
+                    .execution_options(synchronize_session=False)
+                )
+            if dead:
+                failed_at = ist_now()
+                await session.execute(insert(RetailerSyncDeadLetter.__table__).values([
+                    {
+                        "EventId": event.EventId,
+                        "RetailerId": event.RetailerId,
+                        "Action": event.Action,
+                        "Payload": event.Payload,
+                        "Attempts": event.Attempts + 1,
+                        "LastError": error,
+                        "CreatedAt": event.CreatedAt,
+                        "FailedAt": failed_at,
+                    }
+                    for event, error in dead
+                ]))
+                await session.execute(delete(RetailerSyncOutbox).where(RetailerSyncOutbox.EventId.in_([e.EventId for e, _ in dead])))
+                for event, error in dead:
+                    logger.error(f"❌ Retailer sync event {event.EventId} ({event.Action} retailer {event.RetailerId}) dead-lettered: {error}")
+
+    # ------------------------------------------------------------
+    # Inspection / replay
+    # ------------------------------------------------------------
+    async def status(self) -> dict:
+        db_manager = DatabaseManager(self.db_type)
+        await db_manager.connect()
+        try:
+            pending, retrying, oldest = (await db_manager.execute(select(
+                func.count(RetailerSyncOutbox.EventId),
+                func.count(RetailerSyncOutbox.EventId).filter(RetailerSyncOutbox.Attempts > 0),
+                func.min(RetailerSyncOutbox.CreatedAt),
+            ))).one()
+            dead = (await db_manager.execute(select(func.count(RetailerSyncDeadLetter.EventId)))).scalar()
+        finally:
+            await db_manager.disconnect()
+        return {
+            "Pending": pending,
+            "Retrying": retrying,
+            "OldestPendingAt": oldest,
+            "DeadLettered": dead,
+            "BatchEndpoint": self._batch_supported,
+        }
+
+    async def dead_letters(self, limit: int = 100, retailer_id: Optional[int] = None) -> List[dict]:
+        db_manager = DatabaseManager(self.db_type)
+        await db_manager.connect()
+        try:
+            stmt = select(RetailerSyncDeadLetter).order_by(RetailerSyncDeadLetter.EventId.desc()).limit(limit)
+            if retailer_id is not None:
+                stmt = stmt.where(RetailerSyncDeadLetter.RetailerId == retailer_id)
+            rows = (await db_manager.execute(stmt)).scalars().all()
+            return [{c.key: getattr(row, c.key) for c in RetailerSyncDeadLetter.__table__.c} for row in rows]
+        finally:
+            await db_manager.disconnect()
+
+    async def replay(self, event_id: int) -> bool:
+        """Queue a dead-lettered event again (as a new, newest event of its retailer)."""
+        db_manager = DatabaseManager(self.db_type)
+        await db_manager.connect()
+        try:
+            async with db_manager.transaction() as session:
+                row = (await session.execute(
+                    select(RetailerSyncDeadLetter).where(RetailerSyncDeadLetter.EventId == event_id)
+                )).scalar_one_or_none()
+                if row is None:
+                    return False
+                add_retailer_event(session, row.Action, row.RetailerId, row.Payload)
+                await session.delete(row)
+            return True
+        finally:
+            await db_manager.disconnect()
+
+
+# Run by the 'retailer_sync' scheduler job (see main.py)
+retailer_sync_dispatcher = RetailerSyncDispatcher(
+    settings.db_type,
+    batch_size=settings.retailer_sync_batch_size,
+    max_attempts=settings.retailer_sync_max_attempts,
+    retry_seconds=settings.retailer_sync_retry_seconds,
+    max_retry_seconds=settings.retailer_sync_max_retry_seconds,
+    claim_seconds=settings.retailer_sync_claim_seconds,
+)
@@ -0,0 +1,177 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from datetime import time as dt_time
+from typing import Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from .logger import get_logger
+from .timezone import ist_now
+from ..db.base.database_manager import DatabaseManager
+
+logger = get_logger(__name__)
+
+JobFunc = Callable[[], Awaitable[object]]
+
+_RENEW_LEASE_SQL = text("""
+    UPDATE JobLock SET Owner = :owner, LeaseUntil = :until
+    WHERE JobName = :name AND (LeaseUntil < :now OR Owner = :owner)
+""")
+
+_INSERT_LEASE_SQL = text("""
+    INSERT INTO JobLock (JobName, Owner, LeaseUntil) VALUES (:name, :owner, :until)
+""")
+
+_EXTEND_LEASE_SQL = text("""
+    UPDATE JobLock SET LeaseUntil = :until WHERE JobName = :name AND Owner = :owner
+""")
+
+
+@dataclass
+class _Job:
+    name: str
+    func: JobFunc
+    period: float                     # seconds between runs
+    at: Optional[dt_time] = None      # daily jobs: wall-clock time (IST)
+
+    def seconds_until_next_run(self) -> float:
+        if self.at is None:
+            return self.period
+        now = ist_now()
+        next_run = now.replace(hour=self.at.hour, minute=self.at.minute, second=self.at.second, microsecond=0)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        return (next_run - now).total_seconds()
+
+
+class JobLease:
+    """
+    Cross-process lock backed by the JobLock table. A worker takes a job by
+    writing its owner id and a lease expiry; other workers skip the job until
+    the lease runs out. The holder keeps extending the lease while the job
+    runs (see Scheduler.run_now), so a lease only lapses on its own when the
+    holding worker died.
+    """
+
+    def __init__(self, db_type: str):
+        self.db_type = db_type
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    async def acquire(self, name: str, lease_seconds: float) -> bool:
+        db_manager = DatabaseManager(self.db_type)
+        now = time.time()
+        params = {"name": name, "owner": self.owner, "now": now, "until": now + lease_seconds}
+        try:
+            await db_manager.connect()
+            result = await db_manager.execute(_RENEW_LEASE_SQL, params)
+            if result.rowcount:
+                return True
+            try:
+                await db_manager.execute(_INSERT_LEASE_SQL, params)
+                return True
+            except IntegrityError:
+                # Row exists and another worker holds an unexpired lease
+                return False
+        finally:
+            await db_manager.disconnect()
+
+    async def extend(self, name: str, until: float) -> bool:
+        """Move the expiry of a lease this worker holds; False if it was lost to another worker."""
+        db_manager = DatabaseManager(self.db_type)
+        try:
+            await db_manager.connect()
+            result = await db_manager.execute(_EXTEND_LEASE_SQL, {"name": name, "owner": self.owner, "until": until})
+            return bool(result.rowcount)
+        finally:
+            await db_manager.disconnect()
+
+
+class Scheduler:
+    """
+    Minimal in-app scheduler for periodic maintenance jobs. Every run first
+    takes a JobLease so that only one worker process executes each slot.
+
+    The lease covers at least the slot (half the period from the start) and
+    is renewed for lease_seconds every third of that while the job runs,
+    however long the run takes. When the run finishes the lease is set back
+    to the slot end, so workers whose timers fire a little later for the
+    same slot skip it, or released right away if the run outlasted it.
+    """
+
+    def __init__(self, db_type: str, lease_seconds: float = 60):
+        self.lease = JobLease(db_type)
+        self.lease_seconds = lease_seconds
+        self._jobs: Dict[str, _Job] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def daily(self, name: str, at: dt_time, func: JobFunc) -> None:
+        self._jobs[name] = _Job(name=name, func=func, period=86400, at=at)
+
+    def every(self, name: str, seconds: float, func: JobFunc) -> None:
+        self._jobs[name] = _Job(name=name, func=func, period=seconds)
+
+    def start(self) -> None:
+        for job in self._jobs.values():
+            if job.name not in self._tasks:
+                self._tasks[job.name] = asyncio.create_task(self._loop(job), name=f"job:{job.name}")
+        logger.info(f"⏰ Scheduler started with jobs: {', '.join(self._jobs) or 'none'}")
+
+    async def stop(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+    async def run_now(self, name: str) -> bool:
+        """Run a job immediately if this worker can take its lease; returns whether it ran."""
+        job = self._jobs[name]
+        slot_end = time.time() + job.period / 2
+        if not await self.lease.acquire(job.name, max(job.period / 2, self.lease_seconds)):
+            logger.info(f"⏭️ Job '{job.name}' is held by another worker, skipping")
+            return False
+        started = time.monotonic()
+        heartbeat = asyncio.create_task(self._renew(job.name, slot_end), name=f"lease:{job.name}")
+        try:
+            await job.func()
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+            try:
+                await self.lease.extend(job.name, max(slot_end, time.time()))
+            except Exception as e:
+                logger.warning(f"⚠️ Could not release lease of job '{job.name}': {e}")
+        logger.info(f"✅ Job '{job.name}' finished in {time.monotonic() - started:.2f}s")
+        return True
+
+    async def _renew(self, name: str, slot_end: float) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                if not await self.lease.extend(name, max(slot_end, time.time() + self.lease_seconds)):
+                    logger.warning(f"⚠️ Job '{name}' lost its lease to another worker")
+                    return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Could not renew lease of job '{name}': {e}")
+
+    async def _loop(self, job: _Job) -> None:
+        while True:
+            await asyncio.sleep(job.seconds_until_next_run())
+            try:
+                await self.run_now(job.name)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Job '{job.name}' failed: {e}")
+
+
+def parse_time_of_day(value: str) -> dt_time:
+    """'HH:MM' or 'HH:MM:SS' -> datetime.time"""
+    return datetime.strptime(value, "%H:%M:%S" if value.count(":") == 2 else "%H:%M").time()
@@ -0,0 +1,62 @@
+import os
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from .image_uploader import HASHED_NAME
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+# uuid-named uploads from before content hashing
+SHORT_LIVED = "public, max-age=3600"
+
+# Requests for these may be answered with the pre-encoded WebP next to them
+_WEBP_SOURCES = (".jpg", ".jpeg", ".png")
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """
+    StaticFiles for uploaded pictures (utils/image_uploader.py).
+
+    Content-hashed files never change under their URL, so they are sent
+    with Cache-Control: immutable for a year and a strong ETag derived from
+    the name (the same on every server, unlike Starlette's mtime/size tag).
+    A client that accepts image/webp asking for a JPEG / PNG gets the WebP
+    variant stored next to it when there is one (Vary: Accept).
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        webp = self._webp_path(path, Headers(scope=scope))
+        response = None
+        if webp:
+            try:
+                response = await super().get_response(webp, scope)
+            except HTTPException as e:
+                if e.status_code != 404:
+                    raise
+        if response is None:
+            response = await super().get_response(path, scope)
+        if path.lower().endswith(_WEBP_SOURCES):
+            response.headers["Vary"] = "Accept"
+        return response
+
+    @staticmethod
+    def _webp_path(path: str, headers: Headers) -> Optional[str]:
+        if "image/webp" not in headers.get("accept", "") or not path.lower().endswith(_WEBP_SOURCES):
+            return None
+        return f"{path.rsplit('.', 1)[0]}.webp"
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        name = os.path.basename(full_path)
+        if HASHED_NAME.match(name):
+            response.headers["ETag"] = f'"{name}"'
+            response.headers["Cache-Control"] = IMMUTABLE
+        else:
+            response.headers["Cache-Control"] = SHORT_LIVED
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,183 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import insert, select
+
+from .logger import get_logger
+from .timezone import ist_now
+
+logger = get_logger(__name__)
+
+LOW_STATUSES = ("low", "no")
+
+# Only transitions that make stock worse raise an alert
+_SEVERITY = {"in": 0, "low": 1, "no": 2}
+
+# Rows per multi-row INSERT, well under SQLite's bound-parameter limit
+_INSERT_CHUNK = 500
+
+
+class StockAlerts:
+    """
+    Low-stock pipeline for one inventory table.
+
+    Stock writes hand record() the rows returned by their UPDATE ... RETURNING
+    together with the status each row had before the write. record() keeps a
+    per-account set of low / out-of-stock items current and batch-inserts one
+    notification per worsening transition (in -> low, in/low -> no); the
+    stored rows, ids included, are passed on to on_insert.
+
+    An account's set is seeded on first read with one query on the
+    (Owner, Status) index and refreshed after ttl_seconds so that writes made
+    by other worker processes are picked up too.
+    """
+
+    def __init__(
+        self,
+        inventory_model,
+        notification_model,
+        owner_field: str,
+        id_field: str,
+        max_accounts: int = 1000,
+        ttl_seconds: float = 300,
+        on_insert: Optional[Callable[[List[dict]], None]] = None,
+    ):
+        self.inventory_model = inventory_model
+        self.notification_model = notification_model
+        self.owner_field = owner_field
+        self.id_field = id_field
+        self.max_accounts = max_accounts
+        self.ttl_seconds = ttl_seconds
+        self.on_insert = on_insert  # told about every batch of inserted notifications
+        self._accounts: "OrderedDict[int, Tuple[float, Dict[int, dict]]]" = OrderedDict()
+        self._generation: Dict[int, int] = {}
+        self._lock = asyncio.Lock()
+
+    # ---------------- Low-stock set ----------------
+    def _entry(self, row: Mapping[str, Any]) -> dict:
+        expiry = row["ExpiryDate"]
+        return {
+            "InventoryId": row[self.id_field],
+            "MedicineName": row["MedicineName"],
+            "Batch": row["Batch"],
+            "MinStock": row["MinStock"],
+            "Stock": row["Quantity"],
+            "Status": row["Status"],
+            "ExpiryDate": expiry.strftime("%d-%m-%Y") if expiry else None,
+        }
+
+    def _cached(self, account_id: int) -> Optional[Dict[int, dict]]:
+        cached = self._accounts.get(account_id)
+        if cached is None:
+            return None
+        loaded_at, items = cached
+        if self.ttl_seconds and time.monotonic() - loaded_at > self.ttl_seconds:
+            self._accounts.pop(account_id, None)
+            return None
+        self._accounts.move_to_end(account_id)
+        return items
+
+    async def low_stock(self, db_manager, account_id: int) -> List[dict]:
+        """Low and out-of-stock items for an account, lowest stock first. db_manager must be connected."""
+        items = self._cached(account_id)
+        if items is None:
+            async with self._lock:
+                items = self._cached(account_id)
+                if items is None:
+                    generation = self._generation.get(account_id, 0)
+                    model = self.inventory_model
+                    result = await db_manager.execute(
+                        select(*model.__table__.c).where(
+                            getattr(model, self.owner_field) == account_id,
+                            model.Status.in_(LOW_STATUSES),
+                        )
+                    )
+                    items = {row[self.id_field]: self._entry(row) for row in result.mappings().all()}
+                    if generation == self._generation.get(account_id, 0):
+                        self._accounts[account_id] = (time.monotonic(), items)
+                        while len(self._accounts) > self.max_accounts:
+                            evicted, _ = self._accounts.popitem(last=False)
+                            self._generation.pop(evicted, None)
+        return sorted(items.values(), key=lambda i: (i["Stock"] or 0, i["MedicineName"]))
+
+    def _apply(self, row: Mapping[str, Any]) -> None:
+        account_id = row[self.owner_field]
+        self._generation[account_id] = self._generation.get(account_id, 0) + 1
+        items = self._accounts.get(account_id)
+        if items is None:
+            return
+        if row["Status"] in LOW_STATUSES:
+            items[1][row[self.id_field]] = self._entry(row)
+        else:
+            items[1].pop(row[self.id_field], None)
+
+    def forget(self, account_id: int, inventory_id: int) -> None:
+        """Drop a deleted inventory row from the set."""
+        self._generation[account_id] = self._generation.get(account_id, 0) + 1
+        items = self._accounts.get(account_id)
+        if items is not None:
+            items[1].pop(inventory_id, None)
+
+    def invalidate(self, account_id: int) -> None:
+        self._generation[account_id] = self._generation.get(account_id, 0) + 1
+        self._accounts.pop(account_id, None)
+
+    # ---------------- Notifications ----------------
+    def _notification(self, row: Mapping[str, Any], reason: Optional[str]) -> dict:
+        name = row["MedicineName"]
+        batch = f" (batch {row['Batch']})" if row["Batch"] else ""
+        if row["Status"] == "no":
+            title = f"Out of stock: {name}"
+            message = f"{name}{batch} is out of stock."
+        else:
+            title = f"Low stock: {name}"
+            message = f"{name}{batch} is down to {row['Quantity']} units (minimum {row['MinStock'] or 0})."
+        if reason:
+            message = f"{message} {reason}"
+        return {
+            self.owner_field: row[self.owner_field],
+            "Title": title,
+            "Message": message,
+            "Type": "Stock",
+            "IsRead": False,
+            "Date": ist_now(),
+        }
+
+    async def record(
+        self,
+        db_manager,
+        changes: Iterable[Tuple[Mapping[str, Any], Optional[str]]],
+        reason: Optional[str] = None,
+    ) -> int:
+        """
+        changes: (row after the write, status before the write) pairs.
+        Updates the low-stock sets and inserts the resulting notifications with
+        multi-row INSERTs. Returns the number of notifications written. Never raises: a
+        failed alert must not fail the stock write that triggered it.
+        """
+        pending: Dict[int, dict] = {}
+        try:
+            for row, old_status in changes:
+                self._apply(row)
+                new_status = row["Status"]
+                if _SEVERITY.get(new_status, 0) > _SEVERITY.get(old_status or "in", 0):
+                    # One alert per item per batch: the last state wins
+                    pending[row[self.id_field]] = self._notification(row, reason)
+
+            rows = list(pending.values())
+            for start in range(0, len(rows), _INSERT_CHUNK):
+                chunk = rows[start:start + _INSERT_CHUNK]
+                # RETURNING: pushed alerts carry their NotificationId, like ones made through the API
+                stmt = insert(self.notification_model).values(chunk).returning(*self.notification_model.__table__.c)
+                async with db_manager.transaction() as session:
+                    stored = [dict(row) for row in (await session.execute(stmt)).mappings().all()]
+                if self.on_insert is not None:
+                    self.on_insert(stored)
+            if rows:
+                logger.info(f"🔔 Raised {len(pending)} stock alert(s)")
+            return len(pending)
+        except Exception as e:
+            logger.error(f"❌ Error recording stock alerts: {e}")
+            return 0
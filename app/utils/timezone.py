@@ -5,3 +5,8 @@ IST = pytz.timezone("Asia/Kolkata")
 
 def ist_now():
     return datetime.now(IST)
+
+
+def to_ist(value: datetime) -> datetime:
+    """Client datetimes -> IST, the zone ist_now() stores; naive values are taken as IST already."""
+    return value.astimezone(IST) if value.tzinfo is not None else IST.localize(value)